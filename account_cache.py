@@ -0,0 +1,110 @@
+"""
+계좌 스냅샷 캐시
+get_balances 요청 1번(전체 계좌 목록)으로 모든 통화의 잔고/잠긴 수량/평균 매수가를 보관한다.
+주문 직전에 잔고를 따로 조회하지 않도록 주기적으로(백그라운드) 그리고 체결 직후에 갱신하고,
+코인이 여러 개여도 잔고 요청은 통화 수와 관계없이 1번이다.
+"""
+import time
+import threading
+
+
+class AccountCache:
+    """
+    계좌 스냅샷 (UpbitClient나 PaperTrader의 get_balances 결과)
+
+    사용법:
+        account = AccountCache(client)
+        account.get_balance("KRW")      # 캐시 (오래됐으면 1번 갱신)
+        client.buy_market_order(...)
+        account.refresh()               # 체결 직후 갱신
+    """
+
+    def __init__(self, source=None, max_age=30, clock=time.monotonic):
+        """
+        Args:
+            source: get_balances()가 있는 객체 (None이면 update로만 갱신, 비동기 봇용)
+            max_age: 이 시간(초)보다 오래된 스냅샷은 다음 조회 때 갱신
+            clock: 현재 시각 함수 (리플레이는 가상 시계)
+        """
+        self.source = source
+        self.max_age = max_age
+        self.clock = clock
+        self.accounts = {}      # 통화 → {'balance', 'locked', 'avg_buy_price'}
+        self.updated_at = None
+        self.refreshes = 0
+        self.lock = threading.Lock()
+
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def update(self, accounts):
+        """
+        get_balances 응답으로 스냅샷 교체
+
+        Returns:
+            {통화: {'balance', 'locked', 'avg_buy_price'}}
+        """
+        snapshot = {
+            account['currency']: {
+                'balance': float(account['balance']),
+                'locked': float(account.get('locked') or 0),
+                'avg_buy_price': float(account.get('avg_buy_price') or 0),
+            } for account in accounts or []
+        }
+        with self.lock:
+            self.accounts = snapshot
+            self.updated_at = self.clock()
+            self.refreshes += 1
+        return snapshot
+
+    def refresh(self):
+        """
+        계좌 다시 조회 (요청 1번)
+        """
+        return self.update(self.source.get_balances())
+
+    def stale(self):
+        """
+        스냅샷이 없거나 max_age보다 오래됐는지
+        """
+        return self.updated_at is None or self.clock() - self.updated_at >= self.max_age
+
+    def balance(self, ticker="KRW"):
+        """
+        캐시된 주문 가능 잔고 (갱신 없음, 'KRW-BTC'나 'BTC' 모두 가능)
+        """
+        if '-' in ticker:
+            ticker = ticker.split('-')[1]
+        return self.accounts.get(ticker, {}).get('balance', 0.0)
+
+    def get_balance(self, ticker="KRW"):
+        """
+        주문 가능 잔고 (스냅샷이 오래됐을 때만 갱신)
+        """
+        if self.stale() and self.source is not None:
+            self.refresh()
+        return self.balance(ticker)
+
+    def _run(self, interval):
+        while not self.stop_event.wait(interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"⚠️ 계좌 갱신 실패: {e}")
+
+    def start(self, interval=None):
+        """
+        백그라운드 주기 갱신 시작 (기본값: max_age의 절반마다)
+        """
+        if self.thread is not None and self.thread.is_alive():
+            return self
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, args=(interval or self.max_age / 2,), daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
@@ -3,9 +3,13 @@
 """
 from strategies import Strategy1_MeanReversion
 from backtest import Backtester
+from candle_store import CandleStore
 import config
 from datetime import datetime
 
+# 캔들은 로컬 저장소에서 재사용 (새 캔들만 다운로드)
+store = CandleStore()
+
 print("=" * 80)
 print("⏱️  포지션 보유 기간 분석 (RSI 30, 최근 3개월)")
 print("=" * 80)
@@ -16,7 +20,7 @@ params = config.STRATEGY_PARAMS.copy()
 params['rsi_oversold'] = 30
 
 strategy = Strategy1_MeanReversion(params)
-backtester = Backtester(strategy, initial_balance=1000000)
+backtester = Backtester(strategy, initial_balance=1000000, data_source=store)
 
 # 백테스팅 실행
 result = backtester.run(
@@ -0,0 +1,239 @@
+"""
+과거 캔들 대량 백필
+업비트 캔들 API는 요청당 200개까지만 주므로
+`to` 커서를 200개 단위로 뒤로 옮기며 여러 페이지를 동시에 받는다.
+(초당 요청 제한 준수, 중단 후 이어받기 지원)
+요청은 BACKFILL 우선순위라 같은 프로세스의 봇 주문/손절 확인/캔들 요청에 밀린다.
+"""
+import os
+import sys
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import pandas as pd
+from candle_store import CandleStore, INTERVAL_SECONDS
+from upbit_client import UpbitClient
+from rate_governor import GOVERNOR, BACKFILL, classify, priority
+from candle_clock import to_kst
+
+
+PAGE_SIZE = 200             # 업비트 캔들 API 최대 개수
+REQUESTS_PER_SEC = 10       # 업비트 시세 API 초당 요청 제한
+
+
+class RateLimiter:
+    """
+    초당 요청 수 제한 (스레드 공용)
+    """
+
+    def __init__(self, rate=REQUESTS_PER_SEC):
+        self.interval = 1.0 / rate
+        self.next_time = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """
+        다음 요청 가능 시각까지 대기
+        """
+        with self.lock:
+            now = time.monotonic()
+            wait = self.next_time - now
+            self.next_time = max(now, self.next_time) + self.interval
+
+        if wait > 0:
+            time.sleep(wait)
+
+
+class Backfiller:
+    """
+    페이지 단위 캔들 백필
+
+    받은 페이지는 flush_every개마다 CandleStore에 합쳐 저장하고
+    완료한 커서를 체크포인트 파일에 기록한다.
+    source가 UpbitClient면 워커 스레드들이 keep-alive 연결 풀 하나를 함께 쓴다.
+    rate/limiter가 없으면 공용 GOVERNOR로 제한한다 (UpbitClient는 클라이언트가 직접).
+    중단 후 다시 실행하면 체크포인트에 있는 페이지는 건너뛴다.
+    """
+
+    def __init__(self, store=None, workers=4, rate=None,
+                 flush_every=50, retries=3, limiter=None, source=None):
+        self.store = store or CandleStore()
+        self.source = source or self.store.source  # pyupbit 또는 UpbitClient
+        self.workers = workers
+        self.limiter = limiter or (RateLimiter(rate) if rate else None)
+        # 요청 제한이 있는 UpbitClient는 클라이언트가 토큰을 받으므로 중복으로 받지 않음
+        self.governed = getattr(getattr(self.source, 'aio', None), 'governor', None) is not None
+        self.flush_every = flush_every
+        self.retries = retries
+
+    def checkpoint_path(self, ticker, interval, start, end):
+        """
+        체크포인트 파일 경로 (백필 구간별)
+        """
+        name = f"{ticker}_{interval}_{start:%Y%m%d%H%M}_{end:%Y%m%d%H%M}.backfill.json"
+        return os.path.join(self.store.root, name)
+
+    def page_cursors(self, interval, start, end):
+        """
+        end부터 start까지 200개 단위 `to` 커서 목록
+
+        분봉은 거래 없는 구간이 비어 있어 한 페이지가 더 과거까지 닿을 수 있다.
+        그래서 페이지가 겹칠 수는 있어도 빠지는 구간은 없다.
+        """
+        span = pd.Timedelta(seconds=INTERVAL_SECONDS[interval] * PAGE_SIZE)
+
+        cursors = []
+        cursor = end
+        while cursor > start:
+            cursors.append(cursor)
+            cursor -= span
+
+        return cursors
+
+    def fetch_page(self, ticker, interval, cursor):
+        """
+        페이지 1개 받기 (실패 시 재시도)
+
+        Returns:
+            DataFrame (끝내 실패하면 None)
+        """
+        for attempt in range(self.retries):
+            with priority(BACKFILL):
+                if self.limiter:
+                    self.limiter.acquire()
+                elif not self.governed:
+                    GOVERNOR.acquire(*classify("GET", "candles"))
+                df = self.source.get_ohlcv(ticker, interval=interval, to=cursor, count=PAGE_SIZE)
+
+            if df is not None:
+                return df
+
+            time.sleep(0.5 * (2 ** attempt))
+
+        return None
+
+    def fill(self, ticker, interval, start, end=None, verbose=False):
+        """
+        [start, end) 구간 캔들 채우기
+
+        Args:
+            ticker: 티커
+            interval: 주기 (minute1 ~ month)
+            start: 시작 시각
+            end: 끝 시각 (None이면 현재)
+            verbose: 진행 상황 출력
+
+        Returns:
+            구간 DataFrame (저장소 기준)
+        """
+        start = pd.Timestamp(start)
+        end = pd.Timestamp(end) if end is not None else to_kst(time.time()).ceil('min')
+
+        checkpoint = self.checkpoint_path(ticker, interval, start, end)
+        done = self._load_checkpoint(checkpoint)
+
+        cursors = self.page_cursors(interval, start, end)
+        pending = [c for c in cursors if c.isoformat() not in done]
+
+        if verbose:
+            print(f"📥 백필: {ticker} {interval} {start} ~ {end}")
+            print(f"   페이지: {len(cursors)}개 (남은 페이지 {len(pending)}개)")
+
+        frames = []
+        finished = []   # (커서, 페이지 첫 캔들 시각)
+        failed = []
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {
+                executor.submit(self.fetch_page, ticker, interval, cursor): cursor
+                for cursor in pending
+            }
+
+            for count, future in enumerate(as_completed(futures), 1):
+                cursor = futures[future]
+                df = future.result()
+
+                if df is None:
+                    failed.append(cursor)
+                    continue
+
+                if len(df):
+                    frames.append(df)
+                finished.append((cursor, df.index[0] if len(df) else cursor))
+
+                if len(finished) >= self.flush_every:
+                    self._flush(ticker, interval, frames, finished, done, checkpoint)
+
+                if verbose and count % 10 == 0:
+                    print(f"진행: {count}/{len(pending)}", end='\r')
+
+        if failed:
+            self._flush(ticker, interval, frames, finished, done, checkpoint)
+            print(f"⚠️ 백필 실패 페이지 {len(failed)}개 (다시 실행하면 이어받기)")
+        else:
+            # 전 구간 완료 (상장 이전처럼 캔들이 없는 구간 포함)
+            self._flush(ticker, interval, frames, finished, done, checkpoint,
+                        covered=[(start, end)])
+            if os.path.exists(checkpoint):
+                os.remove(checkpoint)
+
+        stored = self.store.load(ticker, interval)
+        if stored is None:
+            return None
+
+        return stored[(stored.index >= start) & (stored.index < end)]
+
+    def _flush(self, ticker, interval, frames, finished, done, checkpoint, covered=None):
+        """
+        받은 페이지 저장 후 체크포인트 기록
+        """
+        if not finished and not covered:
+            return
+
+        covered = [(first, cursor) for cursor, first in finished] + (covered or [])
+        new_df = pd.concat(frames) if frames else None
+        self.store.merge(ticker, interval, new_df, covered=covered)
+
+        done.update(cursor.isoformat() for cursor, _ in finished)
+        self._save_checkpoint(checkpoint, done)
+
+        frames.clear()
+        finished.clear()
+
+    @staticmethod
+    def _load_checkpoint(path):
+        if not os.path.exists(path):
+            return set()
+        with open(path) as f:
+            return set(json.load(f))
+
+    @staticmethod
+    def _save_checkpoint(path, done):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(sorted(done), f)
+        os.replace(tmp_path, path)
+
+
+if __name__ == "__main__":
+    # 사용법: python backfill.py KRW-BTC minute15 20251101 20260217
+    if len(sys.argv) < 4:
+        print("사용법: python backfill.py <티커> <주기> <시작일> [종료일]")
+        sys.exit(1)
+
+    ticker, interval, start_date = sys.argv[1:4]
+    end_date = sys.argv[4] if len(sys.argv) > 4 else None
+
+    started = time.time()
+    client = UpbitClient(max_connections=4)     # 공용 GOVERNOR (봇과 같은 프로세스/잠금 파일이면 봇이 먼저)
+    df = Backfiller(source=client).fill(ticker, interval, start_date, end_date, verbose=True)
+    client.close()
+
+    print()
+    if df is None or len(df) == 0:
+        print("❌ 데이터를 가져올 수 없습니다.")
+    else:
+        print(f"✅ {len(df):,}개 캔들 ({df.index[0]} ~ {df.index[-1]})")
+        print(f"   소요 시간: {time.time() - started:.1f}초")
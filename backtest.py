@@ -7,6 +7,8 @@ import matplotlib.pyplot as plt
 from datetime import datetime
 import config
 from strategies import STRATEGIES, STRATEGY_CONFIGS
+from backtest_engine import run_backtest_arrays, RunConfig, TRADE_TYPES, BUY
+from candle_store import CandleStore, candle_count
 
 
 class Backtester:
@@ -14,22 +16,27 @@ class Backtester:
     백테스팅 클래스
     """
     
-    def __init__(self, strategy, initial_balance=1000000):
+    def __init__(self, strategy, initial_balance=1000000, data_source=None, run_config=None):
         """
         초기화
         
         Args:
             strategy: 전략 객체
             initial_balance: 초기 자본금
+            data_source: get_ohlcv(ticker, interval, to)를 가진 데이터 소스
+                         (기본값: pyupbit, 오프라인은 CandleStore)
+            run_config: 투자비율/손절/익절 RunConfig (기본값: config 모듈 설정)
         """
         self.strategy = strategy
+        self.data_source = data_source or pyupbit
+        self.run_config = run_config
         self.initial_balance = initial_balance
         self.balance = initial_balance
         self.position = None
         self.entry_price = 0
         self.trades = []
         
-    def run(self, ticker, start_date, end_date, interval="day"):
+    def run(self, ticker, start_date, end_date, interval="day", verbose=True):
         """
         백테스팅 실행
         
@@ -38,25 +45,29 @@ class Backtester:
             start_date: 시작일 (YYYYMMDD)
             end_date: 종료일 (YYYYMMDD)
             interval: 주기
+            verbose: 진행/결과 출력 여부
             
         Returns:
             결과 딕셔너리
         """
-        print(f"📊 백테스팅 시작")
-        print(f"   티커: {ticker}")
-        print(f"   기간: {start_date} ~ {end_date}")
-        print(f"   초기 자본: {self.initial_balance:,.0f}원")
-        print("-" * 50)
-        
-        # 데이터 가져오기
-        df = pyupbit.get_ohlcv(
+        log = print if verbose else (lambda *args, **kwargs: None)
+        
+        log(f"📊 백테스팅 시작")
+        log(f"   티커: {ticker}")
+        log(f"   기간: {start_date} ~ {end_date}")
+        log(f"   초기 자본: {self.initial_balance:,.0f}원")
+        log("-" * 50)
+        
+        # 데이터 가져오기 (기간 전체, 200개 초과는 페이지 단위)
+        df = self.data_source.get_ohlcv(
             ticker, 
             interval=interval,
-            to=end_date
+            to=end_date,
+            count=candle_count(interval, start_date, end_date)
         )
         
         if df is None:
-            print("❌ 데이터를 가져올 수 없습니다.")
+            log("❌ 데이터를 가져올 수 없습니다.")
             return None
         
         # 날짜 필터링
@@ -68,111 +79,46 @@ class Backtester:
         # 지표 계산
         df = self.strategy.calculate_indicators(df)
         
-        # 백테스팅
-        for i in range(len(df)):
-            if i < 30:  # 최소 데이터 필요 (분봉은 짧게)
-                continue
-            
-            current_df = df.iloc[:i+1]
-            signal = self.strategy.generate_signal(current_df)
-            current_price = df.iloc[i]['close']
-            current_date = df.index[i]
-            
-            # 매수
-            if signal == 'buy' and self.position is None:
-                invest_amount = self.balance * config.INVEST_RATIO
-                quantity = invest_amount / current_price
-                
-                self.position = quantity
-                self.entry_price = current_price
-                self.balance -= invest_amount
-                
-                self.trades.append({
-                    'date': current_date,
-                    'type': 'buy',
-                    'price': current_price,
-                    'quantity': quantity,
-                    'balance': self.balance
-                })
-                
-                print(f"📈 매수: {current_date.strftime('%Y-%m-%d')} {current_price:,.0f}원")
-            
-            # 매도
-            elif signal == 'sell' and self.position is not None:
-                sell_amount = self.position * current_price
-                profit = sell_amount - (self.position * self.entry_price)
-                profit_ratio = profit / (self.position * self.entry_price)
-                
-                self.balance += sell_amount
-                
-                self.trades.append({
-                    'date': current_date,
-                    'type': 'sell',
-                    'price': current_price,
-                    'quantity': self.position,
-                    'balance': self.balance,
-                    'profit': profit,
-                    'profit_ratio': profit_ratio
-                })
-                
-                print(f"📉 매도: {current_date.strftime('%Y-%m-%d')} {current_price:,.0f}원 (수익: {profit:,.0f}원, {profit_ratio*100:.2f}%)")
-                
-                self.position = None
-                self.entry_price = 0
+        return self.run_frame(df, verbose=verbose)
+    
+    def run_frame(self, df, verbose=True):
+        """
+        지표가 계산된 캔들로 백테스팅 (데이터 로드/지표 계산 생략)
+        
+        여러 전략이 같은 지표 프레임을 공유할 때 사용 (compare.py)
+        
+        Args:
+            df: 전략에 필요한 지표 컬럼이 있는 캔들 DataFrame
+            verbose: 거래/결과 출력 여부
             
-            # 손절/익절
-            if self.position is not None:
-                current_profit_ratio = (current_price - self.entry_price) / self.entry_price
-                
-                # 손절 (손절 설정이 있을 때만)
-                if config.STOP_LOSS > 0 and current_profit_ratio <= -config.STOP_LOSS:
-                    sell_amount = self.position * current_price
-                    profit = sell_amount - (self.position * self.entry_price)
-                    
-                    self.balance += sell_amount
-                    
-                    self.trades.append({
-                        'date': current_date,
-                        'type': 'stop_loss',
-                        'price': current_price,
-                        'quantity': self.position,
-                        'balance': self.balance,
-                        'profit': profit,
-                        'profit_ratio': current_profit_ratio
-                    })
-                    
-                    print(f"🔻 손절: {current_date.strftime('%Y-%m-%d')} {current_price:,.0f}원 (손실: {profit:,.0f}원, {current_profit_ratio*100:.2f}%)")
-                    
-                    self.position = None
-                    self.entry_price = 0
-                
-                # 익절
-                elif current_profit_ratio >= config.TAKE_PROFIT:
-                    sell_amount = self.position * current_price
-                    profit = sell_amount - (self.position * self.entry_price)
-                    
-                    self.balance += sell_amount
-                    
-                    self.trades.append({
-                        'date': current_date,
-                        'type': 'take_profit',
-                        'price': current_price,
-                        'quantity': self.position,
-                        'balance': self.balance,
-                        'profit': profit,
-                        'profit_ratio': current_profit_ratio
-                    })
-                    
-                    print(f"🔺 익절: {current_date.strftime('%Y-%m-%d')} {current_price:,.0f}원 (수익: {profit:,.0f}원, {current_profit_ratio*100:.2f}%)")
-                    
-                    self.position = None
-                    self.entry_price = 0
-        
-        # 마지막 포지션 정리
-        if self.position is not None:
-            final_price = df.iloc[-1]['close']
-            sell_amount = self.position * final_price
-            self.balance += sell_amount
+        Returns:
+            결과 딕셔너리 (run과 동일)
+        """
+        run_config = self.run_config or RunConfig.from_config()
+        log = print if verbose else (lambda *args, **kwargs: None)
+        
+        # 매매 신호 (전체 구간 한 번에)
+        signals = self.strategy.generate_signals(df)
+        
+        # 백테스팅 (배열 엔진)
+        result = run_backtest_arrays(
+            df['close'].to_numpy(),
+            signals,
+            stop_loss=run_config.stop_loss,
+            take_profit=run_config.take_profit,
+            invest_ratio=run_config.invest_ratio,
+            initial_balance=self.balance,
+            start=30  # 최소 데이터 필요 (분봉은 짧게)
+        )
+        
+        for record in result['trades']:
+            trade = self._trade_from_record(record, df.index[record['index']])
+            self.trades.append(trade)
+            if verbose:
+                self._print_trade(trade)
+        
+        # 마지막 포지션은 종가로 정리된 금액
+        self.balance = result['final_balance']
         
         # 결과 계산
         final_balance = self.balance
@@ -185,23 +131,23 @@ class Backtester:
         win_rate = len(win_trades) / len(sell_trades) * 100 if sell_trades else 0
         
         # 결과 출력
-        print("\n" + "=" * 50)
-        print("📊 백테스팅 결과")
-        print("=" * 50)
-        print(f"초기 자본: {self.initial_balance:,.0f}원")
-        print(f"최종 자본: {final_balance:,.0f}원")
-        print(f"총 수익: {total_return:,.0f}원 ({return_ratio:+.2f}%)")
-        print(f"거래 횟수: {len(self.trades)}회")
-        print(f"승률: {win_rate:.2f}% ({len(win_trades)}/{len(sell_trades)})")
+        log("\n" + "=" * 50)
+        log("📊 백테스팅 결과")
+        log("=" * 50)
+        log(f"초기 자본: {self.initial_balance:,.0f}원")
+        log(f"최종 자본: {final_balance:,.0f}원")
+        log(f"총 수익: {total_return:,.0f}원 ({return_ratio:+.2f}%)")
+        log(f"거래 횟수: {len(self.trades)}회")
+        log(f"승률: {win_rate:.2f}% ({len(win_trades)}/{len(sell_trades)})")
         
         if sell_trades:
             avg_profit = sum(t.get('profit', 0) for t in sell_trades) / len(sell_trades)
-            print(f"평균 수익: {avg_profit:,.0f}원")
+            log(f"평균 수익: {avg_profit:,.0f}원")
         
         # Buy & Hold 전략과 비교
         buy_hold_return = (df.iloc[-1]['close'] / df.iloc[0]['close'] - 1) * 100
-        print(f"\nBuy & Hold 수익률: {buy_hold_return:+.2f}%")
-        print(f"전략 대비: {return_ratio - buy_hold_return:+.2f}%p")
+        log(f"\nBuy & Hold 수익률: {buy_hold_return:+.2f}%")
+        log(f"전략 대비: {return_ratio - buy_hold_return:+.2f}%p")
         
         return {
             'initial_balance': self.initial_balance,
@@ -210,8 +156,50 @@ class Backtester:
             'return_ratio': return_ratio,
             'trades': self.trades,
             'win_rate': win_rate,
-            'buy_hold_return': buy_hold_return
+            'buy_hold_return': buy_hold_return,
+            'equity': pd.Series(result['equity'], index=df.index)
+        }
+    
+    @staticmethod
+    def _trade_from_record(record, date):
+        """
+        엔진 거래 레코드 → 거래 딕셔너리
+        """
+        trade = {
+            'date': date,
+            'type': TRADE_TYPES[record['type']],
+            'price': float(record['price']),
+            'quantity': float(record['quantity']),
+            'balance': float(record['balance'])
         }
+        
+        if record['type'] != BUY:
+            trade['profit'] = float(record['profit'])
+            trade['profit_ratio'] = float(record['profit_ratio'])
+        
+        return trade
+    
+    @staticmethod
+    def _print_trade(trade):
+        """
+        거래 한 줄 출력
+        """
+        date = trade['date'].strftime('%Y-%m-%d')
+        price = trade['price']
+        
+        if trade['type'] == 'buy':
+            print(f"📈 매수: {date} {price:,.0f}원")
+            return
+        
+        profit = trade['profit']
+        ratio = trade['profit_ratio'] * 100
+        
+        if trade['type'] == 'sell':
+            print(f"📉 매도: {date} {price:,.0f}원 (수익: {profit:,.0f}원, {ratio:.2f}%)")
+        elif trade['type'] == 'stop_loss':
+            print(f"🔻 손절: {date} {price:,.0f}원 (손실: {profit:,.0f}원, {ratio:.2f}%)")
+        else:
+            print(f"🔺 익절: {date} {price:,.0f}원 (수익: {profit:,.0f}원, {ratio:.2f}%)")
 
 
 if __name__ == "__main__":
@@ -227,8 +215,8 @@ if __name__ == "__main__":
     print(f"   시간봉: {config.INTERVAL}")
     print()
     
-    # 백테스터 생성
-    backtester = Backtester(strategy, initial_balance=1000000)
+    # 백테스터 생성 (캔들은 로컬 저장소에서 재사용)
+    backtester = Backtester(strategy, initial_balance=1000000, data_source=CandleStore())
     
     # 백테스팅 실행
     result = backtester.run(
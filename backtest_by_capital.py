@@ -3,17 +3,46 @@
 슬리피지(체결가 차이) 포함
 """
 import pyupbit
+import numpy as np
 import pandas as pd
 from strategies import Strategy1_MeanReversion
+from candle_store import CandleStore, candle_count
+from backtest_engine import RunConfig
 import config
 
+def calculate_slippage(amount):
+    """
+    거래 금액에 따른 슬리피지 계산
+    
+    100만원 이하: 0.05%
+    500만원: 0.15%
+    1000만원: 0.3%
+    """
+    if amount < 1_000_000:
+        return 0.0005  # 0.05%
+    elif amount < 5_000_000:
+        # 100만~500만: 선형 보간
+        ratio = (amount - 1_000_000) / 4_000_000
+        return 0.0005 + (0.001 * ratio)  # 0.05% ~ 0.15%
+    elif amount < 10_000_000:
+        # 500만~1000만: 선형 보간
+        ratio = (amount - 5_000_000) / 5_000_000
+        return 0.0015 + (0.0015 * ratio)  # 0.15% ~ 0.3%
+    else:
+        # 1000만 이상
+        excess = (amount - 10_000_000) / 10_000_000
+        return 0.003 + (excess * 0.001)  # 0.3% + α
+
+
 class BacktesterWithSlippage:
     """
     슬리피지를 고려한 백테스터
     """
     
-    def __init__(self, strategy, initial_balance=1000000):
+    def __init__(self, strategy, initial_balance=1000000, data_source=None, run_config=None):
         self.strategy = strategy
+        self.data_source = data_source or pyupbit  # pyupbit 또는 CandleStore
+        self.run_config = run_config  # None이면 config 모듈 설정
         self.initial_balance = initial_balance
         self.balance = initial_balance
         self.position = None
@@ -22,197 +51,235 @@ class BacktesterWithSlippage:
         
     def calculate_slippage(self, amount):
         """
-        거래 금액에 따른 슬리피지 계산
-        
-        100만원 이하: 0.05%
-        500만원: 0.15%
-        1000만원: 0.3%
+        거래 금액에 따른 슬리피지 계산 (calculate_slippage와 같음)
+        """
+        return calculate_slippage(amount)
+    
+    def calculate_slippage_array(self, amounts):
+        """
+        calculate_slippage의 배열 버전 (자본 축 전체를 한 번에 계산)
         """
-        if amount < 1_000_000:
-            return 0.0005  # 0.05%
-        elif amount < 5_000_000:
-            # 100만~500만: 선형 보간
-            ratio = (amount - 1_000_000) / 4_000_000
-            return 0.0005 + (0.001 * ratio)  # 0.05% ~ 0.15%
-        elif amount < 10_000_000:
-            # 500만~1000만: 선형 보간
-            ratio = (amount - 5_000_000) / 5_000_000
-            return 0.0015 + (0.0015 * ratio)  # 0.15% ~ 0.3%
-        else:
-            # 1000만 이상
-            excess = (amount - 10_000_000) / 10_000_000
-            return 0.003 + (excess * 0.001)  # 0.3% + α
+        amounts = np.asarray(amounts, dtype=np.float64)
+        return np.select(
+            [amounts < 1_000_000, amounts < 5_000_000, amounts < 10_000_000],
+            [
+                np.full(amounts.shape, 0.0005),
+                0.0005 + (0.001 * ((amounts - 1_000_000) / 4_000_000)),
+                0.0015 + (0.0015 * ((amounts - 5_000_000) / 5_000_000)),
+            ],
+            0.003 + (((amounts - 10_000_000) / 10_000_000) * 0.001)
+        )
     
     def run(self, ticker, start_date, end_date, interval="day"):
-        # 데이터 가져오기
-        df = pyupbit.get_ohlcv(ticker, interval=interval, to=end_date)
+        """
+        백테스팅 실행 (초기 자본 1개)
+        
+        Returns:
+            결과 딕셔너리
+        """
+        results = self.run_capitals(ticker, start_date, end_date, [self.initial_balance], interval)
+        if results is None:
+            return None
+        
+        result = results[0]
+        self.trades = result['trades']
+        self.balance = result['cash']
+        return result
+    
+    def run_capitals(self, ticker, start_date, end_date, capitals, interval="day"):
+        """
+        여러 초기 자본을 봉 순회 한 번으로 백테스팅
+        
+        매매 신호는 자본과 무관하므로 한 번만 계산하고,
+        자본별 현금/포지션/슬리피지는 자본 축 배열로 함께 갱신한다.
+        (슬리피지가 진입가를 바꾸므로 손절/익절 시점은 자본마다 다를 수 있음)
+        
+        Args:
+            ticker: 티커
+            start_date: 시작일 (YYYYMMDD)
+            end_date: 종료일 (YYYYMMDD)
+            capitals: 초기 자본 목록
+            interval: 주기
+            
+        Returns:
+            capitals 순서대로 결과 딕셔너리 목록 (데이터가 없으면 None)
+        """
+        run_config = self.run_config or RunConfig.from_config()
+        
+        # 데이터 가져오기 (기간 전체, 200개 초과는 페이지 단위)
+        count = candle_count(interval, start_date, end_date)
+        df = self.data_source.get_ohlcv(ticker, interval=interval, to=end_date, count=count)
         if df is None:
             return None
         
         df = df[start_date:end_date]
         df.columns = [col.lower() for col in df.columns]
         df = self.strategy.calculate_indicators(df)
+        signals = self.strategy.generate_signals(df)
+        
+        close = df['close'].to_numpy(dtype=np.float64)
+        buy_index = np.flatnonzero(np.asarray(signals) == 'buy')
+        
+        # 자본 축 상태
+        initial = np.array(capitals, dtype=np.float64)
+        balance = initial.copy()
+        position = np.zeros(len(initial))
+        entry_price = np.zeros(len(initial))
+        holding = np.zeros(len(initial), dtype=bool)
+        trades = [[] for _ in capitals]
         
         # 백테스팅
-        for i in range(len(df)):
-            if i < 30:
-                continue
+        i = 30
+        while i < len(df):
+            # 모두 현금이면 다음 매수 신호로 건너뛰기
+            if not holding.any():
+                j = np.searchsorted(buy_index, i)
+                if j == len(buy_index):
+                    break
+                i = int(buy_index[j])
             
-            current_df = df.iloc[:i+1]
-            signal = self.strategy.generate_signal(current_df)
-            current_price = df.iloc[i]['close']
+            current_price = close[i]
             current_date = df.index[i]
             
-            # 매수
-            if signal == 'buy' and self.position is None:
-                invest_amount = self.balance * config.INVEST_RATIO
+            # 매수 (포지션 없는 자본만)
+            if signals[i] == 'buy' and not holding.all():
+                buyers = np.flatnonzero(~holding)
+                invest_amount = balance[buyers] * run_config.invest_ratio
                 
                 # 슬리피지 적용
-                slippage = self.calculate_slippage(invest_amount)
+                slippage = self.calculate_slippage_array(invest_amount)
                 actual_price = current_price * (1 + slippage)
-                
                 quantity = invest_amount / actual_price
                 
-                self.position = quantity
-                self.entry_price = actual_price
-                self.balance -= invest_amount
+                position[buyers] = quantity
+                entry_price[buyers] = actual_price
+                balance[buyers] -= invest_amount
+                holding[buyers] = True
                 
-                self.trades.append({
-                    'date': current_date,
-                    'type': 'buy',
-                    'price': current_price,
-                    'actual_price': actual_price,
-                    'slippage': slippage,
-                    'quantity': quantity,
-                    'balance': self.balance
-                })
-            
-            # 손절/익절
-            if self.position is not None:
-                current_profit_ratio = (current_price - self.entry_price) / self.entry_price
-                
-                # 손절
-                if config.STOP_LOSS > 0 and current_profit_ratio <= -config.STOP_LOSS:
-                    sell_amount = self.position * current_price
-                    
-                    # 슬리피지 적용 (매도는 반대)
-                    slippage = self.calculate_slippage(sell_amount)
-                    actual_price = current_price * (1 - slippage)
-                    
-                    profit = self.position * (actual_price - self.entry_price)
-                    
-                    self.balance += self.position * actual_price
-                    
-                    self.trades.append({
+                for k, c in enumerate(buyers):
+                    trades[c].append({
                         'date': current_date,
-                        'type': 'stop_loss',
+                        'type': 'buy',
                         'price': current_price,
-                        'actual_price': actual_price,
-                        'slippage': slippage,
-                        'quantity': self.position,
-                        'balance': self.balance,
-                        'profit': profit,
-                        'profit_ratio': profit / (self.position * self.entry_price)
+                        'actual_price': actual_price[k],
+                        'slippage': slippage[k],
+                        'quantity': quantity[k],
+                        'balance': balance[c]
                     })
-                    
-                    self.position = None
-                    self.entry_price = 0
+            
+            # 손절/익절
+            if holding.any():
+                current_profit_ratio = (current_price - entry_price) / np.where(holding, entry_price, 1)
+                
+                is_stop = holding & (run_config.stop_loss > 0) & (current_profit_ratio <= -run_config.stop_loss)
+                is_take = holding & ~is_stop & (current_profit_ratio >= run_config.take_profit)
+                sellers = np.flatnonzero(is_stop | is_take)
                 
-                # 익절
-                elif current_profit_ratio >= config.TAKE_PROFIT:
-                    sell_amount = self.position * current_price
+                if len(sellers):
+                    quantity = position[sellers]
+                    sell_amount = quantity * current_price
                     
-                    # 슬리피지 적용
-                    slippage = self.calculate_slippage(sell_amount)
+                    # 슬리피지 적용 (매도는 반대)
+                    slippage = self.calculate_slippage_array(sell_amount)
                     actual_price = current_price * (1 - slippage)
                     
-                    profit = self.position * (actual_price - self.entry_price)
+                    profit = quantity * (actual_price - entry_price[sellers])
+                    balance[sellers] += quantity * actual_price
                     
-                    self.balance += self.position * actual_price
+                    for k, c in enumerate(sellers):
+                        trades[c].append({
+                            'date': current_date,
+                            'type': 'stop_loss' if is_stop[c] else 'take_profit',
+                            'price': current_price,
+                            'actual_price': actual_price[k],
+                            'slippage': slippage[k],
+                            'quantity': quantity[k],
+                            'balance': balance[c],
+                            'profit': profit[k],
+                            'profit_ratio': profit[k] / (quantity[k] * entry_price[c])
+                        })
                     
-                    self.trades.append({
-                        'date': current_date,
-                        'type': 'take_profit',
-                        'price': current_price,
-                        'actual_price': actual_price,
-                        'slippage': slippage,
-                        'quantity': self.position,
-                        'balance': self.balance,
-                        'profit': profit,
-                        'profit_ratio': profit / (self.position * self.entry_price)
-                    })
-                    
-                    self.position = None
-                    self.entry_price = 0
+                    position[sellers] = 0
+                    entry_price[sellers] = 0
+                    holding[sellers] = False
+            
+            i += 1
         
         # 최종 자산
-        final_balance = self.balance
-        if self.position:
-            final_balance += self.position * df.iloc[-1]['close']
+        final_balance = balance + np.where(holding, position * close[-1], 0) if len(close) else balance
         
-        # 통계
-        total_return = final_balance - self.initial_balance
-        return_ratio = (total_return / self.initial_balance) * 100
-        
-        completed_trades = [t for t in self.trades if t['type'] in ['stop_loss', 'take_profit']]
-        wins = [t for t in completed_trades if t.get('profit', 0) > 0]
-        win_rate = (len(wins) / len(completed_trades) * 100) if completed_trades else 0
-        
-        # 평균 슬리피지
-        avg_slippage = sum(t['slippage'] for t in self.trades) / len(self.trades) if self.trades else 0
+        results = []
+        for c, capital in enumerate(capitals):
+            # 통계
+            total_return = float(final_balance[c]) - capital
+            return_ratio = (total_return / capital) * 100
+            
+            completed_trades = [t for t in trades[c] if t['type'] in ['stop_loss', 'take_profit']]
+            wins = [t for t in completed_trades if t.get('profit', 0) > 0]
+            win_rate = (len(wins) / len(completed_trades) * 100) if completed_trades else 0
+            
+            # 평균 슬리피지
+            avg_slippage = sum(t['slippage'] for t in trades[c]) / len(trades[c]) if trades[c] else 0
+            
+            results.append({
+                'initial_balance': capital,
+                'final_balance': float(final_balance[c]),
+                'cash': float(balance[c]),
+                'total_return': total_return,
+                'return_ratio': return_ratio,
+                'trades': trades[c],
+                'win_rate': win_rate,
+                'avg_slippage': avg_slippage * 100  # %로 표시
+            })
         
-        return {
-            'initial_balance': self.initial_balance,
-            'final_balance': final_balance,
-            'total_return': total_return,
-            'return_ratio': return_ratio,
-            'trades': self.trades,
-            'win_rate': win_rate,
-            'avg_slippage': avg_slippage * 100  # %로 표시
-        }
-
-
-# 테스트
-print("=" * 80)
-print("💰 초기 자본 규모별 백테스팅 (슬리피지 포함)")
-print("=" * 80)
-print()
-
-capitals = [
-    ("50만원", 500_000),
-    ("100만원", 1_000_000),
-    ("500만원", 5_000_000),
-    ("1000만원", 10_000_000),
-]
-
-# RSI 30 전략
-params = config.STRATEGY_PARAMS.copy()
-params['rsi_oversold'] = 30
-
-results = []
-
-for name, capital in capitals:
-    print(f"\n{'=' * 60}")
-    print(f"💰 초기 자본: {name} ({capital:,}원)")
-    print('=' * 60)
-    
+        return results
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("💰 초기 자본 규모별 백테스팅 (슬리피지 포함)")
+    print("=" * 80)
+    print()
+
+    capitals = [
+        ("50만원", 500_000),
+        ("100만원", 1_000_000),
+        ("500만원", 5_000_000),
+        ("1000만원", 10_000_000),
+    ]
+
+    # RSI 30 전략
+    params = config.STRATEGY_PARAMS.copy()
+    params['rsi_oversold'] = 30
+
+    results = []
+
+    # 캔들은 로컬 저장소에서 재사용 (새 캔들만 다운로드)
+    store = CandleStore()
+
+    # 자본 규모 전체를 한 번에 (신호/지표는 한 번만 계산)
     strategy = Strategy1_MeanReversion(params)
-    backtester = BacktesterWithSlippage(strategy, initial_balance=capital)
-    
-    result = backtester.run(
+    backtester = BacktesterWithSlippage(strategy, data_source=store)
+
+    capital_results = backtester.run_capitals(
         ticker="KRW-BTC",
         start_date="20251117",
         end_date="20260217",
+        capitals=[capital for _, capital in capitals],
         interval="day"
-    )
-    
-    if result:
+    ) or []
+
+    for (name, capital), result in zip(capitals, capital_results):
+        print(f"\n{'=' * 60}")
+        print(f"💰 초기 자본: {name} ({capital:,}원)")
+        print('=' * 60)
+
         print(f"최종 자산: {result['final_balance']:,.0f}원")
         print(f"수익: {result['total_return']:+,.0f}원 ({result['return_ratio']:+.2f}%)")
         print(f"거래 횟수: {len([t for t in result['trades'] if t['type'] == 'buy'])}회")
         print(f"승률: {result['win_rate']:.1f}%")
         print(f"평균 슬리피지: {result['avg_slippage']:.3f}%")
-        
+
         results.append({
             'name': name,
             'capital': capital,
@@ -224,28 +291,28 @@ for name, capital in capitals:
             'slippage': result['avg_slippage']
         })
 
-# 비교표
-print("\n\n")
-print("=" * 100)
-print("📊 자본 규모별 비교")
-print("=" * 100)
-print()
-print(f"{'자본':<12} {'최종자산':<18} {'수익':<18} {'수익률':<12} {'거래':<8} {'승률':<8} {'슬리피지'}")
-print("-" * 100)
-
-for r in results:
-    print(f"{r['name']:<12} {r['final']:>15,}원 {r['profit']:>+15,}원 {r['ratio']:>+8.2f}% {r['trades']:>5}회 {r['win_rate']:>6.1f}% {r['slippage']:>8.3f}%")
-
-print()
-print("💡 결론")
-print("-" * 100)
-
-# 절대 수익 비교
-print(f"절대 수익:")
-for r in results:
-    print(f"  {r['name']}: {r['profit']:+,}원")
-
-print()
-print(f"수익률 (슬리피지 영향):")
-for r in results:
-    print(f"  {r['name']}: {r['ratio']:+.2f}%")
+    # 비교표
+    print("\n\n")
+    print("=" * 100)
+    print("📊 자본 규모별 비교")
+    print("=" * 100)
+    print()
+    print(f"{'자본':<12} {'최종자산':<18} {'수익':<18} {'수익률':<12} {'거래':<8} {'승률':<8} {'슬리피지'}")
+    print("-" * 100)
+
+    for r in results:
+        print(f"{r['name']:<12} {r['final']:>15,}원 {r['profit']:>+15,}원 {r['ratio']:>+8.2f}% {r['trades']:>5}회 {r['win_rate']:>6.1f}% {r['slippage']:>8.3f}%")
+
+    print()
+    print("💡 결론")
+    print("-" * 100)
+
+    # 절대 수익 비교
+    print(f"절대 수익:")
+    for r in results:
+        print(f"  {r['name']}: {r['profit']:+,}원")
+
+    print()
+    print(f"수익률 (슬리피지 영향):")
+    for r in results:
+        print(f"  {r['name']}: {r['ratio']:+.2f}%")
@@ -0,0 +1,212 @@
+"""
+배열 기반 백테스트 엔진
+종가/신호 NumPy 배열 위에서 롱 전용 매매 상태 머신 실행
+(DataFrame 행 순회, dict 추가, 출력 없이 → 분봉 1년치도 1초 이내)
+"""
+import numpy as np
+
+
+class RunConfig:
+    """
+    백테스트 1회 실행 설정 (config 전역값 대신 명시적으로 전달)
+
+    Args:
+        invest_ratio: 매수 시 현금 대비 투자 비율
+        stop_loss: 손절 비율 (0이면 손절 없음)
+        take_profit: 익절 비율
+    """
+
+    def __init__(self, invest_ratio, stop_loss, take_profit):
+        self.invest_ratio = invest_ratio
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+
+    @classmethod
+    def from_config(cls):
+        """
+        config 모듈의 현재 설정으로 생성
+        """
+        import config
+        return cls(config.INVEST_RATIO, config.STOP_LOSS, config.TAKE_PROFIT)
+
+    @classmethod
+    def for_strategy(cls, strategy_num):
+        """
+        전략별 손익 설정(config.STRATEGY_SETTINGS)으로 생성
+        """
+        import config
+        settings = config.STRATEGY_SETTINGS[strategy_num]
+        return cls(config.INVEST_RATIO, settings['stop_loss'], settings['take_profit'])
+
+    def __repr__(self):
+        return (f"RunConfig(invest_ratio={self.invest_ratio}, "
+                f"stop_loss={self.stop_loss}, take_profit={self.take_profit})")
+
+
+# 거래 종류 코드 (TRADE_TYPES[code] → Backtester의 'type' 문자열)
+BUY = 0
+SELL = 1
+STOP_LOSS = 2
+TAKE_PROFIT = 3
+TRADE_TYPES = ('buy', 'sell', 'stop_loss', 'take_profit')
+
+# 거래 기록 레코드 배열 형식
+TRADE_DTYPE = np.dtype([
+    ('index', np.int64),         # 봉 위치
+    ('type', np.int8),           # 거래 종류 코드
+    ('price', np.float64),       # 체결가
+    ('quantity', np.float64),    # 수량
+    ('balance', np.float64),     # 거래 후 현금
+    ('profit', np.float64),      # 손익 (매수는 0)
+    ('profit_ratio', np.float64),
+])
+
+
+def signal_codes(signals):
+    """
+    신호 배열 → 정수 코드 (buy: 1, sell: -1, hold: 0)
+
+    Args:
+        signals: 'buy'/'sell'/'hold' 배열 또는 정수 코드 배열
+    """
+    signals = np.asarray(signals)
+    if signals.dtype.kind in 'iub':
+        return signals.astype(np.int8)
+
+    return np.where(signals == 'buy', 1, np.where(signals == 'sell', -1, 0)).astype(np.int8)
+
+
+def _find_exit(close, codes, entry_index, entry_price, stop_loss, take_profit):
+    """
+    진입 이후 첫 청산 봉 찾기 (점점 큰 구간으로 벡터 탐색)
+
+    진입 봉은 손절/익절만, 이후 봉은 매도 신호 → 손절 → 익절 순으로 본다.
+
+    Returns:
+        (봉 위치, 거래 종류, 손익률) 또는 청산이 없으면 None
+    """
+    n = len(close)
+    start = entry_index
+    window = 64
+
+    while start < n:
+        end = min(start + window, n)
+        price = close[start:end]
+        ratio = (price - entry_price) / entry_price
+
+        is_sell = codes[start:end] == -1
+        if start == entry_index:
+            is_sell[0] = False  # 매수한 봉에서는 신호 매도 없음
+        is_stop = (ratio <= -stop_loss) if stop_loss > 0 else np.zeros(len(price), dtype=bool)
+        is_take = ratio >= take_profit
+
+        hit = np.flatnonzero(is_sell | is_stop | is_take)
+        if len(hit):
+            k = hit[0]
+            if is_sell[k]:
+                return start + k, SELL, ratio[k]
+            if is_stop[k]:
+                return start + k, STOP_LOSS, ratio[k]
+            return start + k, TAKE_PROFIT, ratio[k]
+
+        start = end
+        window *= 2
+
+    return None
+
+
+def run_backtest_arrays(close, signals, stop_loss, take_profit, invest_ratio,
+                        initial_balance=1000000, start=30):
+    """
+    배열 기반 백테스트 (Backtester.run 과 같은 매매 규칙)
+
+    - 보유 없음 + 매수 신호 → 현금 × invest_ratio 매수
+    - 보유 중 + 매도 신호 → 전량 매도
+    - 보유 중 손익률 ≤ -stop_loss → 손절 (stop_loss가 0이면 손절 없음)
+    - 보유 중 손익률 ≥ take_profit → 익절
+    - 마지막 봉에 남은 포지션은 종가로 평가
+
+    Args:
+        close: 종가 배열
+        signals: 봉별 신호 배열 ('buy'/'sell'/'hold' 또는 1/-1/0)
+        stop_loss: 손절 비율 (예: 0.015)
+        take_profit: 익절 비율 (예: 0.07)
+        invest_ratio: 매수 시 현금 대비 투자 비율
+        initial_balance: 초기 자본금
+        start: 매매를 시작할 봉 위치 (지표 워밍업)
+
+    Returns:
+        {'trades': TRADE_DTYPE 레코드 배열, 'equity': 봉별 평가 자산 배열,
+         'final_balance': 최종 자산}
+    """
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    codes = signal_codes(signals)
+    n = len(close)
+
+    buy_index = np.flatnonzero(codes == 1)
+
+    rows = []
+    balance = float(initial_balance)
+    quantity = 0.0
+    i = start
+
+    while i < n:
+        # 다음 매수 신호로 건너뛰기
+        j = np.searchsorted(buy_index, i)
+        if j == len(buy_index):
+            break
+        i = int(buy_index[j])
+
+        entry_price = float(close[i])
+        invest_amount = balance * invest_ratio
+        quantity = invest_amount / entry_price
+        balance -= invest_amount
+        rows.append((i, BUY, entry_price, quantity, balance, 0.0, 0.0))
+
+        found = _find_exit(close, codes, i, entry_price, stop_loss, take_profit)
+        if found is None:
+            break
+
+        k, trade_type, ratio = found
+        price = float(close[k])
+        sell_amount = quantity * price
+        cost = quantity * entry_price
+        profit = sell_amount - cost
+        profit_ratio = profit / cost if trade_type == SELL else float(ratio)
+
+        balance += sell_amount
+        rows.append((k, trade_type, price, quantity, balance, profit, profit_ratio))
+
+        quantity = 0.0
+        i = k + 1
+
+    trades = np.array(rows, dtype=TRADE_DTYPE)
+    equity = equity_curve(close, trades, initial_balance)
+
+    final_balance = balance
+    if quantity and n:
+        final_balance += quantity * close[-1]
+
+    return {
+        'trades': trades,
+        'equity': equity,
+        'final_balance': final_balance,
+    }
+
+
+def equity_curve(close, trades, initial_balance):
+    """
+    거래 기록으로 봉별 평가 자산(현금 + 보유 코인 × 종가) 계산
+    """
+    n = len(close)
+    if len(trades) == 0:
+        return np.full(n, float(initial_balance))
+
+    # 봉마다 그 봉까지의 마지막 거래
+    last = np.searchsorted(trades['index'], np.arange(n), side='right') - 1
+
+    cash = np.where(last >= 0, trades['balance'][last], initial_balance)
+    holding = (last >= 0) & (trades['type'][last] == BUY)
+    quantity = np.where(holding, trades['quantity'][last], 0.0)
+
+    return cash + quantity * close
@@ -0,0 +1,125 @@
+"""
+다중 기간 지표 일괄 계산 (지표 파라미터 스윕용)
+RSI 기간 목록, MACD (fast, slow, signal) 조합 목록을
+종가 한 번 순회로 2차원 NumPy 배열(조합 × 봉)로 계산한다.
+(ta 라이브러리 RSIIndicator / MACD와 같은 값, 허용 오차 내)
+"""
+import numpy as np
+
+
+def ema_rows(values, alphas, min_periods, block=32):
+    """
+    행마다 다른 alpha로 지수이동평균 (pandas ewm(adjust=False)와 같은 재귀식)
+
+    각 행은 처음 NaN이 아닌 값부터 누적하고, 관측 개수가 min_periods 미만이면 NaN.
+    재귀식을 block개 봉 단위 행렬곱으로 풀어 모든 행을 함께 계산한다
+    (봉마다 파이썬 루프를 돌지 않음, 가중치는 모두 1 이하라 수치적으로 안정).
+
+    Args:
+        values: (행 개수, 봉 개수) 배열 또는 1차원 배열 (모든 행이 같은 입력)
+        alphas: 행별 평활 계수
+        min_periods: 행별 최소 관측 개수
+        block: 한 번에 푸는 봉 개수
+
+    Returns:
+        (행 개수, 봉 개수) 배열
+    """
+    alphas = np.asarray(alphas, dtype=np.float64)
+    min_periods = np.asarray(min_periods)
+    rows = len(alphas)
+
+    values = np.asarray(values, dtype=np.float64)
+    n = values.shape[-1]
+
+    # 행별 시작 봉 (앞쪽 NaN 건너뛰기)
+    observed = ~np.isnan(values)
+    start = np.where(observed.any(axis=-1), observed.argmax(axis=-1), n)
+    start = np.broadcast_to(start, (rows,))
+
+    # 블록 단위로 자른 입력 (NaN은 0, 시작 봉은 x/alpha → 상태 0에서 y[start] = x[start])
+    blocks = -(-n // block)
+    padded = np.zeros((rows, blocks * block))
+    padded[:, :n] = np.where(observed, values, 0.0)
+    seeded = np.flatnonzero(start < n)
+    padded[seeded, start[seeded]] /= alphas[seeded]
+
+    # 블록 안 재귀식: y[j] = keep^(j+1) * y[-1] + Σ_{i<=j} alpha * keep^(j-i) * x[i]
+    keep = 1 - alphas
+    steps = np.arange(block)
+    lag = steps[:, None] - steps[None, :]
+    weights = np.where(lag >= 0, alphas[:, None, None] * keep[:, None, None] ** np.maximum(lag, 0), 0.0)
+    carry = keep[:, None] ** (steps + 1)
+
+    # 1) 모든 블록을 상태 0에서 한 번의 배치 행렬곱으로 계산
+    local = np.matmul(padded.reshape(rows, blocks, block), weights.transpose(0, 2, 1))
+
+    # 2) 블록 경계 상태만 순차 전파 (블록 개수만큼, 행 전체를 함께)
+    state = np.zeros((rows, blocks))
+    for b in range(1, blocks):
+        state[:, b] = carry[:, -1] * state[:, b - 1] + local[:, b - 1, -1]
+
+    local += carry[:, None, :] * state[:, :, None]
+    out = local.reshape(rows, -1)[:, :n]
+
+    # 관측 개수 부족 구간은 NaN
+    for row, valid_from in enumerate(start + min_periods - 1):
+        out[row, :valid_from] = np.nan
+    return out
+
+
+def rsi_batch(close, periods):
+    """
+    여러 기간 RSI (Wilder) 한 번에 계산
+
+    Args:
+        close: 종가 배열
+        periods: RSI 기간 목록 (예: [7, 14, 21])
+
+    Returns:
+        (기간 개수, 봉 개수) 배열 - 행 순서는 periods와 같음
+    """
+    close = np.asarray(close, dtype=np.float64)
+    periods = np.asarray(periods)
+
+    # 첫 봉 변화량은 0 (ta와 동일)
+    diff = np.diff(close, prepend=close[:1])
+    up = np.where(diff > 0, diff, 0.0)
+    down = np.where(diff < 0, -diff, 0.0)
+
+    alphas = 1.0 / periods
+    ema_up = ema_rows(up, alphas, periods)
+    ema_down = ema_rows(down, alphas, periods)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - 100 / (1 + ema_up / ema_down)
+    return np.where(ema_down == 0, 100.0, rsi)
+
+
+def macd_batch(close, triples):
+    """
+    여러 (fast, slow, signal) 조합 MACD 한 번에 계산
+
+    fast/slow EMA는 중복 없는 기간만 한 번씩 계산해 조합끼리 공유한다.
+
+    Args:
+        close: 종가 배열
+        triples: (fast, slow, signal) 목록
+
+    Returns:
+        (macd, macd_signal, macd_diff) - 각각 (조합 개수, 봉 개수) 배열
+    """
+    close = np.asarray(close, dtype=np.float64)
+    triples = [tuple(t) for t in triples]
+
+    spans = sorted({span for fast, slow, _ in triples for span in (fast, slow)})
+    span_row = {span: i for i, span in enumerate(spans)}
+    ema = ema_rows(close, [2 / (span + 1) for span in spans], spans)
+
+    macd = np.array([ema[span_row[fast]] - ema[span_row[slow]] for fast, slow, _ in triples])
+    macd = macd.reshape(len(triples), len(close))
+
+    # 신호선은 MACD 값이 나온 봉부터 누적
+    signal_spans = np.array([signal for _, _, signal in triples])
+    macd_signal = ema_rows(macd, 2 / (signal_spans + 1), signal_spans)
+
+    return macd, macd_signal, macd - macd_signal
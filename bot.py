@@ -4,34 +4,73 @@
 - 실시간 매매
 - 손절/익절 자동화
 """
-import time
-import pyupbit
+import threading
 import pandas as pd
 from datetime import datetime
 import config
 from strategies import STRATEGIES, STRATEGY_CONFIGS
+from streaming_indicators import StreamingIndicators
+from upbit_client import UpbitClient, UpbitAPIError, tick_price
+from ticker_feed import TickerFeed
+from candle_clock import CandleScheduler, SystemClock, to_kst
+from candle_window import CandleWindow
+from notifier import TelegramNotifier
+from paper_trading import PaperTrader
+from account_cache import AccountCache
+from order_tracker import OrderTracker
 
 
 class TradingBot:
-    def __init__(self, access_key=None, secret_key=None):
+    EXIT_RETRY_SEC = 5  # 청산 주문 실패 후 재시도 간격 (초)
+    ORDER_CHECK_SEC = 2  # 익절 지정가 주문 체결 확인 간격 (초)
+    ORDER_WAIT_SEC = 5  # 매수 체결 확인 최대 대기 (초, 넘으면 현재가를 진입가로)
+    ACCOUNT_REFRESH_SEC = 30  # 계좌 스냅샷 최대 나이 (초, 백그라운드는 절반마다 갱신)
+    THROTTLE_RETRY_SEC = 1  # 429 응답 뒤 다시 시도까지 (초)
+    
+    def __init__(self, access_key=None, secret_key=None, client=None, price_feed=None, notifier=None, paper=None,
+                 clock=None, take_profit_order=None, market_data=None):
         """
         초기화
         
         Args:
             access_key: 업비트 Access Key
             secret_key: 업비트 Secret Key
+            client: 시세/잔고/주문 UpbitClient (기본값: 업비트 API, 테스트는 모의 거래소)
+            price_feed: 웹소켓 TickerFeed (기본값: run에서 생성)
+            notifier: 텔레그램 알림 TelegramNotifier (기본값: config의 토큰/채팅 ID)
+            paper: 테스트 모드 모의투자 PaperTrader (기본값: data/paper 원장)
+            clock: 시계 (기본값: 실제 시각, 리플레이는 VirtualClock)
+            take_profit_order: 매수 직후 익절가 지정가 매도 주문 (기본값: config.TAKE_PROFIT_ORDER)
+            market_data: 시세 데몬 구독 MarketDataClient (주면 캔들/현재가/체결가를 업비트 대신 데몬에서)
         """
+        self.clock = clock or SystemClock()
         self.access_key = access_key or config.UPBIT_ACCESS_KEY
         self.secret_key = secret_key or config.UPBIT_SECRET_KEY
         
-        # API 연결
-        if self.access_key and self.secret_key:
-            self.upbit = pyupbit.Upbit(self.access_key, self.secret_key)
+        # 시세/잔고/주문 모두 keep-alive 연결 풀 하나로 (모의 거래소는 base_url만 바꿈)
+        self.client = client or UpbitClient(self.access_key, self.secret_key)
+        
+        # 시세(캔들/현재가) 원본 (구독 모드면 데몬, 업비트에는 주문/잔고만)
+        self.market = market_data or self.client
+        
+        # API 연결 (테스트 모드는 가상 계좌로 체결, 실전 주문은 키가 있을 때만)
+        if config.TRADING_MODE == 'test':
+            self.upbit = paper or PaperTrader(price_source=self.get_current_price)
+            print(f"🧪 모의투자 계좌: {self.upbit.get_balance('KRW'):,.0f}원")
+        elif self.access_key and self.secret_key:
+            self.upbit = self.client
             print("✅ 업비트 API 연결 성공")
         else:
             self.upbit = None
             print("⚠️ API 키가 없습니다. 읽기 전용 모드로 실행됩니다.")
         
+        # 잔고는 계좌 스냅샷에서 (get_balances 1번, 주기적 + 체결 직후 갱신)
+        self.account = AccountCache(self.upbit, max_age=self.ACCOUNT_REFRESH_SEC, clock=self.clock.time) \
+            if self.upbit else None
+        
+        # 주문 체결가/수량/수수료는 백그라운드에서 주문 체결 내역으로 확인
+        self.orders = OrderTracker(self.upbit) if self.upbit else None
+        
         # 전략 설정
         strategy_num = config.SELECTED_STRATEGY
         strategy_class = STRATEGIES.get(strategy_num)
@@ -44,18 +83,48 @@ class TradingBot:
         self.strategy = strategy_class(config.STRATEGY_PARAMS)
         self.strategy_config = STRATEGY_CONFIGS[strategy_num]
         
+        # 지표는 봉마다 누적 갱신 (매 루프 전체 재계산 대신)
+        self.indicators = StreamingIndicators(config.STRATEGY_PARAMS)
+        
+        # 전략에 필요한 만큼만 캔들 조회 (진행 중인 봉 포함, 요청 1번 = 최대 200개)
+        self.candle_count = self.strategy.live_candle_count()
+        
+        # 캔들은 시작할 때 한 번만 전체 조회, 이후엔 새 봉만 받아 링 버퍼에 반영
+        self.window = CandleWindow(self.candle_count)
+        self.window_key = None  # (티커, 주기)
+        
         print(f"🎯 전략: #{strategy_num} {self.strategy_config['name']}")
         print(f"   {self.strategy_config['description']}")
         print(f"   손절: {config.STOP_LOSS*100:.1f}% / 익절: {config.TAKE_PROFIT*100:.1f}%")
         
         # 매매 상태
         self.position = None  # 'long', 'short', None
-        self.entry_price = 0
+        self.entry_price = 0  # 평균 체결가 (VWAP, 체결 확인 전에는 0)
         self.entry_time = None
+        self.volume = 0  # 보유 수량 (체결 확인 후)
+        self.entry_fee = 0
+        self.entry_order = None  # 매수 주문 UUID
+        self.entry_deadline = 0  # 이 시각까지 체결 확인이 없으면 현재가를 진입가로
+        self.ticker = None
+        
+        # 체결가 피드 (틱마다 손절/익절), 피드 스레드와 매매 루프가 상태를 함께 쓰므로 잠금
+        self.price_feed = price_feed
+        self.lock = threading.RLock()
+        self.exit_retry_at = 0
+        
+        # 거래소에 걸어 둔 익절 지정가 매도 (체결 여부는 백그라운드에서 주문 상태로 확인)
+        self.take_profit_order = config.TAKE_PROFIT_ORDER if take_profit_order is None else take_profit_order
+        self.take_profit_uuid = None
+        self.take_profit_price = 0
+        self.order_checked_at = 0
+        self.order_watch_stop = threading.Event()
+        
+        # 알림은 백그라운드 전송 (느린 텔레그램 응답이 손절 체크를 막지 않게)
+        self.notifier = notifier or TelegramNotifier.from_config()
         
     def get_balance(self, ticker="KRW"):
         """
-        잔고 조회
+        잔고 조회 (계좌 스냅샷, 주문 직전에 요청하지 않음)
         
         Args:
             ticker: 티커 (기본값: KRW)
@@ -66,9 +135,18 @@ class TradingBot:
         if not self.upbit:
             return 0
         
-        balance = self.upbit.get_balance(ticker)
+        balance = self.account.get_balance(ticker)
         return balance if balance else 0
     
+    def refresh_account(self):
+        """
+        체결/취소 직후 계좌 스냅샷 갱신 (실패해도 다음 주기 갱신에서 복구)
+        """
+        try:
+            self.account.refresh()
+        except Exception as e:
+            print(f"⚠️ 계좌 갱신 실패: {e}")
+    
     def get_current_price(self, ticker):
         """
         현재가 조회
@@ -79,7 +157,10 @@ class TradingBot:
         Returns:
             현재가
         """
-        return pyupbit.get_current_price(ticker)
+        # 웹소켓 체결가가 살아 있으면 요청 없이 사용
+        if self.price_feed and self.price_feed.latest(ticker) is not None:
+            return self.price_feed.latest(ticker)
+        return self.market.get_current_price(ticker)
     
     def get_ohlcv(self, ticker, interval="minute60", count=200):
         """
@@ -93,16 +174,61 @@ class TradingBot:
         Returns:
             DataFrame
         """
-        df = pyupbit.get_ohlcv(ticker, interval=interval, count=count)
-        
+        df = self.market.get_ohlcv(ticker, interval=interval, count=count)
+        return self._normalize_ohlcv(df)
+    
+    @staticmethod
+    def _normalize_ohlcv(df):
+        """
+        빈 응답은 None, 컬럼명은 소문자로
+        """
         if df is None or len(df) == 0:
             return None
         
-        # 컬럼명 소문자로 변경
         df.columns = [col.lower() for col in df.columns]
-        
         return df
     
+    def get_market_snapshot(self, ticker, interval, count):
+        """
+        캔들 + 현재가 동시 조회 (요청 2개를 연결 풀에서 함께 보냄)
+        
+        Returns:
+            (DataFrame 또는 None, 현재가)
+        """
+        df, current_price = self.market.gather(
+            self.market.aio.get_ohlcv(ticker, interval=interval, count=count),
+            self.market.aio.get_current_price(ticker)
+        )
+        return self._normalize_ohlcv(df), current_price
+    
+    def get_window_snapshot(self, ticker, interval):
+        """
+        캔들 창 갱신 + 현재가 (처음엔 candle_count개, 이후엔 마지막 봉부터 새 봉까지만 조회)
+        
+        Returns:
+            (캔들 창 DataFrame 또는 None, 현재가)
+        """
+        key = (ticker, interval)
+        if self.window_key == key and len(self.window) > 0:
+            count = self.window.fetch_count(interval, to_kst(self.clock.time()))
+        else:
+            count = self.candle_count
+        
+        df, current_price = self.get_market_snapshot(ticker, interval, count)
+        if df is None:
+            return None, current_price
+        
+        if self.window_key != key or not self.window.update(df):
+            # 처음이거나 중간이 비었으면 전체 다시 채움
+            if count < self.candle_count:
+                df = self.get_ohlcv(ticker, interval=interval, count=self.candle_count)
+                if df is None:
+                    return None, current_price
+            self.window.seed(df)
+            self.window_key = key
+        
+        return self.window.frame(), current_price
+    
     def buy(self, ticker, amount=None, ratio=None):
         """
         매수
@@ -119,10 +245,6 @@ class TradingBot:
             print("⚠️ API 키가 없어 매수할 수 없습니다.")
             return None
         
-        if config.TRADING_MODE == 'test':
-            print("🧪 [테스트 모드] 실제 매수는 실행되지 않습니다.")
-            return None
-        
         # 매수 금액 계산
         if ratio:
             krw_balance = self.get_balance("KRW")
@@ -135,16 +257,23 @@ class TradingBot:
         # 매수 실행
         try:
             result = self.upbit.buy_market_order(ticker, amount)
+            if result is None:
+                raise RuntimeError("주문이 거절되었습니다.")
             print(f"✅ 매수 주문: {ticker}, {amount:,.0f}원")
             print(f"   주문 UUID: {result['uuid']}")
             
+            # 체결가는 주문 추적이 채움 (그 전까지 entry_price=0 → 손절/익절 판단 보류)
             self.position = 'long'
-            self.entry_price = self.get_current_price(ticker)
-            self.entry_time = datetime.now()
+            self.entry_price = 0
+            self.entry_time = self.clock.now()
+            self.entry_order = result['uuid']
+            self.entry_deadline = self.clock.time() + self.ORDER_WAIT_SEC
             
+            self.orders.track(result, lambda fill, order: self.on_buy_filled(ticker, fill, order))
             return result
         except Exception as e:
             print(f"❌ 매수 실패: {e}")
+            self.refresh_account()
             return None
     
     def sell(self, ticker, amount=None):
@@ -162,8 +291,10 @@ class TradingBot:
             print("⚠️ API 키가 없어 매도할 수 없습니다.")
             return None
         
-        if config.TRADING_MODE == 'test':
-            print("🧪 [테스트 모드] 실제 매도는 실행되지 않습니다.")
+        # 걸어 둔 익절 지정가 주문 먼저 취소 (잠긴 수량 해제)
+        if not self.cancel_take_profit(ticker):
+            if self.position is None:
+                print("ℹ️ 익절 지정가 주문이 이미 체결되었습니다.")
             return None
         
         # 보유 수량 확인
@@ -180,24 +311,31 @@ class TradingBot:
         # 매도 실행
         try:
             result = self.upbit.sell_market_order(ticker, sell_amount)
+            if result is None:
+                raise RuntimeError("주문이 거절되었습니다.")
             print(f"✅ 매도 주문: {ticker}, {sell_amount}개")
             print(f"   주문 UUID: {result['uuid']}")
             
             self.position = None
             self.entry_price = 0
             self.entry_time = None
+            self.volume = 0
+            self.entry_order = None
             
+            self.refresh_account()
             return result
         except Exception as e:
             print(f"❌ 매도 실패: {e}")
+            self.refresh_account()
             return None
     
-    def check_stop_loss(self, ticker):
+    def check_stop_loss(self, ticker, current_price=None):
         """
         손절 체크
         
         Args:
             ticker: 티커
+            current_price: 이미 조회한 현재가 (None이면 조회)
             
         Returns:
             손절 여부
@@ -205,7 +343,8 @@ class TradingBot:
         if self.position != 'long' or self.entry_price == 0:
             return False
         
-        current_price = self.get_current_price(ticker)
+        if current_price is None:
+            current_price = self.get_current_price(ticker)
         loss_ratio = (current_price - self.entry_price) / self.entry_price
         
         if loss_ratio <= -config.STOP_LOSS:
@@ -214,12 +353,13 @@ class TradingBot:
         
         return False
     
-    def check_take_profit(self, ticker):
+    def check_take_profit(self, ticker, current_price=None):
         """
         익절 체크
         
         Args:
             ticker: 티커
+            current_price: 이미 조회한 현재가 (None이면 조회)
             
         Returns:
             익절 여부
@@ -227,7 +367,8 @@ class TradingBot:
         if self.position != 'long' or self.entry_price == 0:
             return False
         
-        current_price = self.get_current_price(ticker)
+        if current_price is None:
+            current_price = self.get_current_price(ticker)
         profit_ratio = (current_price - self.entry_price) / self.entry_price
         
         if profit_ratio >= config.TAKE_PROFIT:
@@ -236,36 +377,305 @@ class TradingBot:
         
         return False
     
-    def send_telegram(self, message):
+    def check_exit(self, ticker, current_price):
+        """
+        손절/익절 판단 후 청산 (REST 루프와 웹소켓 틱에서 공용)
+        
+        Args:
+            ticker: 티커
+            current_price: 현재가
+            
+        Returns:
+            'stop_loss', 'take_profit' 또는 None
         """
-        텔레그램 알림 (선택사항)
+        with self.lock:
+            # 직전 청산 주문이 실패했으면 잠시 뒤 재시도 (틱마다 주문 폭주 방지)
+            if self.clock.time() < self.exit_retry_at:
+                return None
+            
+            # 체결 확인이 계속 실패하면 현재가를 진입가로 (손절/익절 판단이 무한정 보류되지 않게)
+            if self.position == 'long' and self.entry_price == 0 and self.clock.time() >= self.entry_deadline:
+                print(f"⚠️ 체결 확인 지연 → 현재가를 진입가로 사용: {current_price:,.0f}원")
+                self.entry_price = current_price
+                self.refresh_account()  # 매수 체결분 잔고 (보통은 체결 확인에서 갱신)
+            
+            if self.check_stop_loss(ticker, current_price):
+                reason = 'stop_loss'
+            elif self.take_profit_uuid:
+                # 익절 지정가 주문이 걸려 있으면 거래소에서 체결됨 → 가격이 닿았을 때 상태만 확인
+                if current_price >= self.take_profit_price and self.clock.time() >= self.order_checked_at + 1:
+                    self.order_checked_at = self.clock.time()
+                    return self.reconcile_take_profit()
+                return None
+            elif self.check_take_profit(ticker, current_price):
+                reason = 'take_profit'
+            else:
+                return None
+            
+            entry_price = self.entry_price
+            result = self.sell(ticker)
+            if not result and self.position is None:
+                # 취소하려던 익절 지정가 주문이 먼저 체결됨 (알림은 reconcile_take_profit에서)
+                return 'take_profit'
+            if not result:
+                self.exit_retry_at = self.clock.time() + self.EXIT_RETRY_SEC
+                return None
+            
+            profit_ratio = (current_price - entry_price) / entry_price * 100
+            if reason == 'stop_loss':
+                msg = f"""
+🔻 <b>손절</b>
+
+티커: {ticker}
+진입가: {entry_price:,.0f}원
+현재가: {current_price:,.0f}원
+손실: {profit_ratio:.2f}%
+"""
+            else:
+                msg = f"""
+🔺 <b>익절</b>
+
+티커: {ticker}
+진입가: {entry_price:,.0f}원
+현재가: {current_price:,.0f}원
+수익: {profit_ratio:.2f}%
+"""
+            self.send_telegram(msg.strip())
+            return reason
+    
+    def on_tick(self, ticker, price):
+        """
+        웹소켓 체결가 수신 (피드 스레드) - 보유 중이면 바로 손절/익절 판단
         """
-        if not config.TELEGRAM_TOKEN or not config.TELEGRAM_CHAT_ID:
-            return
+        if self.position == 'long' and ticker == self.ticker:
+            self.check_exit(ticker, price)
+    
+    def on_buy_filled(self, ticker, fill, order):
+        """
+        매수 체결 확인 (주문 추적 스레드) → 진입가를 실제 평균 체결가로, 수량/수수료 반영
         
+        Args:
+            ticker: 티커
+            fill: 체결 요약 (volume, price, funds, fee)
+            order: 주문 조회 결과
+        """
+        with self.lock:
+            if self.entry_order != order['uuid'] or self.position != 'long':
+                return
+            
+            if fill['volume'] <= 0:
+                print(f"⚠️ 매수 주문이 체결되지 않았습니다: {order['state']}")
+                self.position = None
+                self.entry_time = None
+                self.entry_order = None
+                self.refresh_account()
+                return
+            
+            self.entry_price = fill['price']
+            self.volume = fill['volume']
+            self.entry_fee = fill['fee']
+            print(f"📋 체결: {self.volume}개 @ {self.entry_price:,.0f}원 (수수료 {self.entry_fee:,.0f}원)")
+            
+            self.refresh_account()
+            self.place_take_profit(ticker)
+    
+    def place_take_profit(self, ticker):
+        """
+        매수 직후 익절가에 지정가 매도 주문 (가격이 닿으면 거래소에서 바로 체결)
+        
+        Returns:
+            주문 결과 또는 None (실패하면 현재가 확인으로 익절)
+        """
+        if not self.take_profit_order or not self.upbit or self.position != 'long' or config.TAKE_PROFIT <= 0:
+            return None
+        
+        volume = self.volume or self.get_balance(ticker.split('-')[1])
+        price = tick_price(self.entry_price * (1 + config.TAKE_PROFIT))
         try:
-            import requests
-            url = f"https://api.telegram.org/bot{config.TELEGRAM_TOKEN}/sendMessage"
-            data = {
-                "chat_id": config.TELEGRAM_CHAT_ID,
-                "text": message,
-                "parse_mode": "HTML"
-            }
-            requests.post(url, data=data, timeout=5)
-        except:
-            pass  # 알림 실패해도 봇은 계속
+            order = self.upbit.sell_limit_order(ticker, price, volume)
+            if order is None:
+                raise RuntimeError("주문이 거절되었습니다.")
+        except Exception as e:
+            print(f"⚠️ 익절 지정가 주문 실패 (현재가 확인으로 익절): {e}")
+            return None
+        
+        self.take_profit_uuid = order['uuid']
+        self.take_profit_price = price
+        self.refresh_account()      # 주문에 잠긴 수량 반영
+        print(f"📌 익절 지정가 주문: {price:,.0f}원 × {volume}개")
+        return order
+    
+    def cancel_take_profit(self, ticker):
+        """
+        익절 지정가 주문 취소 (손절/신호 매도 전)
+        
+        Returns:
+            취소됐으면(또는 걸린 주문이 없으면) True,
+            이미 체결됐거나 아직 취소되지 않았으면 False (체결이면 포지션 정리, 아니면 주문 유지 후 재시도)
+        """
+        with self.lock:
+            order_id = self.take_profit_uuid
+            if not order_id:
+                return True
+            
+            try:
+                self.upbit.cancel_order(order_id)
+            except Exception as e:
+                print(f"⚠️ 익절 지정가 주문 취소 실패: {e}")
+            
+            # 취소는 비동기로 처리되므로 주문 상태가 바뀔 때까지 확인
+            try:
+                for _ in range(5):
+                    order = self.upbit.get_order(order_id)
+                    if order['state'] != 'wait':
+                        break
+                    self.clock.sleep(0.2)
+            except Exception as e:
+                print(f"⚠️ 익절 지정가 주문 확인 실패: {e}")
+                return False
+            
+            if order['state'] == 'wait':
+                # 주문이 살아 있어 수량이 잠겨 있음 → uuid를 유지하고 check_exit가 잠시 뒤 다시 취소
+                print("⚠️ 익절 지정가 주문이 아직 취소되지 않았습니다.")
+                return False
+            
+            self.take_profit_uuid = None
+            if order['state'] == 'done':
+                self._take_profit_filled(ticker, order)
+                return False
+            self.refresh_account()  # 잠긴 수량 해제 반영
+            return True
+    
+    def reconcile_take_profit(self):
+        """
+        익절 지정가 주문 상태 확인 (체결됐으면 포지션 정리 + 알림)
+        
+        Returns:
+            체결됐으면 'take_profit', 아니면 None
+        """
+        with self.lock:
+            order_id = self.take_profit_uuid
+            if not order_id:
+                return None
+            
+            order = self.upbit.get_order(order_id)
+            if order['state'] == 'wait':
+                return None
+            
+            self.take_profit_uuid = None
+            if order['state'] == 'done':
+                self._take_profit_filled(order['market'], order)
+                return 'take_profit'
+            
+            print("⚠️ 익절 지정가 주문이 취소되었습니다. 현재가 확인으로 익절합니다.")
+            return None
     
-    def run(self, ticker=None, interval=None, sleep_sec=60):
+    def _take_profit_filled(self, ticker, order):
         """
-        봇 실행
+        익절 지정가 체결 → 포지션 정리 + 알림
+        """
+        volume = sum(float(t['volume']) for t in order['trades'])
+        funds = sum(float(t['funds']) for t in order['trades'])
+        price = funds / volume if volume else self.take_profit_price
+        entry_price = self.entry_price
+        
+        self.position = None
+        self.entry_price = 0
+        self.entry_time = None
+        self.volume = 0
+        self.entry_order = None
+        self.refresh_account()
+        
+        profit_ratio = (price - entry_price) / entry_price * 100 if entry_price else 0
+        print(f"✅ 익절 지정가 체결: {ticker}, {volume}개 @ {price:,.0f}원")
+        msg = f"""
+🔺 <b>익절 (지정가)</b>
+
+티커: {ticker}
+진입가: {entry_price:,.0f}원
+체결가: {price:,.0f}원
+수익: {profit_ratio:.2f}%
+"""
+        self.send_telegram(msg.strip())
+    
+    def _watch_orders(self):
+        """
+        익절 지정가 주문 체결 확인 스레드 (ORDER_CHECK_SEC마다)
+        """
+        while not self.order_watch_stop.wait(self.ORDER_CHECK_SEC):
+            if not self.take_profit_uuid:
+                continue
+            try:
+                self.reconcile_take_profit()
+            except Exception as e:
+                print(f"⚠️ 익절 주문 확인 실패: {e}")
+    
+    def restore_paper_position(self, ticker):
+        """
+        모의투자 계좌에 코인이 남아 있으면 (재시작) 포지션 복원
+        
+        Returns:
+            복원했으면 True
+        """
+        if not isinstance(self.upbit, PaperTrader) or self.position is not None:
+            return False
+        
+        holding = self.upbit.holding(ticker)
+        if not holding:
+            return False
+        
+        self.volume, self.entry_price, bought_at = holding
+        self.position = 'long'
+        self.entry_time = datetime.fromtimestamp(bought_at)
+        print(f"🧪 모의투자 포지션 복원: {self.volume:.8f}개 @ {self.entry_price:,.0f}원")
+        
+        # 대기 지정가 주문은 원장에 남지 않으므로 다시 걸어 둠
+        self.place_take_profit(ticker)
+        return True
+    
+    def send_telegram(self, message):
+        """
+        텔레그램 알림 (선택사항, 큐에 넣고 바로 반환 - 전송은 백그라운드)
+        """
+        self.notifier.send(message)
+    
+    def run(self, ticker=None, interval=None, sleep_sec=60, use_ticker_feed=True, close_offset=2):
+        """
+        봇 실행 (신호는 봉 마감 직후에만 판단)
         
         Args:
             ticker: 티커
             interval: 캔들 주기
-            sleep_sec: 대기 시간 (초)
+            sleep_sec: 봉 마감 사이 현재가 확인 간격 (초)
+            use_ticker_feed: 웹소켓 체결가로 틱마다 손절/익절 (False면 sleep_sec마다 체크)
+            close_offset: 봉 마감 후 신호 판단까지 기다릴 시간 (초)
         """
         ticker = ticker or config.TARGET_COIN
         interval = interval or config.INTERVAL
+        self.ticker = ticker
+        
+        self.restore_paper_position(ticker)
+        
+        # 웹소켓 체결가 피드 (손절/익절을 sleep_sec 주기와 무관하게 바로 처리)
+        # 구독 모드는 데몬이 체결가를 밀어 줌 (봇마다 웹소켓을 열지 않음)
+        if use_ticker_feed and self.price_feed is None:
+            if self.market is not self.client:
+                self.price_feed = self.market.subscribe([ticker], on_price=self.on_tick)
+            else:
+                self.price_feed = TickerFeed([ticker], on_price=self.on_tick)
+        if self.price_feed:
+            self.price_feed.start()
+        
+        # 익절 지정가 주문 체결 확인 (실제 시계에서만, 리플레이는 가상 시계)
+        # 계좌 스냅샷 주기 갱신 (주문 때 잔고 조회를 기다리지 않게)
+        if self.account and isinstance(self.clock, SystemClock):
+            self.account.start()
+        
+        watcher = None
+        if self.take_profit_order and isinstance(self.clock, SystemClock):
+            self.order_watch_stop.clear()
+            watcher = threading.Thread(target=self._watch_orders, daemon=True)
+            watcher.start()
         
         print()
         print("=" * 60)
@@ -274,6 +684,8 @@ class TradingBot:
         print(f"   티커: {ticker}")
         print(f"   주기: {interval}")
         print(f"   모드: {config.TRADING_MODE}")
+        if self.market is not self.client:
+            print(f"   시세: 데몬 구독 ({self.market.aio.path})")
         print(f"   전략: #{config.SELECTED_STRATEGY} {self.strategy_config['name']}")
         print("=" * 60)
         
@@ -288,70 +700,79 @@ class TradingBot:
 """
         self.send_telegram(start_msg.strip())
         
-        while True:
-            try:
-                # OHLCV 데이터 가져오기
-                df = self.get_ohlcv(ticker, interval=interval)
-                
-                if df is None:
-                    print("⚠️ 데이터를 가져올 수 없습니다.")
-                    time.sleep(sleep_sec)
-                    continue
-                
-                # 지표 계산
-                df = self.strategy.calculate_indicators(df)
-                
-                # 신호 생성
-                signal = self.strategy.generate_signal(df)
-                
-                # 현재 상태 출력
-                current = df.iloc[-1]
-                current_price = self.get_current_price(ticker)
-                
-                # 포지션 정보
-                pos_info = ""
-                if self.position == 'long':
-                    profit_ratio = (current_price - self.entry_price) / self.entry_price * 100
-                    holding_time = (datetime.now() - self.entry_time).total_seconds() / 3600
-                    pos_info = f" | 포지션: +{profit_ratio:.2f}% ({holding_time:.1f}h)"
-                
-                print(f"\n[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}]")
-                print(f"현재가: {current_price:,.0f}원 | RSI: {current['rsi']:.1f} | 신호: {signal}{pos_info}")
-                
-                # 손절/익절 체크
-                if self.position == 'long':
-                    if self.check_stop_loss(ticker):
-                        result = self.sell(ticker)
-                        if result or config.TRADING_MODE == 'test':
-                            profit_ratio = (current_price - self.entry_price) / self.entry_price * 100
-                            msg = f"""
-🔻 <b>손절</b>
-
-티커: {ticker}
-진입가: {self.entry_price:,.0f}원
-현재가: {current_price:,.0f}원
-손실: {profit_ratio:.2f}%
-"""
-                            self.send_telegram(msg.strip())
-                    elif self.check_take_profit(ticker):
-                        result = self.sell(ticker)
-                        if result or config.TRADING_MODE == 'test':
-                            profit_ratio = (current_price - self.entry_price) / self.entry_price * 100
-                            msg = f"""
-🔺 <b>익절</b>
-
-티커: {ticker}
-진입가: {self.entry_price:,.0f}원
-현재가: {current_price:,.0f}원
-수익: {profit_ratio:.2f}%
-"""
-                            self.send_telegram(msg.strip())
-                
-                # 매매 실행
-                if signal == 'buy' and self.position is None:
-                    result = self.buy(ticker, ratio=config.INVEST_RATIO)
-                    if result or config.TRADING_MODE == 'test':
-                        msg = f"""
+        try:
+            self._loop(ticker, interval, sleep_sec, close_offset)
+        finally:
+            if self.price_feed:
+                self.price_feed.stop()
+            if watcher:
+                self.order_watch_stop.set()
+                watcher.join()
+            if self.account:
+                self.account.stop()
+            if self.orders:
+                self.orders.stop()
+            self.notifier.flush()
+    
+    def evaluate_signal(self, ticker, interval, closed_before=None):
+        """
+        마감된 봉으로 지표/신호 계산 후 매매 (봉마다 1번)
+        
+        Args:
+            ticker: 티커
+            interval: 캔들 주기
+            closed_before: 이 시각(KST) 이전 봉만 사용 (None이면 마지막 행을 진행 중인 봉으로 사용)
+            
+        Returns:
+            신호 ('buy', 'sell', 'hold') 또는 데이터가 없으면 None
+        """
+        # 새 캔들 + 현재가 동시 조회 (현재가는 손절/익절 체크에 재사용)
+        df, current_price = self.get_window_snapshot(ticker, interval)
+        
+        # 웹소켓 체결가가 살아 있으면 그 값이 더 최신
+        if self.price_feed and self.price_feed.latest(ticker) is not None:
+            current_price = self.price_feed.latest(ticker)
+        
+        if df is None:
+            print("⚠️ 데이터를 가져올 수 없습니다.")
+            return None
+        
+        # 방금 시작된 봉은 빼고 마감된 봉으로만 판단 (백테스트와 같은 기준)
+        if closed_before is not None:
+            df = df[df.index < closed_before]
+            if len(df) == 0:
+                print("⚠️ 마감된 캔들이 없습니다.")
+                return None
+        
+        # 지표 계산 (새로 마감된 봉만 누적)
+        df = self.indicators.apply(df)
+        
+        # 신호 생성
+        signal = self.strategy.generate_signal(df)
+        
+        # 현재 상태 출력
+        current = df.iloc[-1]
+        
+        # 포지션 정보
+        pos_info = ""
+        if self.position == 'long' and self.entry_price:
+            profit_ratio = (current_price - self.entry_price) / self.entry_price * 100
+            holding_time = (self.clock.now() - self.entry_time).total_seconds() / 3600
+            pos_info = f" | 포지션: +{profit_ratio:.2f}% ({holding_time:.1f}h)"
+        
+        print(f"\n[{self.clock.now().strftime('%Y-%m-%d %H:%M:%S')}]")
+        print(f"현재가: {current_price:,.0f}원 | RSI: {current['rsi']:.1f} | 신호: {signal}{pos_info}")
+        
+        # 손절/익절 체크 (웹소켓 피드가 끊겼을 때의 대비, 평소엔 틱마다 처리됨)
+        if self.position == 'long':
+            self.check_exit(ticker, current_price)
+        
+        # 매매 실행 (피드 스레드의 손절/익절과 겹치지 않게 잠금)
+        with self.lock:
+            if signal == 'buy' and self.position is None:
+                result = self.buy(ticker, ratio=config.INVEST_RATIO)
+                if result:
+                    msg = f"""
 📈 <b>매수</b>
 
 티커: {ticker}
@@ -359,30 +780,70 @@ class TradingBot:
 RSI: {current['rsi']:.1f}
 전략: {self.strategy_config['name']}
 """
-                        self.send_telegram(msg.strip())
-                elif signal == 'sell' and self.position == 'long':
-                    result = self.sell(ticker)
-                    if result or config.TRADING_MODE == 'test':
-                        profit_ratio = (current_price - self.entry_price) / self.entry_price * 100
-                        msg = f"""
+                    self.send_telegram(msg.strip())
+            elif signal == 'sell' and self.position == 'long':
+                entry_price = self.entry_price  # sell()이 포지션을 비우기 전 값
+                result = self.sell(ticker)
+                if result:
+                    profit_ratio = (current_price - entry_price) / entry_price * 100 if entry_price else 0
+                    msg = f"""
 📉 <b>매도</b>
 
 티커: {ticker}
-진입가: {self.entry_price:,.0f}원
+진입가: {entry_price:,.0f}원
 현재가: {current_price:,.0f}원
 수익: {profit_ratio:+.2f}%
 """
-                        self.send_telegram(msg.strip())
+                    self.send_telegram(msg.strip())
+        
+        return signal
+    
+    def check_price(self, ticker):
+        """
+        봉 마감 사이 현재가만으로 손절/익절 확인 (보유 중일 때만 조회)
+        
+        Returns:
+            'stop_loss', 'take_profit' 또는 None
+        """
+        if self.position != 'long':
+            return None
+        
+        # 웹소켓 피드가 살아 있으면 이미 틱마다 확인 중 → 요청 없음
+        if self.price_feed and self.price_feed.latest(ticker) is not None:
+            return None
+        
+        return self.check_exit(ticker, self.get_current_price(ticker))
+    
+    def _loop(self, ticker, interval, sleep_sec, close_offset):
+        """
+        매매 루프 (봉 마감마다 신호, 그 사이에는 현재가만)
+        """
+        scheduler = CandleScheduler(interval, offset=close_offset, check_sec=sleep_sec, clock=self.clock.time)
+        
+        while self.clock.running():
+            try:
+                now = self.clock.time()
+                if scheduler.due(now):
+                    if self.evaluate_signal(ticker, interval, scheduler.closed_before(now)) is not None:
+                        scheduler.mark(now)
+                        next_wake = datetime.fromtimestamp(scheduler.next_wake())
+                        print(f"⏰ 다음 신호 판단: {next_wake.strftime('%Y-%m-%d %H:%M:%S')}")
+                else:
+                    self.check_price(ticker)
                 
-                # 대기
-                time.sleep(sleep_sec)
+                # 다음 봉 마감 또는 현재가 확인 시각까지 대기
+                self.clock.sleep(scheduler.sleep_time())
                 
             except KeyboardInterrupt:
                 print("\n\n⛔ 봇 종료")
                 break
+            except UpbitAPIError as e:
+                print(f"❌ 에러 발생: {e}")
+                # 429는 요청 제한이 다음 토큰까지 기다려 주므로 확인 주기만큼 쉬지 않음
+                self.clock.sleep(self.THROTTLE_RETRY_SEC if e.status == 429 else sleep_sec)
             except Exception as e:
                 print(f"❌ 에러 발생: {e}")
-                time.sleep(sleep_sec)
+                self.clock.sleep(sleep_sec)
 
 
 if __name__ == "__main__":
@@ -391,7 +852,13 @@ if __name__ == "__main__":
     print("🤖 업비트 자동매매 봇 v2.0")
     print("=" * 60)
     
-    bot = TradingBot()
+    # MARKET_DATA_SOCKET이 있으면 시세는 데몬(market_data.py)에서
+    market_data = None
+    if config.MARKET_DATA_SOCKET:
+        from market_data import MarketDataClient
+        market_data = MarketDataClient(config.MARKET_DATA_SOCKET)
+    
+    bot = TradingBot(market_data=market_data)
     
     # 잔고 확인
     if bot.upbit:
@@ -420,3 +887,5 @@ if __name__ == "__main__":
     except KeyboardInterrupt:
         print("\n\n⛔ 봇 종료")
         bot.send_telegram("⛔ 봇이 수동으로 종료되었습니다.")
+    finally:
+        bot.notifier.close()
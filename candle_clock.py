@@ -0,0 +1,195 @@
+"""
+캔들 경계 스케줄러
+업비트 캔들은 UTC 기준으로 나뉜다 (분봉은 00:00 UTC부터 단위마다, 일봉은 09:00 KST,
+주봉은 월요일 09:00 KST, 월봉은 1일 09:00 KST).
+신호는 봉이 마감될 때만 바뀌므로 봇은 마감 직후(+offset)에만 캔들/지표/신호를 계산하고,
+그 사이에는 현재가만 보고 손절/익절을 확인한다.
+"""
+import time
+import asyncio
+from datetime import datetime, timezone
+import pandas as pd
+
+
+KST_OFFSET = pd.Timedelta(hours=9)
+WEEK_ORIGIN = 4 * 86400     # 1970-01-05 (월요일) 00:00 UTC
+
+# 주기 → 봉 길이 (초, 월봉 제외)
+INTERVAL_SECONDS = {
+    'minute1': 60,
+    'minute3': 3 * 60,
+    'minute5': 5 * 60,
+    'minute10': 10 * 60,
+    'minute15': 15 * 60,
+    'minute30': 30 * 60,
+    'minute60': 60 * 60,
+    'minute240': 240 * 60,
+    'day': 86400,
+    'week': 7 * 86400,
+}
+
+
+def candle_start(interval, now):
+    """
+    now(UNIX 초)가 속한 봉의 시작 시각 (UNIX 초)
+
+    Args:
+        interval: 캔들 주기 (minute1 ~ minute240, day, week, month)
+        now: UNIX 시각 (초)
+
+    Returns:
+        봉 시작 UNIX 시각 (초)
+    """
+    if interval == 'month':
+        t = datetime.fromtimestamp(now, timezone.utc)
+        return datetime(t.year, t.month, 1, tzinfo=timezone.utc).timestamp()
+
+    if interval not in INTERVAL_SECONDS:
+        raise ValueError(f"지원하지 않는 주기: {interval}")
+
+    length = INTERVAL_SECONDS[interval]
+    origin = WEEK_ORIGIN if interval == 'week' else 0
+    return origin + (now - origin) // length * length
+
+
+def next_candle_close(interval, now):
+    """
+    now 이후 처음 마감되는 시각 (= 다음 봉 시작, UNIX 초)
+    """
+    if interval == 'month':
+        t = datetime.fromtimestamp(now, timezone.utc)
+        year, month = (t.year + 1, 1) if t.month == 12 else (t.year, t.month + 1)
+        return datetime(year, month, 1, tzinfo=timezone.utc).timestamp()
+
+    return candle_start(interval, now) + INTERVAL_SECONDS[interval]
+
+
+def to_kst(timestamp):
+    """
+    UNIX 시각 → pyupbit 캔들 인덱스와 같은 시간대 없는 KST 시각
+    """
+    return pd.Timestamp(timestamp, unit='s') + KST_OFFSET
+
+
+class CandleScheduler:
+    """
+    봉 마감 시각에 맞춰 신호 판단 시점을 알려주는 스케줄러
+
+    사용법:
+        scheduler = CandleScheduler("day", offset=2, check_sec=60)
+        while True:
+            if scheduler.due():
+                ...                     # 캔들/지표/신호 (봉마다 1번)
+                scheduler.mark()
+            else:
+                ...                     # 현재가만 보고 손절/익절
+            time.sleep(scheduler.sleep_time())
+    """
+
+    def __init__(self, interval, offset=2.0, check_sec=60, clock=time.time):
+        """
+        Args:
+            interval: 캔들 주기
+            offset: 마감 후 기다릴 시간 (초, 거래소가 봉을 확정할 여유)
+            check_sec: 마감 사이 현재가 확인 간격 (초)
+            clock: 현재 UNIX 시각 함수 (리플레이는 가상 시계)
+        """
+        candle_start(interval, 0)  # 지원하지 않는 주기면 여기서 ValueError
+        self.interval = interval
+        self.offset = offset
+        self.check_sec = check_sec
+        self.clock = clock
+        self.evaluated = None      # 마지막으로 신호를 판단한 봉의 시작 시각
+
+    def current_start(self, now=None):
+        """
+        판단 대상이 아닌 진행 중인 봉의 시작 시각 (offset 전이면 직전 봉)
+        """
+        now = self.clock() if now is None else now
+        return candle_start(self.interval, now - self.offset)
+
+    def due(self, now=None):
+        """
+        마감된 새 봉이 있어 신호를 다시 판단해야 하는지
+        """
+        return self.evaluated != self.current_start(now)
+
+    def mark(self, now=None):
+        """
+        지금 진행 중인 봉 직전까지 판단 완료로 기록
+        """
+        self.evaluated = self.current_start(now)
+
+    def closed_before(self, now=None):
+        """
+        마감된 봉만 남기기 위한 기준 (이 KST 시각보다 이전 인덱스 = 마감된 봉)
+        """
+        return to_kst(self.current_start(now))
+
+    def next_wake(self, now=None):
+        """
+        다음 신호 판단 시각 (UNIX 초)
+        """
+        now = self.clock() if now is None else now
+        return next_candle_close(self.interval, now - self.offset) + self.offset
+
+    def sleep_time(self, now=None):
+        """
+        다음에 깨어날 때까지 (마감+offset과 현재가 확인 간격 중 이른 쪽, 초)
+        """
+        now = self.clock() if now is None else now
+        return max(min(self.check_sec, self.next_wake(now) - now), 0.0)
+
+
+class SystemClock:
+    """
+    실제 시계 (TradingBot 기본값)
+    """
+
+    def time(self):
+        return time.time()
+
+    def now(self):
+        return datetime.now()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+    async def asleep(self, seconds):
+        await asyncio.sleep(seconds)
+
+    def running(self):
+        return True
+
+
+class VirtualClock:
+    """
+    가상 시계 (리플레이용) - sleep은 기다리지 않고 시각만 앞으로 옮긴다
+
+    end를 지나면 running()이 False가 되어 봇 루프가 끝난다.
+    """
+
+    def __init__(self, start, end=None):
+        """
+        Args:
+            start: 시작 UNIX 시각 (초)
+            end: 종료 UNIX 시각 (None이면 끝없음)
+        """
+        self.current = float(start)
+        self.end = end
+
+    def time(self):
+        return self.current
+
+    def now(self):
+        return datetime.fromtimestamp(self.current)
+
+    def sleep(self, seconds):
+        self.current += max(seconds, 0.0)
+
+    async def asleep(self, seconds):
+        self.sleep(seconds)
+        await asyncio.sleep(0)      # 다른 태스크에 양보만
+
+    def running(self):
+        return self.end is None or self.current < self.end
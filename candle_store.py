@@ -0,0 +1,294 @@
+"""
+로컬 캔들 저장소
+(티커, 주기)별 OHLCV를 컬럼 단위 바이너리(.npz)로 저장하고
+마지막 저장 시각 이후의 캔들만 새로 받아 이어 붙인다.
+"""
+import os
+import time
+import numpy as np
+import pandas as pd
+import pyupbit
+from rate_governor import GOVERNOR, BACKFILL, classify, priority
+from candle_clock import to_kst
+
+
+# 주기별 캔들 길이 (초) - month는 근사값
+INTERVAL_SECONDS = {
+    'minute1': 60,
+    'minute3': 3 * 60,
+    'minute5': 5 * 60,
+    'minute10': 10 * 60,
+    'minute15': 15 * 60,
+    'minute30': 30 * 60,
+    'minute60': 60 * 60,
+    'minute240': 240 * 60,
+    'day': 24 * 60 * 60,
+    'week': 7 * 24 * 60 * 60,
+    'month': 31 * 24 * 60 * 60,
+}
+
+COLUMNS = ['open', 'high', 'low', 'close', 'volume', 'value']
+
+DEFAULT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'candles')
+
+
+def candle_count(interval, start, end):
+    """
+    [start, end) 구간을 덮는 캔들 개수
+    """
+    seconds = (pd.Timestamp(end) - pd.Timestamp(start)).total_seconds()
+    return int(seconds // INTERVAL_SECONDS[interval]) + 1
+
+
+def normalize_ohlcv(df):
+    """
+    pyupbit.get_ohlcv 결과 정리 (소문자 컬럼, 시간순, 중복 제거)
+    """
+    df = df.copy()
+    df.columns = [col.lower() for col in df.columns]
+    df = df[[col for col in COLUMNS if col in df.columns]]
+    df = df[~df.index.duplicated(keep='last')]
+    return df.sort_index()
+
+
+class CandleStore:
+    """
+    (티커, 주기) 단위 캔들 저장소
+
+    Backtester의 data_source로 넘기면 pyupbit.get_ohlcv 대신 사용된다.
+    offline=True면 네트워크 없이 저장된 캔들만 읽는다.
+    source는 get_ohlcv를 가진 원본 (기본값: pyupbit, 연결 풀 재사용은 UpbitClient).
+
+    분봉은 거래 없는 시간이 비어 있어 캔들 개수만으로는 빠진 구간을 알 수 없으므로
+    실제로 받아 둔 시간 구간(ranges)을 함께 저장한다.
+    """
+
+    def __init__(self, root=DEFAULT_ROOT, offline=False, source=None):
+        self.root = root
+        self.offline = offline
+        self.source = source or pyupbit
+        self._frames = {}       # (티커, 주기) → 메모리 캐시
+        self._ranges = {}       # (티커, 주기) → 받아 둔 [시작, 끝) 구간 목록
+        self._updated = set()   # 이번 실행에서 최신화한 (티커, 주기)
+        self._fetched = set()   # 이번 실행에서 받은 과거 구간
+
+    def path(self, ticker, interval):
+        """
+        저장 파일 경로
+        """
+        return os.path.join(self.root, f"{ticker}_{interval}.npz")
+
+    def load(self, ticker, interval):
+        """
+        저장된 캔들 읽기
+
+        Returns:
+            DataFrame (없으면 None)
+        """
+        key = (ticker, interval)
+        if key in self._frames:
+            return self._frames[key]
+
+        path = self.path(ticker, interval)
+        if not os.path.exists(path):
+            return None
+
+        with np.load(path) as data:
+            index = pd.DatetimeIndex(data['time'].astype('datetime64[ns]'))
+            df = pd.DataFrame(
+                {col: data[col] for col in COLUMNS if col in data.files},
+                index=index
+            )
+            ranges = data['ranges'].tolist() if 'ranges' in data.files else []
+
+        self._frames[key] = df
+        self._ranges[key] = ranges
+        return df
+
+    def save(self, ticker, interval, df):
+        """
+        캔들 저장 (임시 파일에 쓴 뒤 교체)
+        """
+        os.makedirs(self.root, exist_ok=True)
+
+        key = (ticker, interval)
+        path = self.path(ticker, interval)
+        tmp_path = path + '.tmp'
+
+        arrays = {
+            'time': df.index.values.astype('datetime64[ns]').astype(np.int64),
+            'ranges': np.array(self._ranges.get(key, []), dtype=np.int64).reshape(-1, 2),
+        }
+        for col in COLUMNS:
+            if col in df.columns:
+                arrays[col] = df[col].to_numpy(dtype=np.float64)
+
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+
+        self._frames[key] = df
+
+    def merge(self, ticker, interval, new_df, covered=None):
+        """
+        새 캔들을 저장된 캔들에 합쳐 저장 (같은 시각은 새 값 우선)
+
+        Args:
+            new_df: 새 캔들
+            covered: 새 캔들이 빠짐없이 덮는 [시작, 끝) 구간 목록
+                     (None이면 첫 캔들 ~ 마지막 캔들 다음 시각)
+        """
+        if new_df is None or len(new_df) == 0:
+            stored = self.load(ticker, interval)
+            if covered and stored is not None:
+                self._add_ranges(ticker, interval, covered)
+                self.save(ticker, interval, stored)
+            return stored
+
+        new_df = normalize_ohlcv(new_df)
+        stored = self.load(ticker, interval)
+
+        if stored is not None and len(stored):
+            merged = pd.concat([stored, new_df])
+            merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+        else:
+            merged = new_df
+
+        if covered is None:
+            step = pd.Timedelta(seconds=INTERVAL_SECONDS[interval])
+            covered = [(new_df.index[0], new_df.index[-1] + step)]
+        self._add_ranges(ticker, interval, covered)
+
+        self.save(ticker, interval, merged)
+        return merged
+
+    def covers(self, ticker, interval, start, end):
+        """
+        [start, end) 구간을 받아 둔 적이 있는지
+        """
+        self.load(ticker, interval)
+        start = pd.Timestamp(start).value
+        end = pd.Timestamp(end).value
+
+        return any(s <= start and end <= e for s, e in self._ranges.get((ticker, interval), []))
+
+    def _add_ranges(self, ticker, interval, covered):
+        """
+        받아 둔 구간 추가 (겹치거나 맞닿은 구간은 합침)
+        """
+        key = (ticker, interval)
+        ranges = self._ranges.get(key, []) + [
+            [pd.Timestamp(s).value, pd.Timestamp(e).value] for s, e in covered
+        ]
+        ranges.sort()
+
+        merged = []
+        for s, e in ranges:
+            if merged and s <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], e)
+            else:
+                merged.append([s, e])
+
+        self._ranges[key] = merged
+
+    def update(self, ticker, interval="day", count=200):
+        """
+        마지막 저장 시각 이후의 캔들만 받아서 추가
+
+        마지막 캔들은 저장 당시 진행 중이었을 수 있으므로 다시 받는다.
+
+        Args:
+            ticker: 티커
+            interval: 주기
+            count: 저장소가 비어 있을 때 처음 받을 개수
+
+        Returns:
+            최신화된 DataFrame
+        """
+        stored = self.load(ticker, interval)
+        now = to_kst(time.time())   # 캔들 인덱스와 같은 KST 기준 (서버 시간대와 무관)
+
+        if stored is None or len(stored) == 0:
+            fetch_count = count
+        else:
+            elapsed = (now - stored.index[-1]).total_seconds()
+            fetch_count = max(int(elapsed // INTERVAL_SECONDS[interval]), 0) + 2
+
+        df = self._fetch(ticker, interval=interval, count=fetch_count)
+        self._updated.add((ticker, interval))
+
+        if df is None or len(df) == 0:
+            return stored
+
+        # 마지막 저장 캔들부터 지금까지 빠짐없이 받은 것
+        covered_start = df.index[0] if stored is None or len(stored) == 0 else min(df.index[0], stored.index[-1])
+        return self.merge(ticker, interval, df, covered=[(covered_start, now)])
+
+    def _fetch(self, ticker, **kwargs):
+        """
+        원본에서 캔들 받기 (pyupbit는 요청 제한이 없으므로 공용 GOVERNOR 토큰을 먼저 받음)
+        """
+        if self.source is pyupbit:
+            GOVERNOR.acquire(*classify("GET", "candles"))
+        return self.source.get_ohlcv(ticker, **kwargs)
+
+    def get_ohlcv(self, ticker, interval="day", to=None, count=200):
+        """
+        pyupbit.get_ohlcv 대체 (저장소에서 읽기)
+
+        `to` 이전 count개 캔들 구간을 받아 둔 적이 없으면 그 구간을 받아 채운다.
+        (offline이면 있는 만큼만 반환)
+
+        Args:
+            ticker: 티커
+            interval: 주기
+            to: 이 시각 이전 캔들까지 (None이면 최신)
+            count: 개수
+
+        Returns:
+            DataFrame (컬럼 소문자, 없으면 None)
+        """
+        key = (ticker, interval)
+        to = pd.Timestamp(to) if to is not None else None
+        step = pd.Timedelta(seconds=INTERVAL_SECONDS[interval])
+
+        if not self.offline:
+            stored = self.load(ticker, interval)
+
+            # 최신 구간: 이번 실행에서 한 번만 최신화
+            if key not in self._updated and (
+                    stored is None or to is None or to > stored.index[-1] + step):
+                stored = self.update(ticker, interval, count=count)
+
+            # 과거 구간: 받아 둔 적 없으면 받기 (거래소에도 없으면 있는 만큼)
+            end = to if to is not None else to_kst(time.time())
+            start = end - step * count
+            window_key = (ticker, interval, to, count)
+
+            if window_key not in self._fetched and not self.covers(ticker, interval, start, end) and (
+                    stored is None or len(self._window(stored, to, count)) < count):
+                if count > 200:
+                    # 200개 초과는 페이지 단위 백필
+                    from backfill import Backfiller
+                    Backfiller(self).fill(ticker, interval, start, end)
+                else:
+                    with priority(BACKFILL):
+                        df = self._fetch(ticker, interval=interval, to=to, count=count)
+                    if df is not None and len(df):
+                        self.merge(ticker, interval, df, covered=[(df.index[0], end)])
+                self._fetched.add(window_key)
+
+        stored = self.load(ticker, interval)
+        if stored is None:
+            return None
+
+        window = self._window(stored, to, count)
+        return window.copy() if len(window) else None
+
+    @staticmethod
+    def _window(df, to, count):
+        """
+        `to` 이전 최근 `count`개 캔들
+        """
+        window = df if to is None else df[df.index < to]
+        return window.tail(count)
@@ -0,0 +1,127 @@
+"""
+라이브 봇용 캔들 링 버퍼
+시작할 때 한 번만 전체 캔들을 받아 고정 크기 배열에 채우고,
+이후에는 마지막 저장 봉 이후의 캔들만 받아 이어 붙인다.
+진행 중인 봉은 새 행을 만들지 않고 제자리에서 덮어쓴다.
+"""
+import numpy as np
+import pandas as pd
+from candle_store import COLUMNS, candle_count
+
+
+class CandleWindow:
+    """
+    고정 크기 캔들 창 (가장 오래된 봉부터 덮어쓰는 링 버퍼)
+
+    사용법:
+        window = CandleWindow(200)
+        window.seed(client.get_ohlcv(ticker, interval, count=200))
+        ...
+        count = window.fetch_count(interval, now)        # 보통 2 (마지막 봉 + 새 봉)
+        if not window.update(client.get_ohlcv(ticker, interval, count=count)):
+            window.seed(...)                               # 사이가 비었으면 다시 채움
+        df = window.frame()
+    """
+
+    def __init__(self, capacity, columns=COLUMNS):
+        """
+        Args:
+            capacity: 보관할 최대 캔들 개수
+            columns: 보관할 컬럼
+        """
+        self.capacity = capacity
+        self.columns = list(columns)
+        self.times = np.zeros(capacity, dtype='datetime64[ns]')
+        self.values = np.full((capacity, len(self.columns)), np.nan)
+        self.head = 0       # 가장 오래된 봉 위치
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def last_time(self):
+        """
+        마지막(진행 중일 수 있는) 봉 시각 (비어 있으면 None)
+        """
+        if self.size == 0:
+            return None
+        return pd.Timestamp(self.times[(self.head + self.size - 1) % self.capacity])
+
+    def clear(self):
+        self.head = 0
+        self.size = 0
+
+    def _append(self, time, row):
+        if self.size < self.capacity:
+            position = (self.head + self.size) % self.capacity
+            self.size += 1
+        else:
+            position = self.head
+            self.head = (self.head + 1) % self.capacity
+
+        self.times[position] = time
+        self.values[position] = row
+
+    def _rows(self, df):
+        """
+        DataFrame → (시각 배열, 값 배열) (없는 컬럼은 NaN)
+        """
+        values = np.full((len(df), len(self.columns)), np.nan)
+        for i, column in enumerate(self.columns):
+            if column in df.columns:
+                values[:, i] = df[column].to_numpy(dtype=float)
+        return df.index.to_numpy(dtype='datetime64[ns]'), values
+
+    def seed(self, df):
+        """
+        전체 다시 채우기 (최근 capacity개만 보관)
+        """
+        self.clear()
+        times, values = self._rows(df.tail(self.capacity))
+        for time, row in zip(times, values):
+            self._append(time, row)
+
+    def update(self, df):
+        """
+        최근 캔들 반영 (마지막 봉은 제자리 갱신, 그 뒤 봉은 추가)
+
+        Args:
+            df: 마지막 저장 봉을 포함하는 최근 캔들 (시간순)
+
+        Returns:
+            이어 붙였으면 True, 마지막 저장 봉과 사이가 비면 False (seed 필요)
+        """
+        if self.size == 0:
+            return False
+        if len(df) == 0:
+            return True
+
+        last = self.times[(self.head + self.size - 1) % self.capacity]
+        times, values = self._rows(df)
+
+        if times[0] > last:
+            return False
+
+        for time, row in zip(times, values):
+            if time == last:
+                self.values[(self.head + self.size - 1) % self.capacity] = row
+            elif time > last:
+                self._append(time, row)
+                last = time
+        return True
+
+    def fetch_count(self, interval, now):
+        """
+        마지막 저장 봉부터 now(KST)까지 덮는 캔들 개수 (+1 여유, 최대 capacity)
+        """
+        if self.size == 0:
+            return self.capacity
+        return min(candle_count(interval, self.last_time, now) + 1, self.capacity)
+
+    def frame(self):
+        """
+        보관 중인 캔들 DataFrame (시간순)
+        """
+        order = (self.head + np.arange(self.size)) % self.capacity
+        return pd.DataFrame(self.values[order], index=pd.DatetimeIndex(self.times[order]), columns=self.columns)
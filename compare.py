@@ -0,0 +1,142 @@
+"""
+전략 일괄 비교 (한 프로세스 안에서)
+캔들을 한 번 불러와 공통 지표 프레임을 한 번 계산하고,
+STRATEGIES 레지스트리의 전략들을 같은 프레임으로 백테스트해 구조화된 결과를 돌려준다.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import pyupbit
+import config
+from strategies import STRATEGIES, STRATEGY_CONFIGS
+from indicators import IndicatorPipeline
+from backtest import Backtester
+from backtest_engine import RunConfig
+from candle_store import candle_count
+
+
+# 워커 프로세스별 공통 지표 프레임 (프로세스마다 한 번만 전달)
+_frames = None
+
+
+def _init_worker(frames):
+    global _frames
+    _frames = frames
+
+
+def load_indicator_frame(ticker, start_date, end_date, interval="day",
+                         strategy_nums=None, params=None, data_source=None):
+    """
+    캔들 로드 + 여러 전략이 쓰는 지표 컬럼을 한 번에 계산
+
+    Args:
+        ticker, start_date, end_date, interval: 백테스트 구간
+        strategy_nums: 지표가 필요한 전략 번호 목록 (기본값: 전체)
+        params: 전략 파라미터 (기본값: config.STRATEGY_PARAMS)
+        data_source: get_ohlcv를 가진 데이터 소스 (기본값: pyupbit)
+
+    Returns:
+        지표 컬럼이 붙은 DataFrame (데이터가 없으면 None)
+    """
+    params = params or config.STRATEGY_PARAMS
+    data_source = data_source or pyupbit
+    strategy_nums = strategy_nums or list(STRATEGIES)
+
+    df = data_source.get_ohlcv(
+        ticker,
+        interval=interval,
+        to=end_date,
+        count=candle_count(interval, start_date, end_date)
+    )
+    if df is None:
+        return None
+
+    df = df[start_date:end_date]
+    df.columns = [col.lower() for col in df.columns]
+
+    # 전략들이 요구하는 컬럼의 합집합
+    columns = []
+    for num in strategy_nums:
+        for column in STRATEGIES[num](params).indicator_columns():
+            if column not in columns:
+                columns.append(column)
+
+    return IndicatorPipeline(params).build(df, columns)
+
+
+def _evaluate(num, df, params, run_config, initial_balance):
+    """
+    전략 1개 백테스트 → 구조화된 결과
+    """
+    strategy = STRATEGIES[num](params)
+    backtester = Backtester(strategy, initial_balance=initial_balance, run_config=run_config)
+    result = backtester.run_frame(df, verbose=False)
+
+    sell_trades = [t for t in result['trades'] if t['type'] != 'buy']
+
+    return {
+        'num': num,
+        'name': STRATEGY_CONFIGS[num]['name'],
+        'interval': STRATEGY_CONFIGS[num]['interval'],
+        'run_config': run_config,
+        'initial_balance': result['initial_balance'],
+        'final_balance': result['final_balance'],
+        'profit': result['total_return'],
+        'ratio': result['return_ratio'],
+        'trades': len(result['trades']),
+        'buys': len(result['trades']) - len(sell_trades),
+        'win_rate': result['win_rate'],
+        'buy_hold_return': result['buy_hold_return'],
+        'equity': result['equity'],
+    }
+
+
+def _evaluate_in_worker(num, interval, params, run_config, initial_balance):
+    return _evaluate(num, _frames[interval], params, run_config, initial_balance)
+
+
+def compare_strategies(ticker, start_date, end_date, strategy_nums=None, params=None,
+                       interval=None, run_configs=None, initial_balance=1000000,
+                       data_source=None, processes=None):
+    """
+    여러 전략을 같은 캔들/지표 프레임으로 비교
+
+    Args:
+        ticker, start_date, end_date: 백테스트 구간
+        strategy_nums: 비교할 전략 번호 목록 (기본값: STRATEGIES 전체)
+        params: 전략 파라미터 (기본값: config.STRATEGY_PARAMS)
+        interval: 모든 전략에 쓸 주기 (기본값: 전략별 권장 주기)
+        run_configs: {전략 번호: RunConfig} (기본값: 전략별 손익 설정)
+        initial_balance: 초기 자본금
+        data_source: get_ohlcv를 가진 데이터 소스 (기본값: pyupbit, 오프라인은 CandleStore)
+        processes: 1보다 크면 프로세스 풀로 병렬 실행
+
+    Returns:
+        전략 번호 순 결과 딕셔너리 목록
+        (num, name, final_balance, profit, ratio, trades, win_rate, buy_hold_return, equity 등)
+    """
+    params = params or config.STRATEGY_PARAMS
+    strategy_nums = strategy_nums or list(STRATEGIES)
+    run_configs = run_configs or {}
+
+    # 주기별로 캔들 로드 + 지표 계산은 한 번씩
+    intervals = {num: interval or STRATEGY_CONFIGS[num]['interval'] for num in strategy_nums}
+    frames = {}
+    for frame_interval in dict.fromkeys(intervals.values()):
+        nums = [num for num in strategy_nums if intervals[num] == frame_interval]
+        frames[frame_interval] = load_indicator_frame(
+            ticker, start_date, end_date, frame_interval,
+            strategy_nums=nums, params=params, data_source=data_source
+        )
+
+    jobs = [
+        (num, intervals[num], params, run_configs.get(num) or RunConfig.for_strategy(num), initial_balance)
+        for num in strategy_nums
+        if frames[intervals[num]] is not None
+    ]
+
+    if processes and processes > 1:
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                 initargs=(frames,)) as executor:
+            futures = [executor.submit(_evaluate_in_worker, *job) for job in jobs]
+            return [future.result() for future in futures]
+
+    return [_evaluate(num, frames[frame_interval], *rest) for num, frame_interval, *rest in jobs]
@@ -33,6 +33,8 @@ UPBIT_SECRET_KEY = os.getenv('UPBIT_SECRET_KEY', '')
 TRADING_MODE = os.getenv('TRADING_MODE', 'test')  # test or real
 INVEST_RATIO = float(os.getenv('INVEST_RATIO', '0.1'))  # 투자 비율
 TARGET_COIN = os.getenv('TARGET_COIN', 'KRW-BTC')
+TARGET_COINS = os.getenv('TARGET_COINS', TARGET_COIN).split(',')  # 멀티 티커 봇 (쉼표로 구분)
+TAKE_PROFIT_ORDER = os.getenv('TAKE_PROFIT_ORDER', 'true').lower() == 'true'  # 매수 직후 익절 지정가 매도
 
 # ========================================
 # 전략 파라미터
@@ -67,6 +69,26 @@ STOP_LOSS = STRATEGY_SETTINGS[SELECTED_STRATEGY]['stop_loss']
 TAKE_PROFIT = STRATEGY_SETTINGS[SELECTED_STRATEGY]['take_profit']
 INTERVAL = STRATEGY_SETTINGS[SELECTED_STRATEGY]['interval']
 
+# ========================================
+# 지표 캐시
+# ========================================
+# 비워두면 메모리 캐시만 사용, 경로를 주면 프로세스 간 디스크 캐시
+INDICATOR_CACHE_DIR = os.getenv('INDICATOR_CACHE_DIR', '')
+INDICATOR_CACHE_MEMORY_MB = int(os.getenv('INDICATOR_CACHE_MEMORY_MB', '256'))  # 메모리 캐시 상한
+INDICATOR_CACHE_DISK_MB = int(os.getenv('INDICATOR_CACHE_DISK_MB', '1024'))  # 디스크 캐시 상한 (넘으면 오래된 파일부터 삭제)
+
+# ========================================
+# 요청 속도 제한
+# ========================================
+# 비워두면 프로세스 안에서만 제한, 경로를 주면 같은 파일을 쓰는 프로세스끼리 공유
+RATE_LIMIT_FILE = os.getenv('RATE_LIMIT_FILE', '')
+
+# ========================================
+# 시세 공유 데몬
+# ========================================
+# 비워두면 봇이 업비트에서 직접 시세를 받고, 경로를 주면 market_data.py 데몬을 구독
+MARKET_DATA_SOCKET = os.getenv('MARKET_DATA_SOCKET', '')
+
 # ========================================
 # 텔레그램 알림
 # ========================================
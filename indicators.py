@@ -0,0 +1,331 @@
+"""
+기술적 지표 계산 + 메모이제이션 캐시
+(데이터 지문, 지표 이름, 파라미터) 단위로 결과를 재사용한다.
+파라미터 스윕처럼 같은 캔들로 여러 번 백테스트할 때 지표는 한 번만 계산된다.
+"""
+import os
+import math
+import hashlib
+from collections import OrderedDict
+import numpy as np
+import ta
+import config
+
+
+def compute_rsi(close, period=14):
+    """
+    RSI → (rsi,)
+    """
+    return (ta.momentum.RSIIndicator(close=close, window=period).rsi(),)
+
+
+def compute_macd(close, fast=12, slow=26, signal=9):
+    """
+    MACD → (macd, macd_signal, macd_diff)
+    """
+    macd = ta.trend.MACD(
+        close=close,
+        window_fast=fast,
+        window_slow=slow,
+        window_sign=signal
+    )
+    return macd.macd(), macd.macd_signal(), macd.macd_diff()
+
+
+def compute_bollinger(close, window=20, dev=2):
+    """
+    볼린저 밴드 → (upper, middle, lower)
+    """
+    bollinger = ta.volatility.BollingerBands(close=close, window=window, window_dev=dev)
+    return (
+        bollinger.bollinger_hband(),
+        bollinger.bollinger_mavg(),
+        bollinger.bollinger_lband(),
+    )
+
+
+def compute_ma(close, window):
+    """
+    이동평균 → (ma,)
+    """
+    return (close.rolling(window=window).mean(),)
+
+
+# 지표 이름 → 계산 함수
+INDICATORS = {
+    'rsi': compute_rsi,
+    'macd': compute_macd,
+    'bollinger': compute_bollinger,
+    'ma': compute_ma,
+}
+
+
+def fingerprint(close):
+    """
+    종가 데이터 지문 (값이 같으면 같은 지문)
+    """
+    values = np.ascontiguousarray(np.asarray(close, dtype=np.float64))
+    digest = hashlib.blake2b(values.tobytes(), digest_size=16)
+    digest.update(str(len(values)).encode())
+    return digest.hexdigest()
+
+
+class IndicatorCache:
+    """
+    LRU 지표 캐시 (+ 선택적 디스크 계층)
+
+    값은 지표 출력 배열들을 쌓은 2차원 배열 (출력 개수 × 봉 개수)
+    메모리는 항목 수/바이트 상한, 디스크는 전체 크기 상한을 넘으면
+    가장 오래 안 쓴 것(디스크는 수정 시각이 오래된 파일)부터 지운다.
+    """
+
+    def __init__(self, maxsize=256, disk_dir=None, max_bytes=None, disk_max_bytes=None):
+        """
+        Args:
+            maxsize: 메모리 캐시 최대 항목 수
+            disk_dir: 디스크 계층 경로 (None이면 메모리만)
+            max_bytes: 메모리 캐시 최대 바이트 (None이면 항목 수만 제한)
+            disk_max_bytes: 디스크 캐시 최대 바이트 (None이면 제한 없음)
+        """
+        self.maxsize = maxsize
+        self.disk_dir = disk_dir
+        self.max_bytes = max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self._entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _disk_path(self, key):
+        name = hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+        return os.path.join(self.disk_dir, f"{name}.npy")
+
+    def get(self, key):
+        """
+        캐시 조회 (메모리 → 디스크 순)
+
+        Returns:
+            2차원 배열 (없으면 None)
+        """
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+        if self.disk_dir:
+            path = self._disk_path(key)
+            try:
+                value = np.load(path)
+                os.utime(path)      # 최근 사용 표시 (디스크 정리 순서)
+            except (FileNotFoundError, ValueError):
+                value = None        # 없음 / 다른 프로세스가 정리 중
+            if value is not None:
+                value.flags.writeable = False
+                self._remember(key, value)
+                self.hits += 1
+                return value
+
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        """
+        캐시 저장 (디스크 계층이 있으면 파일로도 저장)
+        """
+        value = np.array(value, dtype=np.float64)
+        value.flags.writeable = False
+        self._remember(key, value)
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            path = self._disk_path(key)
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                np.save(f, value)
+            os.replace(tmp_path, path)
+            self._trim_disk()
+
+        return value
+
+    def _remember(self, key, value):
+        if key in self._entries:
+            self.nbytes -= self._entries[key].nbytes
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        self.nbytes += value.nbytes
+
+        while len(self._entries) > 1 and (
+                len(self._entries) > self.maxsize or
+                (self.max_bytes is not None and self.nbytes > self.max_bytes)):
+            _, evicted = self._entries.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+
+    def _trim_disk(self):
+        """
+        디스크 캐시가 disk_max_bytes를 넘으면 수정 시각이 오래된 파일부터 삭제
+        """
+        if self.disk_max_bytes is None:
+            return
+
+        files = []
+        for entry in os.scandir(self.disk_dir):
+            if entry.name.endswith('.npy'):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass        # 다른 프로세스가 먼저 삭제
+            total -= size
+
+    def clear(self):
+        """
+        메모리 캐시 비우기 (디스크는 유지)
+        """
+        self._entries.clear()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+
+# 프로세스 공용 캐시 (config.INDICATOR_CACHE_DIR가 있으면 디스크 계층 사용)
+INDICATOR_CACHE = IndicatorCache(
+    disk_dir=config.INDICATOR_CACHE_DIR or None,
+    max_bytes=config.INDICATOR_CACHE_MEMORY_MB * 1024 * 1024,
+    disk_max_bytes=config.INDICATOR_CACHE_DISK_MB * 1024 * 1024,
+)
+
+
+def cached_indicator(name, close, params, data_key=None, cache=None):
+    """
+    캐시를 거쳐 지표 계산
+
+    Args:
+        name: 지표 이름 (INDICATORS 키)
+        close: 종가 Series
+        params: 지표 파라미터 튜플
+        data_key: 종가 지문 (여러 지표에 재사용할 때 미리 계산해서 전달)
+        cache: 사용할 캐시 (기본값: INDICATOR_CACHE)
+
+    Returns:
+        지표 출력 배열 튜플 (각각 봉 개수 길이, 복사본)
+    """
+    cache = cache if cache is not None else INDICATOR_CACHE
+    key = (data_key or fingerprint(close), name, tuple(params))
+
+    value = cache.get(key)
+    if value is None:
+        outputs = INDICATORS[name](close, *params)
+        value = cache.put(key, np.vstack([np.asarray(o, dtype=np.float64) for o in outputs]))
+
+    return tuple(row.copy() for row in value)
+
+
+# 지표 컬럼 (calculate_indicators 출력 순서)
+ALL_COLUMNS = (
+    'rsi', 'macd', 'macd_signal', 'macd_diff',
+    'bb_upper', 'bb_middle', 'bb_lower',
+    'ma_5', 'ma_20', 'ma_60', 'ma_120',
+)
+
+
+def column_sources(params=None):
+    """
+    지표 컬럼 → (지표 이름, 파라미터, 출력 위치)
+    """
+    params = params or {}
+    rsi = ('rsi', (params.get('rsi_period', 14),))
+    macd = ('macd', (
+        params.get('macd_fast', 12),
+        params.get('macd_slow', 26),
+        params.get('macd_signal', 9),
+    ))
+    bollinger = ('bollinger', (20, 2))
+
+    sources = {
+        'rsi': rsi + (0,),
+        'macd': macd + (0,),
+        'macd_signal': macd + (1,),
+        'macd_diff': macd + (2,),
+        'bb_upper': bollinger + (0,),
+        'bb_middle': bollinger + (1,),
+        'bb_lower': bollinger + (2,),
+    }
+    for window in [5, 20, 60, 120]:
+        sources[f'ma_{window}'] = ('ma', (window,), 0)
+
+    return sources
+
+
+def indicator_warmup(name, params):
+    """
+    지표가 안정되는 데 필요한 캔들 개수
+
+    이동 창 지표는 창 길이, 지수이동평균 지표는 초기값 영향이
+    e^-10 이하로 줄어드는 길이 (10 / alpha)
+    """
+    if name == 'rsi':
+        period, = params
+        return 10 * period
+    if name == 'macd':
+        fast, slow, signal = params
+        return math.ceil(10 * (slow + 1) / 2) + math.ceil(10 * (signal + 1) / 2)
+    if name in ('bollinger', 'ma'):
+        return params[0]
+    raise KeyError(name)
+
+
+class IndicatorPipeline:
+    """
+    요청한 지표 컬럼만 계산하는 파이프라인
+
+    컬럼별로 필요한 지표만 (캐시를 거쳐) 계산하고,
+    MACD/볼린저처럼 출력이 여러 개인 지표는 한 번만 계산해 나눠 쓴다.
+    """
+
+    def __init__(self, params=None, cache=None):
+        self.params = params or {}
+        self.cache = cache
+        self.sources = column_sources(self.params)
+
+    def build(self, df, columns=ALL_COLUMNS):
+        """
+        df에 columns 지표 추가
+
+        Args:
+            df: OHLCV 데이터프레임
+            columns: 계산할 지표 컬럼 (기본값: 전체)
+
+        Returns:
+            지표가 추가된 데이터프레임
+        """
+        columns = [col for col in ALL_COLUMNS if col in set(columns)]
+        if not columns:
+            return df
+
+        close = df['close']
+        data_key = fingerprint(close)
+        outputs = {}
+
+        for column in columns:
+            name, params, position = self.sources[column]
+            if (name, params) not in outputs:
+                outputs[(name, params)] = cached_indicator(name, close, params, data_key, self.cache)
+            df[column] = outputs[(name, params)][position]
+
+        return df
+
+    def lookback(self, columns=ALL_COLUMNS):
+        """
+        columns 지표에 필요한 최소 캔들 개수
+        """
+        groups = {self.sources[col][:2] for col in columns}
+        return max((indicator_warmup(name, params) for name, params in groups), default=0)
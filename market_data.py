@@ -0,0 +1,601 @@
+"""
+시세 공유 데몬
+업비트 연결(REST 연결 풀 + 웹소켓 체결가)은 데몬 하나만 갖고, 같은 티커를 보는 봇 프로세스 여러 개에
+Unix 소켓으로 캔들/현재가를 나눠 주고 체결가를 밀어 준다.
+- 캔들은 (티커, 주기)마다 CandleWindow 하나를 두고, 동시에 들어온 요청은 업비트 요청 1번으로 합친다
+- 현재가는 체결가 피드나 일괄 현재가 요청 결과를 price_ttl 동안 재사용한다
+- 메시지는 줄 단위 JSON ({"id", "op", ...} 요청 → {"id", "result"} 응답, {"type": "tick"} 푸시)
+
+사용법:
+    python market_data.py KRW-BTC,KRW-ETH            # 데몬 실행
+    MARKET_DATA_SOCKET=/tmp/upbit_market_data.sock python bot.py   # 봇은 구독 모드
+"""
+import os
+import sys
+import json
+import time
+import queue
+import asyncio
+import itertools
+import threading
+import numpy as np
+import pandas as pd
+from upbit_client import AsyncUpbitClient, PAGE_SIZE
+from ticker_feed import TickerFeed
+from candle_clock import to_kst
+from candle_window import CandleWindow
+
+
+DEFAULT_SOCKET = "/tmp/upbit_market_data.sock"
+STREAM_LIMIT = 2 ** 24          # 한 줄 최대 크기 (캔들 200개 JSON이 기본 64KB를 넘을 수 있음)
+MAX_PENDING_BYTES = 2 ** 20     # 구독자 송신 버퍼가 이보다 쌓이면 체결가 푸시를 버림 (느린 봇)
+
+
+class MarketDataError(Exception):
+    """
+    데몬이 돌려준 요청 실패 (업비트 오류 등)
+    """
+
+
+def frame_to_json(df):
+    """
+    캔들 DataFrame → JSON 직렬화용 dict (시각은 ns 정수)
+    """
+    if df is None:
+        return None
+    return {
+        'time': df.index.values.astype('datetime64[ns]').astype(np.int64).tolist(),
+        'columns': {column: df[column].tolist() for column in df.columns},
+    }
+
+
+def frame_from_json(data):
+    """
+    frame_to_json 결과 → 캔들 DataFrame (pyupbit와 같은 시간대 없는 KST 인덱스)
+    """
+    if data is None:
+        return None
+    index = pd.DatetimeIndex(np.array(data['time'], dtype='datetime64[ns]'))
+    return pd.DataFrame(data['columns'], index=index)
+
+
+def encode(message):
+    return (json.dumps(message) + "\n").encode()
+
+
+class MarketDataServer:
+    """
+    시세 공유 데몬 (전용 스레드의 이벤트 루프에서 실행)
+
+    사용법:
+        server = MarketDataServer(["KRW-BTC"]).start()
+        ...
+        server.stop()
+    """
+
+    def __init__(self, tickers=(), path=DEFAULT_SOCKET, client=None, use_ticker_feed=True,
+                 candle_ttl=1.0, price_ttl=1.0, clock=time.monotonic):
+        """
+        Args:
+            tickers: 체결가를 받을 티커 (구독자가 다른 티커를 구독하면 추가)
+            path: Unix 소켓 경로
+            client: AsyncUpbitClient (기본값: 업비트 API, 테스트는 모의 거래소)
+            use_ticker_feed: 웹소켓 체결가를 받아 구독자에게 푸시
+            candle_ttl: 캔들 창을 다시 받지 않고 재사용할 시간 (초, 봉 마감에 몰리는 요청을 합침)
+            price_ttl: 현재가를 다시 받지 않고 재사용할 시간 (초)
+            clock: 현재 시각 함수
+        """
+        self.tickers = set(tickers)
+        self.path = path
+        self.client = client or AsyncUpbitClient()
+        self.use_ticker_feed = use_ticker_feed
+        self.candle_ttl = candle_ttl
+        self.price_ttl = price_ttl
+        self.clock = clock
+
+        self.windows = {}       # (티커, 주기) → (CandleWindow, 받은 시각)
+        self.prices = {}        # 티커 → (현재가, 받은 시각)
+        self.inflight = {}      # 진행 중인 업비트 요청 (같은 요청은 합침)
+        self.subscribers = {}   # writer → 구독 티커 집합
+        self.stats = {'requests': 0, 'fetches': 0, 'ticks': 0, 'dropped': 0}
+
+        self.feed = None
+        self.server = None
+        self.loop = None
+        self.thread = None
+        self.ready = threading.Event()
+        self._stopping = None
+
+    # ----------------------------------------
+    # 실행 / 종료
+    # ----------------------------------------
+    def start(self):
+        """
+        데몬 스레드 시작 (소켓을 열 때까지 대기)
+        """
+        if self.thread and self.thread.is_alive():
+            return self
+
+        self.ready.clear()
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run_loop, daemon=True)
+        self.thread.start()
+        self.ready.wait()
+        return self
+
+    def stop(self, timeout=5):
+        """
+        구독자 연결을 끊고 소켓/업비트 연결 정리
+        """
+        if not self.thread:
+            return
+        self.loop.call_soon_threadsafe(self._stopping.set)
+        self.thread.join(timeout)
+        self.thread = None
+
+    def serve_forever(self):
+        """
+        Ctrl+C까지 실행 (python market_data.py)
+        """
+        self.start()
+        try:
+            while self.thread.is_alive():
+                self.thread.join(1)
+        except KeyboardInterrupt:
+            print("\n⛔ 시세 데몬 종료")
+        finally:
+            self.stop()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self._stopping = asyncio.Event()
+        self.loop.run_until_complete(self._serve())
+        self.loop.close()
+
+    async def _serve(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)     # 이전 실행이 남긴 소켓 파일
+        self.server = await asyncio.start_unix_server(self._handle, self.path, limit=STREAM_LIMIT)
+        self._update_feed()
+        print(f"📡 시세 데몬: {self.path} (티커 {len(self.tickers)}개)")
+        self.ready.set()
+
+        try:
+            await self._stopping.wait()
+        finally:
+            self.server.close()
+            for writer in list(self.subscribers):
+                writer.close()
+            await self.server.wait_closed()
+            if self.feed:
+                self.feed.stop()
+            await self.client.close()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    # ----------------------------------------
+    # 구독자 연결
+    # ----------------------------------------
+    async def _handle(self, reader, writer):
+        """
+        구독자 1개 (요청마다 태스크를 띄워 느린 요청이 다른 요청을 막지 않게)
+        """
+        self.subscribers[writer] = set()
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                task = asyncio.ensure_future(self._respond(writer, json.loads(line)))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (ConnectionError, ValueError) as e:
+            print(f"⚠️ 구독자 연결 오류: {e}")
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.subscribers.pop(writer, None)
+            writer.close()
+
+    async def _respond(self, writer, message):
+        self.stats['requests'] += 1
+        reply = {'id': message.get('id')}
+        try:
+            op = message['op']
+            if op == 'subscribe':
+                self.subscribers.setdefault(writer, set()).update(message['tickers'])
+                self.tickers.update(message['tickers'])
+                self._update_feed()
+                reply['result'] = True
+            elif op == 'ohlcv':
+                df = await self.ohlcv(message['ticker'], message.get('interval', 'day'),
+                                      message.get('count', PAGE_SIZE), message.get('to'))
+                reply['result'] = frame_to_json(df)
+            elif op == 'price':
+                reply['result'] = await self.price(message['tickers'])
+            else:
+                raise ValueError(f"알 수 없는 요청: {op}")
+        except Exception as e:
+            reply['error'] = str(e) or type(e).__name__
+
+        if not writer.is_closing():
+            writer.write(encode(reply))
+
+    # ----------------------------------------
+    # 시세
+    # ----------------------------------------
+    async def _shared(self, key, factory):
+        """
+        같은 key의 업비트 요청이 진행 중이면 그 결과를 함께 기다림
+        """
+        future = self.inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(factory())
+            self.inflight[key] = future
+            future.add_done_callback(lambda _: self.inflight.pop(key, None))
+        return await asyncio.shield(future)
+
+    async def ohlcv(self, ticker, interval="day", count=PAGE_SIZE, to=None):
+        """
+        캔들 (최근 PAGE_SIZE개 이내는 공용 캔들 창에서, 과거 구간/그 이상은 그대로 전달)
+
+        Returns:
+            DataFrame 또는 None
+        """
+        if to is not None or count > PAGE_SIZE:
+            self.stats['fetches'] += 1
+            return await self.client.get_ohlcv(ticker, interval=interval, count=count, to=to)
+
+        key = (ticker, interval)
+        entry = self.windows.get(key)
+        if entry is None or self.clock() - entry[1] >= self.candle_ttl:
+            entry = await self._shared(('ohlcv',) + key, lambda: self._refresh_window(ticker, interval))
+
+        window = entry[0]
+        if len(window) == 0:
+            return None
+        return window.frame().tail(count)
+
+    async def _refresh_window(self, ticker, interval):
+        """
+        캔들 창 최신화 (처음엔 PAGE_SIZE개, 이후엔 마지막 봉부터 새 봉까지만)
+        """
+        entry = self.windows.get((ticker, interval))
+        window = entry[0] if entry else CandleWindow(PAGE_SIZE)
+        count = window.fetch_count(interval, to_kst(time.time()))
+
+        self.stats['fetches'] += 1
+        df = await self.client.get_ohlcv(ticker, interval=interval, count=count)
+        if not window.update(df):
+            # 처음이거나 중간이 비었으면 전체 다시 채움
+            if count < window.capacity:
+                self.stats['fetches'] += 1
+                df = await self.client.get_ohlcv(ticker, interval=interval, count=window.capacity)
+            window.seed(df)
+
+        entry = (window, self.clock())
+        self.windows[(ticker, interval)] = entry
+        return entry
+
+    async def price(self, tickers):
+        """
+        현재가 (price_ttl 안의 체결가/조회 결과가 없는 티커만 일괄 조회 1번)
+
+        Returns:
+            {티커: 현재가}
+        """
+        now = self.clock()
+        missing = sorted(t for t in tickers if t not in self.prices or now - self.prices[t][1] >= self.price_ttl)
+
+        if missing:
+            await self._shared(('price',) + tuple(missing), lambda: self._fetch_prices(missing))
+        return {t: self.prices[t][0] for t in tickers if t in self.prices}
+
+    async def _fetch_prices(self, tickers):
+        self.stats['fetches'] += 1
+        prices = await self.client.get_current_price(list(tickers))
+        now = self.clock()
+        for ticker, price in prices.items():
+            self.prices[ticker] = (price, now)
+        return prices
+
+    # ----------------------------------------
+    # 체결가 푸시
+    # ----------------------------------------
+    def _update_feed(self):
+        """
+        구독 티커가 늘면 웹소켓 피드를 새 목록으로 다시 연결
+        """
+        if not self.use_ticker_feed or not self.tickers:
+            return
+        if self.feed and set(self.feed.tickers) >= self.tickers:
+            return
+
+        old = self.feed
+        self.feed = TickerFeed(sorted(self.tickers), on_price=self.publish).start()
+        if old:
+            self.loop.run_in_executor(None, old.stop)
+
+    def publish(self, ticker, price):
+        """
+        체결가를 구독자에게 푸시 (피드 스레드 등 어느 스레드에서 불러도 됨)
+        """
+        self.loop.call_soon_threadsafe(self._publish, ticker, price)
+
+    def _publish(self, ticker, price):
+        self.prices[ticker] = (price, self.clock())
+        self.stats['ticks'] += 1
+        message = encode({'type': 'tick', 'ticker': ticker, 'price': price})
+
+        for writer, tickers in self.subscribers.items():
+            if ticker not in tickers or writer.is_closing():
+                continue
+            # 읽지 못하고 쌓이는 구독자 때문에 데몬 메모리가 늘지 않게 버림
+            if writer.transport.get_write_buffer_size() > MAX_PENDING_BYTES:
+                self.stats['dropped'] += 1
+                continue
+            writer.write(message)
+
+
+class AsyncMarketDataClient:
+    """
+    시세 데몬 구독자 (비동기, AsyncUpbitClient의 시세 메서드와 같은 형태)
+    """
+
+    def __init__(self, path=DEFAULT_SOCKET, timeout=5, on_price=None):
+        """
+        Args:
+            path: 데몬 Unix 소켓 경로
+            timeout: 요청 타임아웃 (초)
+            on_price: 체결가 푸시마다 호출할 함수 (ticker, price) - 이벤트 루프에서 실행
+        """
+        self.path = path
+        self.timeout = timeout
+        self.on_price = on_price
+
+        self.tickers = set()
+        self.prices = {}        # 티커 → (체결가, 받은 시각)
+        self.pending = {}       # 요청 id → Future
+        self.ids = itertools.count(1)
+        self.reader = None
+        self.writer = None
+        self.receiver = None
+        self.lock = asyncio.Lock()
+
+    @property
+    def connected(self):
+        return self.writer is not None
+
+    async def open(self):
+        """
+        데몬 연결 (끊겼으면 다시 연결하고 구독 복구)
+        """
+        async with self.lock:
+            if self.writer is None:
+                self.reader, self.writer = await asyncio.open_unix_connection(self.path, limit=STREAM_LIMIT)
+                self.receiver = asyncio.ensure_future(self._receive())
+                if self.tickers:
+                    self._send({'op': 'subscribe', 'tickers': sorted(self.tickers)})
+        return self
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        if self.receiver is not None:
+            await asyncio.gather(self.receiver, return_exceptions=True)
+            self.receiver = None
+
+    def _send(self, message):
+        self.writer.write(encode(message))
+
+    async def _receive(self):
+        """
+        응답/푸시 수신 (연결이 끊기면 대기 중인 요청을 실패 처리)
+        """
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+
+                if message.get('type') == 'tick':
+                    self.prices[message['ticker']] = (message['price'], time.monotonic())
+                    if self.on_price:
+                        self.on_price(message['ticker'], message['price'])
+                    continue
+
+                future = self.pending.pop(message.get('id'), None)
+                if future is None or future.done():
+                    continue
+                if 'error' in message:
+                    future.set_exception(MarketDataError(message['error']))
+                else:
+                    future.set_result(message.get('result'))
+        except (ConnectionError, ValueError) as e:
+            print(f"⚠️ 시세 데몬 수신 오류: {e}")
+        finally:
+            self.writer = None
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("시세 데몬 연결 끊김"))
+            self.pending.clear()
+
+    async def request(self, op, **params):
+        """
+        데몬 요청 1개
+
+        Returns:
+            응답 result
+        """
+        await self.open()
+        request_id = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        self._send({'id': request_id, 'op': op, **params})
+        try:
+            return await asyncio.wait_for(future, self.timeout)
+        finally:
+            self.pending.pop(request_id, None)
+
+    async def subscribe(self, tickers):
+        """
+        체결가 푸시 구독 (재연결하면 자동 복구)
+        """
+        self.tickers.update(tickers)
+        return await self.request('subscribe', tickers=sorted(self.tickers))
+
+    async def get_ohlcv(self, ticker="KRW-BTC", interval="day", count=200, to=None):
+        """
+        캔들 (pyupbit.get_ohlcv와 같은 형식)
+        """
+        to = pd.Timestamp(to).isoformat() if to is not None else None
+        return frame_from_json(await self.request('ohlcv', ticker=ticker, interval=interval, count=count, to=to))
+
+    async def get_current_price(self, ticker="KRW-BTC"):
+        """
+        현재가 (티커 1개면 float, 목록이면 {티커: 가격})
+        """
+        tickers = [ticker] if isinstance(ticker, str) else list(ticker)
+        prices = await self.request('price', tickers=tickers)
+
+        if isinstance(ticker, str):
+            return prices[ticker]
+        return prices
+
+
+class MarketDataClient:
+    """
+    동기 코드용 구독자 (TradingBot 구독 모드)
+
+    UpbitClient처럼 get_ohlcv/get_current_price/gather/aio를 제공하고,
+    TickerFeed처럼 start/stop/latest를 제공하므로 봇의 시세 원본과 체결가 피드를 함께 대신한다.
+
+    사용법:
+        market = MarketDataClient("/tmp/upbit_market_data.sock")
+        bot = TradingBot(market_data=market)
+    """
+
+    def __init__(self, path=None, timeout=5, stale_after=10.0):
+        """
+        Args:
+            path: 데몬 Unix 소켓 경로 (기본값: DEFAULT_SOCKET)
+            timeout: 요청 타임아웃 (초)
+            stale_after: 마지막 체결가 푸시 후 이 시간이 지나면 latest()가 None (초)
+        """
+        self.stale_after = stale_after
+        self.on_price = None
+        self.ticks = queue.Queue()
+        self.dispatcher = None
+
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.aio = self.call(self._create(path or DEFAULT_SOCKET, timeout))
+
+    async def _create(self, path, timeout):
+        # asyncio.Lock을 구독자 이벤트 루프 안에서 만들기 위해
+        return AsyncMarketDataClient(path, timeout, on_price=self._queue_tick)
+
+    def call(self, coro):
+        """
+        코루틴 실행 후 결과 반환
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def gather(self, *coros):
+        """
+        여러 요청을 동시에 보내고 결과 목록 반환
+        """
+        async def run_all():
+            return await asyncio.gather(*coros)
+        return self.call(run_all())
+
+    def get_ohlcv(self, ticker="KRW-BTC", interval="day", count=200, to=None):
+        try:
+            return self.call(self.aio.get_ohlcv(ticker, interval=interval, count=count, to=to))
+        except Exception:
+            return None
+
+    def get_current_price(self, ticker="KRW-BTC"):
+        return self.call(self.aio.get_current_price(ticker))
+
+    def _queue_tick(self, ticker, price):
+        # 콜백(손절/익절 주문)이 구독자 이벤트 루프를 막지 않게 별도 스레드에서 실행
+        if self.on_price:
+            self.ticks.put((ticker, price))
+
+    def _dispatch(self):
+        while True:
+            tick = self.ticks.get()
+            if tick is None:
+                return
+            try:
+                self.on_price(*tick)
+            except Exception as e:
+                print(f"❌ 체결가 처리 에러: {e}")
+
+    def subscribe(self, tickers, on_price=None):
+        """
+        체결가 푸시 구독 (데몬이 꺼져 있으면 다음 요청 때 다시 연결하며 복구)
+
+        Args:
+            tickers: 티커 목록
+            on_price: 체결가마다 호출할 함수 (ticker, price) - 전용 스레드에서 실행
+        """
+        self.on_price = on_price
+        if on_price and self.dispatcher is None:
+            self.dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+            self.dispatcher.start()
+        try:
+            self.call(self.aio.subscribe(tickers))
+        except (OSError, asyncio.TimeoutError, MarketDataError) as e:
+            self.aio.tickers.update(tickers)
+            print(f"⚠️ 시세 데몬 연결 실패: {e}")
+        return self
+
+    def start(self):
+        """
+        TickerFeed 호환 (구독은 subscribe에서 이미 시작)
+        """
+        return self
+
+    def latest(self, ticker):
+        """
+        마지막 체결가 (연결이 끊겼거나 오래된 가격이면 None → get_current_price로 대체)
+        """
+        entry = self.aio.prices.get(ticker)
+        if entry is None or not self.aio.connected:
+            return None
+
+        price, received = entry
+        if time.monotonic() - received > self.stale_after:
+            return None
+        return price
+
+    def stop(self):
+        self.close()
+
+    def close(self):
+        """
+        데몬 연결과 이벤트 루프 종료
+        """
+        if not self.thread.is_alive():
+            return
+        self.call(self.aio.close())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        if self.dispatcher:
+            self.ticks.put(None)
+            self.dispatcher.join()
+            self.dispatcher = None
+
+
+if __name__ == "__main__":
+    # 사용법: python market_data.py KRW-BTC,KRW-ETH [소켓 경로]
+    import config
+
+    tickers = sys.argv[1].split(',') if len(sys.argv) > 1 else config.TARGET_COINS
+    path = sys.argv[2] if len(sys.argv) > 2 else (config.MARKET_DATA_SOCKET or DEFAULT_SOCKET)
+    MarketDataServer(tickers, path=path).serve_forever()
@@ -0,0 +1,588 @@
+"""
+오프라인 업비트 모의 거래소
+캔들/현재가/계좌/주문 API를 흉내 내는 로컬 HTTP 서버.
+저장된 캔들이나 합성 캔들을 한 봉씩 재생하고, 시장가 주문은 현재가 주변의
+가상 호가창을 따라 체결하며, 지정가 주문은 이후 봉의 고가/저가로 체결한다.
+응답 지연(latency)을 줄 수 있어 봇 루프 부하 테스트와 신호→주문 지연 측정에 쓴다.
+
+사용법:
+    python mock_exchange.py --port 8765 --latency 0.05
+    → TradingBot(client=UpbitClient(access, secret, base_url="http://127.0.0.1:8765/v1"))
+"""
+import time
+import uuid
+import asyncio
+import threading
+from collections import Counter
+from datetime import datetime
+import jwt
+import pandas as pd
+from aiohttp import web
+from upbit_client import CANDLE_PATHS
+
+
+KST_OFFSET = pd.Timedelta(hours=9)
+MIN_ORDER = 5000            # 최소 주문 금액 (원)
+
+
+def number(value):
+    """
+    업비트 응답처럼 숫자를 문자열로
+    """
+    return f"{float(value):.8f}".rstrip('0').rstrip('.') or "0"
+
+
+class MockExchange:
+    """
+    모의 거래소 (별도 스레드의 aiohttp 서버)
+
+    사용법:
+        exchange = MockExchange(make_candles(n=500), interval="day", balances={'KRW': 1_000_000})
+        base_url = exchange.start()
+        client = UpbitClient("access", "secret", base_url=base_url)
+        ...
+        exchange.advance()      # 다음 봉으로 (대기 지정가 주문 체결 확인)
+        exchange.stop()
+    """
+
+    def __init__(self, candles, interval="day", ticker="KRW-BTC", access_key=None, secret_key=None,
+                 balances=None, start=None, latency=0.0, fee=0.0005, spread=0.0005,
+                 depth=100_000_000, levels=20, level_step=0.0005, seconds_per_candle=None):
+        """
+        Args:
+            candles: 재생할 캔들 DataFrame (KST 인덱스) 또는 {티커: DataFrame}
+            interval: 캔들 주기 (이 주기의 캔들 API만 응답)
+            ticker: candles가 DataFrame일 때 티커
+            access_key, secret_key: 인증 키 (secret_key가 없으면 서명 검사 생략)
+            balances: 시작 잔고 {'KRW': 원, 'BTC': 수량}
+            start: 시작 봉 위치 (기본값: 200번째 봉, 캔들이 적으면 마지막 봉)
+            latency: 요청마다 추가할 응답 지연 (초)
+            fee: 거래 수수료율
+            spread: 매수/매도 1호가 간격 (현재가 대비)
+            depth: 호가창 한쪽 총 잔량 (원)
+            levels: 호가 단계 수
+            level_step: 호가 단계 간격 (현재가 대비)
+            seconds_per_candle: 지정하면 이 시간(초)마다 자동으로 다음 봉
+        """
+        if isinstance(candles, pd.DataFrame):
+            candles = {ticker: candles}
+        self.candles = {t: df.sort_index() for t, df in candles.items()}
+        self.timeline = next(iter(self.candles.values())).index
+        self.candle_rows = {t: candles_json(t, df)[::-1] for t, df in self.candles.items()}  # 오름차순
+
+        self.interval = interval
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.latency = latency
+        self.fee = fee
+        self.spread = spread
+        self.depth = depth
+        self.levels = levels
+        self.level_step = level_step
+        self.seconds_per_candle = seconds_per_candle
+
+        self.position = min(200, len(self.timeline) - 1) if start is None else start
+        self.balances = {'KRW': 1_000_000.0}
+        if balances is not None:
+            self.balances = {k: float(v) for k, v in balances.items()}
+        self.locked = Counter()
+        self.avg_buy_price = {}
+
+        self.orders = {}            # uuid → 주문
+        self.order_times = {}       # uuid → 접수 시각 (time.perf_counter)
+        self.requests = Counter()   # 경로별 요청 수
+
+        self.lock = threading.RLock()
+        self.loop = None
+        self.thread = None
+        self.runner = None
+        self.base_url = None
+
+    # ----- 시세 -----
+
+    @property
+    def now(self):
+        """
+        현재(진행 중인) 봉 시각 (KST)
+        """
+        return self.timeline[self.position]
+
+    def _frame(self, ticker):
+        df = self.candles.get(ticker)
+        if df is None:
+            return None
+        return df[df.index <= self.now]
+
+    def price(self, ticker):
+        """
+        현재가 (현재 봉 종가)
+        """
+        return float(self._frame(ticker)['close'].iloc[-1])
+
+    def advance(self, steps=1):
+        """
+        다음 봉으로 이동 후 대기 중인 지정가 주문 체결
+
+        Returns:
+            이동했으면 True (마지막 봉이면 False)
+        """
+        with self.lock:
+            moved = False
+            for _ in range(steps):
+                if self.position >= len(self.timeline) - 1:
+                    break
+                self.position += 1
+                moved = True
+                self._match_limit_orders()
+            return moved
+
+    def book(self, ticker, side):
+        """
+        가상 호가창 [(가격, 수량)] - side='ask'는 매도 호가(매수 체결용), 'bid'는 매수 호가
+        """
+        price = self.price(ticker)
+        sign = 1 if side == 'ask' else -1
+        level_value = self.depth / self.levels
+        book = []
+        for i in range(self.levels):
+            level_price = price * (1 + sign * (self.spread / 2 + i * self.level_step))
+            book.append((level_price, level_value / level_price))
+        return book
+
+    # ----- 체결 -----
+
+    def _fill_market(self, ticker, side, funds=None, volume=None):
+        """
+        호가창을 따라 시장가 체결 (호가가 모자라면 마지막 호가로 나머지 체결)
+
+        Returns:
+            [(가격, 수량)]
+        """
+        trades = []
+        book = self.book(ticker, 'ask' if side == 'bid' else 'bid')
+
+        for level_price, level_volume in book:
+            if side == 'bid':
+                take = min(level_volume, funds / level_price)
+                funds -= take * level_price
+                done = funds <= 1e-9
+            else:
+                take = min(level_volume, volume)
+                volume -= take
+                done = volume <= 1e-12
+            trades.append((level_price, take))
+            if done:
+                return trades
+
+        last_price = book[-1][0]
+        trades.append((last_price, funds / last_price if side == 'bid' else volume))
+        return trades
+
+    def _settle(self, order, trades):
+        """
+        체결 반영 (잔고, 평균 매수가, 수수료, 주문 상태)
+        """
+        coin = order['market'].split('-')[1]
+        created = datetime.now().astimezone().isoformat(timespec='seconds')
+
+        for price, volume in trades:
+            funds = price * volume
+            fee = funds * self.fee
+
+            if order['side'] == 'bid':
+                held = self.balances.get(coin, 0.0)
+                avg = self.avg_buy_price.get(coin, 0.0)
+                self.avg_buy_price[coin] = (avg * held + funds) / (held + volume)
+                self.balances[coin] = round(held + volume, 8)   # 업비트 코인 잔고는 소수점 8자리
+                self.balances['KRW'] -= funds + fee
+            else:
+                self.balances[coin] = round(self.balances.get(coin, 0.0) - volume, 8)
+                self.balances['KRW'] += funds - fee
+
+            order['trades'].append({
+                'market': order['market'],
+                'uuid': str(uuid.uuid4()),
+                'price': number(price),
+                'volume': number(volume),
+                'funds': number(funds),
+                'side': order['side'],
+                'created_at': created,
+            })
+            order['executed_volume'] += volume
+            order['paid_fee'] += fee
+
+        order['state'] = 'done'
+        order['remaining_volume'] = 0.0
+        order['locked'] = 0.0
+
+    def _match_limit_orders(self):
+        """
+        대기 중인 지정가 주문을 현재 봉 고가/저가로 체결 (체결가 = 주문 가격)
+        """
+        for order in self.orders.values():
+            if order['state'] != 'wait':
+                continue
+            row = self._frame(order['market']).iloc[-1]
+            if order['side'] == 'ask' and row['high'] >= order['price']:
+                self._release(order)
+                self._settle(order, [(order['price'], order['volume'])])
+            elif order['side'] == 'bid' and row['low'] <= order['price']:
+                self._release(order)
+                self._settle(order, [(order['price'], order['volume'])])
+
+    def _lock(self, order):
+        coin = order['market'].split('-')[1]
+        if order['side'] == 'bid':
+            amount = order['price'] * order['volume'] * (1 + self.fee)
+            currency = 'KRW'
+        else:
+            amount = order['volume']
+            currency = coin
+        self.balances[currency] = self.balances.get(currency, 0.0) - amount
+        self.locked[currency] += amount
+        order['locked'] = amount
+        order['locked_currency'] = currency
+
+    def _release(self, order):
+        currency = order['locked_currency']
+        self.balances[currency] = self.balances.get(currency, 0.0) + order['locked']
+        self.locked[currency] -= order['locked']
+        order['locked'] = 0.0
+
+    def place_order(self, params):
+        """
+        주문 접수 (시장가는 바로 체결, 지정가는 닿으면 체결 아니면 대기)
+
+        Returns:
+            (HTTP 상태, 응답)
+        """
+        market = params.get('market')
+        side = params.get('side')
+        ord_type = params.get('ord_type')
+        price = float(params['price']) if params.get('price') else None
+        volume = float(params['volume']) if params.get('volume') else None
+        coin = (market or '-').split('-')[1]
+
+        if market not in self.candles:
+            return 404, error('market_not_found', f"{market} 마켓이 없습니다.")
+        if (side, ord_type) not in (('bid', 'price'), ('ask', 'market'), ('bid', 'limit'), ('ask', 'limit')):
+            return 400, error('invalid_parameter', "side/ord_type 조합이 올바르지 않습니다.")
+        if ord_type in ('price', 'limit') and not price or ord_type in ('market', 'limit') and not volume:
+            return 400, error('invalid_parameter', "price/volume이 필요합니다.")
+
+        total = price if ord_type == 'price' else (volume * (price or self.price(market)))
+        if total < MIN_ORDER:
+            return 400, error('under_min_total_' + side, f"최소주문금액 이상으로 주문해주세요 ({MIN_ORDER}원)")
+        if side == 'bid' and self.balances.get('KRW', 0.0) < total * (1 + self.fee):
+            return 400, error('insufficient_funds_bid', "주문가능한 금액(KRW)이 부족합니다.")
+        if side == 'ask' and self.balances.get(coin, 0.0) < volume - 1e-12:
+            return 400, error('insufficient_funds_ask', f"주문가능한 금액({coin})이 부족합니다.")
+
+        order = {
+            'uuid': str(uuid.uuid4()),
+            'side': side,
+            'ord_type': ord_type,
+            'price': price,
+            'state': 'wait',
+            'market': market,
+            'created_at': datetime.now().astimezone().isoformat(timespec='seconds'),
+            'volume': volume,
+            'remaining_volume': volume,
+            'reserved_fee': (total * self.fee) if side == 'bid' else 0.0,
+            'paid_fee': 0.0,
+            'locked': 0.0,
+            'executed_volume': 0.0,
+            'trades': [],
+        }
+        self.orders[order['uuid']] = order
+        self.order_times[order['uuid']] = time.perf_counter()
+
+        if ord_type == 'price':
+            self._settle(order, self._fill_market(market, 'bid', funds=price))
+        elif ord_type == 'market':
+            self._settle(order, self._fill_market(market, 'ask', volume=volume))
+        else:
+            self._lock(order)
+            best = self.book(market, 'ask' if side == 'bid' else 'bid')[0][0]
+            if (side == 'bid' and price >= best) or (side == 'ask' and price <= best):
+                self._release(order)
+                self._settle(order, [(price, volume)])
+
+        return 201, self.order_json(order, with_trades=False)
+
+    def cancel_order(self, order_id):
+        order = self.orders.get(order_id)
+        if order is None:
+            return 404, error('order_not_found', "주문을 찾지 못했습니다.")
+        if order['state'] != 'wait':
+            return 400, error('invalid_state', "취소할 수 없는 주문입니다.")
+        self._release(order)
+        order['state'] = 'cancel'
+        return 200, self.order_json(order, with_trades=False)
+
+    @staticmethod
+    def order_json(order, with_trades=True):
+        """
+        주문 → 업비트 응답 형식
+        """
+        result = {
+            'uuid': order['uuid'],
+            'side': order['side'],
+            'ord_type': order['ord_type'],
+            'price': number(order['price']) if order['price'] is not None else None,
+            'state': order['state'],
+            'market': order['market'],
+            'created_at': order['created_at'],
+            'volume': number(order['volume']) if order['volume'] is not None else None,
+            'remaining_volume': number(order['remaining_volume'] or 0),
+            'reserved_fee': number(order['reserved_fee']),
+            'remaining_fee': number(max(order['reserved_fee'] - order['paid_fee'], 0)),
+            'paid_fee': number(order['paid_fee']),
+            'locked': number(order['locked']),
+            'executed_volume': number(order['executed_volume']),
+            'trades_count': len(order['trades']),
+        }
+        if with_trades:
+            result['trades'] = order['trades']
+        return result
+
+    def accounts(self):
+        result = []
+        for currency in sorted(set(self.balances) | set(self.locked)):
+            balance = self.balances.get(currency, 0.0)
+            locked = self.locked.get(currency, 0.0)
+            if balance <= 1e-12 and locked <= 1e-12 and currency != 'KRW':
+                continue
+            result.append({
+                'currency': currency,
+                'balance': number(max(balance, 0.0)),
+                'locked': number(locked),
+                'avg_buy_price': number(self.avg_buy_price.get(currency, 0.0)),
+                'avg_buy_price_modified': False,
+                'unit_currency': 'KRW',
+            })
+        return result
+
+    # ----- HTTP -----
+
+    def _authorized(self, request):
+        token = request.headers.get('Authorization', '').replace('Bearer ', '')
+        if not token:
+            return False
+        if not self.secret_key:
+            return True
+        try:
+            payload = jwt.decode(token, self.secret_key, algorithms=["HS256"])
+        except jwt.InvalidTokenError:
+            return False
+        return self.access_key is None or payload.get('access_key') == self.access_key
+
+    @web.middleware
+    async def _middleware(self, request, handler):
+        self.requests[request.path] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        response = await handler(request)
+        response.headers['Remaining-Req'] = "group=default; min=1800; sec=29"
+        return response
+
+    async def _candles(self, request):
+        market = request.query.get('market')
+        count = min(int(request.query.get('count', 1)), 200)
+        to = request.query.get('to')
+
+        if market not in self.candles:
+            return web.json_response(error('market_not_found', market), status=404)
+
+        with self.lock:
+            index = self.candles[market].index
+            end = index.searchsorted(self.now, side='right')
+            if to:
+                to = pd.Timestamp(to.replace('T', ' ').replace('Z', ''))
+                if to.tzinfo is not None:
+                    to = to.tz_convert('UTC').tz_localize(None)
+                end = min(end, index.searchsorted(to + KST_OFFSET, side='left'))
+
+        # 응답 본문은 미리 만들어 둔 캔들 목록에서 잘라 씀 (최신 봉부터)
+        return web.json_response(self.candle_rows[market][max(end - count, 0):end][::-1])
+
+    async def _ticker(self, request):
+        markets = request.query.get('markets', '').split(',')
+        with self.lock:
+            if any(m not in self.candles for m in markets):
+                return web.json_response(error('not_found_market', "Code not found"), status=404)
+            return web.json_response([{
+                'market': m,
+                'trade_price': self.price(m),
+                'timestamp': int(time.time() * 1000),
+            } for m in markets])
+
+    async def _accounts(self, request):
+        if not self._authorized(request):
+            return web.json_response(error('invalid_query_payload', "인증 실패"), status=401)
+        with self.lock:
+            return web.json_response(self.accounts())
+
+    async def _post_order(self, request):
+        if not self._authorized(request):
+            return web.json_response(error('invalid_query_payload', "인증 실패"), status=401)
+
+        # JSON 본문 (업비트 문서) 또는 폼 본문 (pyupbit)
+        if request.content_type == 'application/json':
+            params = await request.json()
+        else:
+            params = dict(await request.post()) or dict(request.query)
+
+        with self.lock:
+            status, payload = self.place_order(params)
+        return web.json_response(payload, status=status)
+
+    async def _get_order(self, request):
+        if not self._authorized(request):
+            return web.json_response(error('invalid_query_payload', "인증 실패"), status=401)
+        with self.lock:
+            order = self.orders.get(request.query.get('uuid'))
+            if order is None:
+                return web.json_response(error('order_not_found', "주문을 찾지 못했습니다."), status=404)
+            return web.json_response(self.order_json(order))
+
+    async def _get_orders(self, request):
+        if not self._authorized(request):
+            return web.json_response(error('invalid_query_payload', "인증 실패"), status=401)
+        market = request.query.get('market')
+        state = request.query.get('state', 'wait')
+        with self.lock:
+            return web.json_response([
+                self.order_json(order, with_trades=False) for order in self.orders.values()
+                if order['state'] == state and (market is None or order['market'] == market)
+            ])
+
+    async def _delete_order(self, request):
+        if not self._authorized(request):
+            return web.json_response(error('invalid_query_payload', "인증 실패"), status=401)
+        with self.lock:
+            status, payload = self.cancel_order(request.query.get('uuid'))
+        return web.json_response(payload, status=status)
+
+    async def _replay(self):
+        """
+        seconds_per_candle마다 다음 봉으로
+        """
+        while True:
+            await asyncio.sleep(self.seconds_per_candle)
+            self.advance()
+
+    def app(self):
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_get(f"/v1/{CANDLE_PATHS[self.interval]}", self._candles)
+        app.router.add_get('/v1/ticker', self._ticker)
+        app.router.add_get('/v1/accounts', self._accounts)
+        app.router.add_post('/v1/orders', self._post_order)
+        app.router.add_get('/v1/orders', self._get_orders)
+        app.router.add_get('/v1/order', self._get_order)
+        app.router.add_delete('/v1/order', self._delete_order)
+        return app
+
+    def start(self, host='127.0.0.1', port=0):
+        """
+        서버 시작
+
+        Returns:
+            base_url (UpbitClient에 그대로 넘김)
+        """
+        self.loop = asyncio.new_event_loop()
+        self.runner = web.AppRunner(self.app())
+        self.loop.run_until_complete(self.runner.setup())
+        site = web.TCPSite(self.runner, host, port)
+        self.loop.run_until_complete(site.start())
+        port = site._server.sockets[0].getsockname()[1]
+
+        if self.seconds_per_candle:
+            self.loop.create_task(self._replay())
+
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.base_url = f"http://{host}:{port}/v1"
+        return self.base_url
+
+    def stop(self):
+        if self.loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.runner.cleanup(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop = None
+
+
+def error(name, message):
+    return {'error': {'name': name, 'message': message}}
+
+
+def candles_json(market, df):
+    """
+    캔들 DataFrame → 업비트 캔들 응답 형식 (최신 봉부터)
+    """
+    df = df[::-1]
+    value = df['value'] if 'value' in df.columns else df['close'] * df['volume']
+    columns = zip(
+        (df.index - KST_OFFSET).strftime("%Y-%m-%dT%H:%M:%S"),
+        df.index.strftime("%Y-%m-%dT%H:%M:%S"),
+        df['open'].tolist(), df['high'].tolist(), df['low'].tolist(), df['close'].tolist(),
+        df['volume'].tolist(), value.tolist(),
+    )
+    return [{
+        'market': market,
+        'candle_date_time_utc': utc,
+        'candle_date_time_kst': kst,
+        'opening_price': open_,
+        'high_price': high,
+        'low_price': low,
+        'trade_price': close,
+        'candle_acc_trade_volume': volume,
+        'candle_acc_trade_price': value,
+    } for utc, kst, open_, high, low, close, volume, value in columns]
+
+
+if __name__ == "__main__":
+    import argparse
+    import config
+    from sample_data import make_candles
+
+    parser = argparse.ArgumentParser(description="업비트 모의 거래소")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--ticker', default=config.TARGET_COIN)
+    parser.add_argument('--interval', default=config.INTERVAL)
+    parser.add_argument('--latency', type=float, default=0.0, help="요청당 응답 지연 (초)")
+    parser.add_argument('--seconds-per-candle', type=float, default=None, help="자동 재생 속도 (초/봉)")
+    parser.add_argument('--krw', type=float, default=1_000_000, help="시작 KRW 잔고")
+    parser.add_argument('--store', action='store_true', help="저장된 캔들 재생 (기본값: 합성 캔들)")
+    args = parser.parse_args()
+
+    if args.store:
+        from candle_store import CandleStore
+        candles = CandleStore(offline=True).load(args.ticker, args.interval)
+    else:
+        candles = make_candles(n=2000, start='2020-01-01 09:00')
+
+    exchange = MockExchange(candles, interval=args.interval, ticker=args.ticker,
+                            balances={'KRW': args.krw}, latency=args.latency,
+                            seconds_per_candle=args.seconds_per_candle)
+    base_url = exchange.start(port=args.port)
+
+    print("=" * 60)
+    print("🏦 업비트 모의 거래소")
+    print("=" * 60)
+    print(f"   주소: {base_url}")
+    print(f"   티커: {args.ticker} / 주기: {args.interval} / 캔들 {len(candles)}개")
+    print(f"   지연: {args.latency*1000:.0f}ms / 시작 잔고: {args.krw:,.0f}원")
+    print("=" * 60)
+    print(f'   TradingBot(client=UpbitClient(access, secret, base_url="{base_url}"))')
+
+    try:
+        while True:
+            time.sleep(5)
+            print(f"[{exchange.now}] 현재가 {exchange.price(args.ticker):,.0f}원 | "
+                  f"요청 {sum(exchange.requests.values())}개 | 주문 {len(exchange.orders)}개")
+    except KeyboardInterrupt:
+        exchange.stop()
+        print("\n⛔ 모의 거래소 종료")
@@ -0,0 +1,441 @@
+"""
+여러 티커 동시 자동매매 봇 (asyncio)
+프로세스 하나가 KRW 마켓 여러 개를 티커별 상태(포지션/진입가/캔들 창/지표)로 관리한다.
+- 손절/익절용 현재가는 티커 수와 관계없이 요청 1번 (ticker API에 markets 목록)
+- 봉 마감마다 모든 티커의 새 캔들/신호를 동시에 처리
+- 모든 요청이 AsyncUpbitClient 하나의 연결 풀과 요청 속도 제한(RateGovernor)을 함께 쓴다
+
+사용법:
+    TARGET_COINS=KRW-BTC,KRW-ETH,KRW-XRP python multi_bot.py
+"""
+import time
+import asyncio
+from datetime import datetime
+import config
+from strategies import STRATEGIES, STRATEGY_CONFIGS
+from streaming_indicators import StreamingIndicators
+from upbit_client import AsyncUpbitClient, UpbitAPIError
+from candle_clock import CandleScheduler, SystemClock, to_kst
+from candle_window import CandleWindow
+from notifier import TelegramNotifier
+from paper_trading import PaperTrader
+from account_cache import AccountCache
+from order_tracker import FINAL_STATES, fill_summary
+
+
+class TickerState:
+    """
+    티커 1개의 매매 상태
+    """
+
+    def __init__(self, ticker, candle_count, params):
+        self.ticker = ticker
+        self.position = None        # 'long' 또는 None
+        self.entry_price = 0
+        self.entry_time = None
+        self.exit_retry_at = 0
+
+        # 캔들 링 버퍼 + 누적 지표 (티커마다 따로)
+        self.window = CandleWindow(candle_count)
+        self.indicators = StreamingIndicators(params)
+
+        # 같은 티커의 신호 매매와 손절/익절 주문이 겹치지 않게
+        self.lock = asyncio.Lock()
+
+
+class MultiTickerBot:
+    """
+    여러 티커 동시 매매 봇
+
+    사용법:
+        bot = MultiTickerBot(["KRW-BTC", "KRW-ETH", "KRW-XRP"])
+        asyncio.run(bot.run())
+    """
+    EXIT_RETRY_SEC = 5  # 청산 주문 실패 후 재시도 간격 (초)
+    ACCOUNT_REFRESH_SEC = 30  # 계좌 스냅샷 최대 나이 (초)
+    THROTTLE_RETRY_SEC = 1  # 429 응답 뒤 다시 시도까지 (초)
+    ORDER_CHECK_SEC = 0.2  # 매수 체결 확인 간격 (초)
+    ORDER_WAIT_SEC = 5  # 매수 체결 확인 최대 대기 (초)
+
+    def __init__(self, tickers=None, interval=None, access_key=None, secret_key=None, client=None,
+                 notifier=None, paper=None, clock=None):
+        """
+        Args:
+            tickers: 티커 목록 (기본값: config.TARGET_COINS)
+            interval: 캔들 주기 (기본값: config.INTERVAL)
+            access_key, secret_key: 업비트 API 키 (기본값: config)
+            client: AsyncUpbitClient (모든 티커가 연결 풀/속도 제한 공유)
+            notifier: 텔레그램 알림 TelegramNotifier (기본값: config의 토큰/채팅 ID)
+            paper: 테스트 모드 모의투자 PaperTrader (기본값: data/paper 원장)
+            clock: 시계 (기본값: 실제 시각, 리플레이는 VirtualClock)
+        """
+        self.tickers = list(tickers or config.TARGET_COINS)
+        self.interval = interval or config.INTERVAL
+        self.clock = clock or SystemClock()
+        access_key = access_key or config.UPBIT_ACCESS_KEY
+        secret_key = secret_key or config.UPBIT_SECRET_KEY
+
+        self.client = client or AsyncUpbitClient(access_key, secret_key)
+
+        # 마지막 일괄 조회 현재가 (모의투자 체결가로도 사용)
+        self.prices = {}
+
+        # 주문 (테스트 모드는 가상 계좌, 실전은 키가 있을 때만)
+        if config.TRADING_MODE == 'test':
+            self.upbit = paper or PaperTrader(price_source=self.prices.__getitem__)
+            print(f"🧪 모의투자 계좌: {self.upbit.get_balance('KRW'):,.0f}원")
+        elif access_key and secret_key:
+            self.upbit = self.client
+            print("✅ 업비트 API 연결 성공")
+        else:
+            self.upbit = None
+            print("⚠️ API 키가 없습니다. 읽기 전용 모드로 실행됩니다.")
+
+        # 모든 코인 잔고를 get_balances 1번으로 (루프마다 오래됐으면 + 체결 직후 갱신)
+        self.account = AccountCache(max_age=self.ACCOUNT_REFRESH_SEC, clock=self.clock.time)
+
+        strategy_num = config.SELECTED_STRATEGY
+        if strategy_num not in STRATEGIES:
+            print(f"❌ 전략 #{strategy_num}을 찾을 수 없습니다. 전략 #1로 대체합니다.")
+            strategy_num = 1
+        self.strategy = STRATEGIES[strategy_num](config.STRATEGY_PARAMS)
+        self.strategy_config = STRATEGY_CONFIGS[strategy_num]
+        self.candle_count = self.strategy.live_candle_count()
+
+        self.states = {t: TickerState(t, self.candle_count, config.STRATEGY_PARAMS) for t in self.tickers}
+
+        # 여러 티커가 같은 봉에 매수하면 KRW 잔고 조회 → 주문을 차례로 (잔고 중복 사용 방지)
+        self.buy_lock = asyncio.Lock()
+        self.notifier = notifier or TelegramNotifier.from_config()
+
+        print(f"🎯 전략: #{strategy_num} {self.strategy_config['name']} / 티커 {len(self.tickers)}개")
+
+    async def _call(self, method, *args):
+        """
+        주문/잔고 호출 (PaperTrader는 동기, AsyncUpbitClient는 코루틴)
+        """
+        result = method(*args)
+        if asyncio.iscoroutine(result):
+            result = await result
+        return result
+
+    async def refresh_account(self):
+        """
+        계좌 스냅샷 갱신 (요청 1번, 실패해도 다음 갱신에서 복구)
+        """
+        if not self.upbit:
+            return
+        try:
+            self.account.update(await self._call(self.upbit.get_balances))
+        except Exception as e:
+            print(f"⚠️ 계좌 갱신 실패: {e}")
+
+    async def get_balance(self, ticker="KRW"):
+        """
+        주문 가능 잔고 (계좌 스냅샷, 오래됐을 때만 갱신)
+        """
+        if not self.upbit:
+            return 0
+        if self.account.stale():
+            await self.refresh_account()
+        return self.account.balance(ticker)
+
+    async def refresh_prices(self):
+        """
+        모든 티커 현재가 일괄 조회 (요청 1번)
+
+        Returns:
+            {티커: 현재가}
+        """
+        self.prices.update(await self.client.get_current_price(self.tickers))
+        return self.prices
+
+    async def get_window(self, state):
+        """
+        티커의 캔들 창 갱신 (처음엔 candle_count개, 이후엔 새 봉만)
+
+        Returns:
+            캔들 창 DataFrame 또는 None
+        """
+        window = state.window
+        if len(window) > 0:
+            count = window.fetch_count(self.interval, to_kst(self.clock.time()))
+        else:
+            count = self.candle_count
+
+        df = await self.client.get_ohlcv(state.ticker, interval=self.interval, count=count)
+        if df is None or len(df) == 0:
+            return None
+        df.columns = [col.lower() for col in df.columns]
+
+        if not window.update(df):
+            # 처음이거나 중간이 비었으면 전체 다시 채움
+            if count < self.candle_count:
+                df = await self.client.get_ohlcv(state.ticker, interval=self.interval, count=self.candle_count)
+                if df is None or len(df) == 0:
+                    return None
+                df.columns = [col.lower() for col in df.columns]
+            window.seed(df)
+
+        return window.frame()
+
+    async def buy(self, state, amount):
+        """
+        시장가 매수
+
+        Returns:
+            주문 결과 또는 None
+        """
+        if not self.upbit:
+            return None
+        if amount <= 5000:
+            print(f"⚠️ {state.ticker} 매수 금액이 최소 금액(5000원)보다 적습니다.")
+            return None
+
+        try:
+            result = await self._call(self.upbit.buy_market_order, state.ticker, amount)
+            if result is None:
+                raise RuntimeError("주문이 거절되었습니다.")
+            print(f"✅ 매수 주문: {state.ticker}, {amount:,.0f}원")
+
+            # 진입가는 실제 평균 체결가 (확인이 늦어지면 현재가로 대신)
+            fill = await self.wait_fill(result)
+            if fill is None:
+                print(f"⚠️ {state.ticker} 체결 확인 지연 → 현재가를 진입가로 사용")
+                entry_price = self.prices[state.ticker]
+            elif fill['volume'] <= 0:
+                print(f"⚠️ {state.ticker} 매수 주문이 체결되지 않았습니다.")
+                await self.refresh_account()
+                return None
+            else:
+                entry_price = fill['price']
+                print(f"📋 {state.ticker} 체결: {fill['volume']}개 @ {entry_price:,.0f}원 (수수료 {fill['fee']:,.0f}원)")
+
+            state.position = 'long'
+            state.entry_price = entry_price
+            state.entry_time = self.clock.now()
+            await self.refresh_account()
+            return result
+        except Exception as e:
+            print(f"❌ {state.ticker} 매수 실패: {e}")
+            await self.refresh_account()
+            return None
+
+    async def wait_fill(self, order):
+        """
+        주문 체결 확인 (OrderTracker와 같은 기준, 이벤트 루프에서 조회)
+
+        응답에 이미 체결 내역이 있으면(모의투자) 조회하지 않는다.
+
+        Returns:
+            체결 요약 fill_summary (ORDER_WAIT_SEC 안에 끝나지 않으면 None)
+        """
+        deadline = time.monotonic() + self.ORDER_WAIT_SEC
+        while not (order.get('state') in FINAL_STATES and order.get('trades')):
+            try:
+                order = await self._call(self.upbit.get_order, order['uuid'])
+                if order['state'] in FINAL_STATES:
+                    break
+            except Exception as e:
+                print(f"⚠️ 주문 조회 실패: {e}")
+            if time.monotonic() >= deadline:
+                return None
+            await asyncio.sleep(self.ORDER_CHECK_SEC)
+        return fill_summary(order)
+
+    async def sell(self, state):
+        """
+        시장가 전량 매도
+
+        Returns:
+            주문 결과 또는 None
+        """
+        if not self.upbit:
+            return None
+
+        volume = await self.get_balance(state.ticker.split('-')[1])
+        if volume <= 0:
+            print(f"⚠️ {state.ticker} 보유 수량이 없습니다.")
+            state.position = None
+            return None
+
+        try:
+            result = await self._call(self.upbit.sell_market_order, state.ticker, volume)
+            if result is None:
+                raise RuntimeError("주문이 거절되었습니다.")
+            print(f"✅ 매도 주문: {state.ticker}, {volume}개")
+
+            state.position = None
+            state.entry_price = 0
+            state.entry_time = None
+            await self.refresh_account()
+            return result
+        except Exception as e:
+            print(f"❌ {state.ticker} 매도 실패: {e}")
+            await self.refresh_account()
+            return None
+
+    async def check_exit(self, state, current_price):
+        """
+        손절/익절 판단 후 청산
+
+        Returns:
+            'stop_loss', 'take_profit' 또는 None
+        """
+        async with state.lock:
+            if state.position != 'long' or state.entry_price == 0:
+                return None
+            if self.clock.time() < state.exit_retry_at:
+                return None
+
+            ratio = (current_price - state.entry_price) / state.entry_price
+            if ratio <= -config.STOP_LOSS:
+                reason, title = 'stop_loss', "🔻 <b>손절</b>"
+            elif ratio >= config.TAKE_PROFIT:
+                reason, title = 'take_profit', "🔺 <b>익절</b>"
+            else:
+                return None
+
+            entry_price = state.entry_price
+            if not await self.sell(state):
+                state.exit_retry_at = self.clock.time() + self.EXIT_RETRY_SEC
+                return None
+
+            self.notifier.send(f"{title}\n\n티커: {state.ticker}\n진입가: {entry_price:,.0f}원\n"
+                               f"현재가: {current_price:,.0f}원\n수익: {ratio*100:+.2f}%")
+            return reason
+
+    async def evaluate_signal(self, state, closed_before):
+        """
+        티커 1개의 마감된 봉으로 지표/신호 계산 후 매매
+
+        Returns:
+            신호 ('buy', 'sell', 'hold') 또는 데이터가 없으면 None
+        """
+        df = await self.get_window(state)
+        if df is None:
+            print(f"⚠️ {state.ticker} 데이터를 가져올 수 없습니다.")
+            return None
+
+        df = df[df.index < closed_before]
+        if len(df) == 0:
+            return None
+
+        df = state.indicators.apply(df)
+        signal = self.strategy.generate_signal(df)
+        current_price = self.prices[state.ticker]
+        print(f"   {state.ticker:<10} {current_price:>15,.0f}원 | RSI: {df['rsi'].iloc[-1]:5.1f} | 신호: {signal}")
+
+        if state.position == 'long':
+            await self.check_exit(state, current_price)
+
+        async with state.lock:
+            if signal == 'buy' and state.position is None:
+                async with self.buy_lock:
+                    amount = await self.get_balance("KRW") * config.INVEST_RATIO
+                    result = await self.buy(state, amount)
+                if result:
+                    self.notifier.send(f"📈 <b>매수</b>\n\n티커: {state.ticker}\n가격: {current_price:,.0f}원\n"
+                                       f"전략: {self.strategy_config['name']}")
+            elif signal == 'sell' and state.position == 'long':
+                entry_price = state.entry_price
+                if await self.sell(state):
+                    profit_ratio = (current_price - entry_price) / entry_price * 100
+                    self.notifier.send(f"📉 <b>매도</b>\n\n티커: {state.ticker}\n진입가: {entry_price:,.0f}원\n"
+                                       f"현재가: {current_price:,.0f}원\n수익: {profit_ratio:+.2f}%")
+
+        return signal
+
+    async def step(self, scheduler):
+        """
+        루프 1회: 현재가 일괄 조회 → 봉 마감이면 전 티커 신호, 아니면 보유 티커 손절/익절
+
+        Returns:
+            봉 마감 처리를 했으면 {티커: 신호}, 아니면 None
+        """
+        now = self.clock.time()
+        if self.account.stale():
+            await asyncio.gather(self.refresh_prices(), self.refresh_account())
+        else:
+            await self.refresh_prices()
+
+        if scheduler.due(now):
+            closed_before = scheduler.closed_before(now)
+            print(f"\n[{self.clock.now().strftime('%Y-%m-%d %H:%M:%S')}]")
+            results = await asyncio.gather(*(self.evaluate_signal(state, closed_before)
+                                             for state in self.states.values()), return_exceptions=True)
+            signals = {}
+            for ticker, result in zip(self.tickers, results):
+                if isinstance(result, Exception):
+                    print(f"❌ {ticker} 에러: {result}")
+                    result = None
+                signals[ticker] = result
+            if any(signal is not None for signal in signals.values()):
+                scheduler.mark(now)
+            return signals
+
+        await asyncio.gather(*(self.check_exit(state, self.prices[ticker])
+                               for ticker, state in self.states.items() if state.position == 'long'))
+        return None
+
+    def restore_paper_positions(self):
+        """
+        모의투자 계좌에 남은 코인으로 티커별 포지션 복원 (재시작)
+        """
+        if not isinstance(self.upbit, PaperTrader):
+            return
+        for ticker, state in self.states.items():
+            holding = self.upbit.holding(ticker)
+            if holding and state.position is None:
+                volume, state.entry_price, bought_at = holding
+                state.position = 'long'
+                state.entry_time = datetime.fromtimestamp(bought_at)
+                print(f"🧪 {ticker} 포지션 복원: {volume:.8f}개 @ {state.entry_price:,.0f}원")
+
+    async def run(self, sleep_sec=60, close_offset=2):
+        """
+        봇 실행
+
+        Args:
+            sleep_sec: 봉 마감 사이 현재가 확인 간격 (초)
+            close_offset: 봉 마감 후 신호 판단까지 기다릴 시간 (초)
+        """
+        self.restore_paper_positions()
+        scheduler = CandleScheduler(self.interval, offset=close_offset, check_sec=sleep_sec,
+                                    clock=self.clock.time)
+
+        print()
+        print("=" * 60)
+        print("🤖 멀티 티커 자동매매 봇 시작")
+        print("=" * 60)
+        print(f"   티커: {', '.join(self.tickers)}")
+        print(f"   주기: {self.interval}")
+        print(f"   모드: {config.TRADING_MODE}")
+        print("=" * 60)
+        self.notifier.send(f"🤖 <b>멀티 티커 봇 시작</b>\n\n전략: {self.strategy_config['name']}\n"
+                           f"티커: {', '.join(self.tickers)}\n모드: {config.TRADING_MODE}")
+
+        try:
+            while self.clock.running():
+                try:
+                    await self.step(scheduler)
+                    await self.clock.asleep(scheduler.sleep_time())
+                except UpbitAPIError as e:
+                    print(f"❌ 에러 발생: {e}")
+                    await self.clock.asleep(self.THROTTLE_RETRY_SEC if e.status == 429 else sleep_sec)
+                except Exception as e:
+                    print(f"❌ 에러 발생: {e}")
+                    await self.clock.asleep(sleep_sec)
+        finally:
+            await self.client.close()
+            self.notifier.flush()
+
+
+if __name__ == "__main__":
+    bot = MultiTickerBot()
+    try:
+        asyncio.run(bot.run())
+    except KeyboardInterrupt:
+        print("\n\n⛔ 봇 종료")
+    finally:
+        bot.notifier.close()
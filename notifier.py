@@ -0,0 +1,228 @@
+"""
+비동기 텔레그램 알림
+매매 루프는 메시지를 큐에 넣기만 하고 바로 돌아오며, 전송은 백그라운드 스레드가 맡는다.
+짧은 시간에 몰린 메시지는 하나의 묶음 메시지로 보내고,
+실패하면 백오프로 재시도하며, 큐가 가득 차면 정책에 따라 메시지를 버린다.
+api_url을 바꾸면 로컬 HTTP 서버로 테스트할 수 있다.
+"""
+import time
+import threading
+from collections import deque
+import requests
+
+
+TELEGRAM_API_URL = "https://api.telegram.org"
+MAX_MESSAGE_LENGTH = 4096   # 텔레그램 메시지 최대 길이
+
+
+class TelegramNotifier:
+    """
+    텔레그램 알림 큐 + 전송 스레드
+
+    사용법:
+        notifier = TelegramNotifier(token, chat_id)
+        notifier.send("📈 <b>매수</b>")   # 바로 반환
+        notifier.close()                  # 남은 메시지 전송 후 종료
+    """
+
+    def __init__(self, token, chat_id, api_url=TELEGRAM_API_URL, max_queue=100,
+                 batch_window=1.0, max_batch=10, retries=3, backoff=1.0, timeout=5,
+                 drop_policy='oldest'):
+        """
+        Args:
+            token: 봇 토큰 (없으면 알림 끔)
+            chat_id: 채팅 ID (없으면 알림 끔)
+            api_url: 텔레그램 API 주소 (테스트는 로컬 서버 주소)
+            max_queue: 대기 메시지 최대 개수
+            batch_window: 첫 메시지 후 더 모아 보낼 시간 (초)
+            max_batch: 묶음 하나에 넣을 최대 메시지 수
+            retries: 전송 실패 시 재시도 횟수
+            backoff: 첫 재시도 대기 (초, 실패할수록 2배)
+            timeout: 요청 타임아웃 (초)
+            drop_policy: 큐가 가득 찼을 때 'oldest'(오래된 것 버림) 또는 'newest'(새 것 버림)
+        """
+        if drop_policy not in ('oldest', 'newest'):
+            raise ValueError(f"지원하지 않는 drop_policy: {drop_policy}")
+
+        self.enabled = bool(token and chat_id)
+        self.url = f"{api_url.rstrip('/')}/bot{token}/sendMessage"
+        self.chat_id = chat_id
+        self.max_queue = max_queue
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.drop_policy = drop_policy
+
+        self.queue = deque()
+        self.condition = threading.Condition()
+        self.busy = False
+        self.closing = False
+        self.thread = None
+        self.session = requests.Session()   # keep-alive
+
+        # 통계
+        self.sent = 0           # 전송 성공 요청 수
+        self.delivered = 0      # 전달된 원본 메시지 수
+        self.failed = 0         # 재시도 후에도 실패한 원본 메시지 수
+        self.dropped = 0        # 큐가 가득 차 버린 메시지 수
+
+    @classmethod
+    def from_config(cls, **kwargs):
+        """
+        config의 TELEGRAM_TOKEN / TELEGRAM_CHAT_ID로 생성
+        """
+        import config
+        return cls(config.TELEGRAM_TOKEN, config.TELEGRAM_CHAT_ID, **kwargs)
+
+    def send(self, message):
+        """
+        메시지를 큐에 넣고 바로 반환 (전송은 백그라운드)
+
+        Returns:
+            큐에 들어갔으면 True, 알림이 꺼졌거나 버려졌으면 False
+        """
+        if not self.enabled or self.closing:
+            return False
+
+        with self.condition:
+            if len(self.queue) >= self.max_queue:
+                self.dropped += 1
+                if self.drop_policy == 'newest':
+                    return False
+                self.queue.popleft()
+
+            self.queue.append(message)
+            self._start()
+            self.condition.notify_all()
+        return True
+
+    def _start(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._worker, daemon=True)
+            self.thread.start()
+
+    def flush(self, timeout=10):
+        """
+        큐가 빌 때까지 대기
+
+        Returns:
+            모두 처리했으면 True
+        """
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            while self.queue or self.busy:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self.condition.wait(remaining)
+        return True
+
+    def close(self, timeout=10):
+        """
+        남은 메시지를 보내고 전송 스레드 종료
+        """
+        done = self.flush(timeout)
+        with self.condition:
+            self.closing = True
+            self.condition.notify_all()
+        if self.thread:
+            self.thread.join(timeout)
+        self.session.close()
+        return done
+
+    def _next_batch(self):
+        """
+        첫 메시지를 기다린 뒤 batch_window 동안 더 모아서 반환 (종료 시 None)
+        """
+        with self.condition:
+            while not self.queue:
+                if self.closing:
+                    return None
+                self.condition.wait()
+
+            deadline = time.monotonic() + self.batch_window
+            while len(self.queue) < self.max_batch and not self.closing:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.condition.wait(remaining)
+
+            batch = []
+            length = 0
+            while self.queue and len(batch) < self.max_batch:
+                message = self.queue[0]
+                if batch and length + len(message) + 2 > MAX_MESSAGE_LENGTH - 100:
+                    break
+                batch.append(self.queue.popleft())
+                length += len(message) + 2
+
+            self.busy = True
+            return batch
+
+    @staticmethod
+    def digest(batch):
+        """
+        여러 메시지 → 묶음 메시지 1개
+        """
+        if len(batch) == 1:
+            return batch[0][:MAX_MESSAGE_LENGTH]
+        text = f"📬 <b>알림 {len(batch)}건</b>\n\n" + "\n\n".join(batch)
+        return text[:MAX_MESSAGE_LENGTH]
+
+    def _worker(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+
+            try:
+                if self._post(self.digest(batch)):
+                    self.sent += 1
+                    self.delivered += len(batch)
+                else:
+                    self.failed += len(batch)
+            finally:
+                with self.condition:
+                    self.busy = False
+                    self.condition.notify_all()
+
+    def _post(self, text):
+        """
+        sendMessage 1번 (연결 오류/429/5xx는 백오프로 재시도)
+
+        Returns:
+            성공 여부
+        """
+        delay = self.backoff
+
+        for attempt in range(self.retries + 1):
+            try:
+                resp = self.session.post(self.url, data={
+                    "chat_id": self.chat_id,
+                    "text": text,
+                    "parse_mode": "HTML"
+                }, timeout=self.timeout)
+
+                if resp.status_code < 400:
+                    return True
+
+                if resp.status_code == 429:
+                    # 텔레그램이 알려준 대기 시간 우선
+                    try:
+                        delay = max(delay, resp.json()['parameters']['retry_after'])
+                    except (ValueError, KeyError, TypeError):
+                        pass
+                elif resp.status_code < 500:
+                    print(f"❌ 텔레그램 전송 실패: [{resp.status_code}] {resp.text[:200]}")
+                    return False
+            except requests.RequestException as e:
+                if attempt == self.retries:
+                    print(f"❌ 텔레그램 전송 실패: {e}")
+
+            if attempt < self.retries:
+                time.sleep(delay)
+                delay *= 2
+
+        return False
@@ -0,0 +1,75 @@
+"""
+지표 기간 최적화
+RSI 기간 × MACD (fast, slow, signal) 조합을 한 번에 계산해서 비교
+"""
+from strategies import Strategy1_MeanReversion
+from backtest_engine import RunConfig
+from candle_store import CandleStore, candle_count
+from sweep import sweep_indicator_periods
+import config
+
+
+if __name__ == "__main__":
+    # 캔들은 로컬 저장소에서 재사용 (새 캔들만 다운로드)
+    store = CandleStore()
+
+    start_date = "20251117"
+    end_date = "20260217"
+
+    print("=" * 80)
+    print("🔬 지표 기간 최적화 (RSI 기간 × MACD 조합)")
+    print("=" * 80)
+    print()
+
+    rsi_periods = [7, 9, 11, 14, 18, 21, 28]
+    macd_triples = [
+        (fast, slow, signal)
+        for fast in (5, 8, 12)
+        for slow in (17, 21, 26, 35)
+        for signal in (5, 9)
+    ]
+
+    print(f"📊 테스트 조합: {len(rsi_periods) * len(macd_triples)}개")
+    print(f"   RSI 기간: {rsi_periods}")
+    print(f"   MACD: {len(macd_triples)}개 (fast 5/8/12, slow 17/21/26/35, signal 5/9)")
+    print()
+
+    df = store.get_ohlcv("KRW-BTC", interval="day", to=end_date,
+                         count=candle_count("day", start_date, end_date))
+    df = df[start_date:end_date]
+    df.columns = [col.lower() for col in df.columns]
+
+    results = sweep_indicator_periods(
+        df,
+        Strategy1_MeanReversion,
+        config.STRATEGY_PARAMS,
+        rsi_periods=rsi_periods,
+        macd_triples=macd_triples,
+        run_config=RunConfig.for_strategy(1)
+    )
+
+    results.sort(key=lambda x: x['return_ratio'], reverse=True)
+
+    print(f"🏆 Top 10 (수익률 순)")
+    print("-" * 80)
+    print(f"{'순위':<5} {'RSI':<6} {'MACD':<14} {'수익률':<10} {'거래':<6} {'승률'}")
+    print("-" * 80)
+
+    for i, r in enumerate(results[:10], 1):
+        emoji = "🥇" if i == 1 else ("🥈" if i == 2 else ("🥉" if i == 3 else "  "))
+        macd = "/".join(str(v) for v in r['macd'])
+        print(f"{emoji}{i:<4} {r['rsi_period']:<6} {macd:<14} {r['return_ratio']:>+8.2f}% {r['trades']:>4}회 {r['win_rate']:>6.1f}%")
+
+    current = next((r for r in results
+                    if r['rsi_period'] == config.STRATEGY_PARAMS['rsi_period']
+                    and r['macd'] == (config.STRATEGY_PARAMS['macd_fast'],
+                                      config.STRATEGY_PARAMS['macd_slow'],
+                                      config.STRATEGY_PARAMS['macd_signal'])), None)
+
+    print()
+    print("💡 현재 설정과 비교")
+    print("-" * 80)
+    if current:
+        print(f"현재 (RSI {current['rsi_period']}, MACD {'/'.join(str(v) for v in current['macd'])}): {current['return_ratio']:+.2f}%")
+    best = results[0]
+    print(f"최적 (RSI {best['rsi_period']}, MACD {'/'.join(str(v) for v in best['macd'])}): {best['return_ratio']:+.2f}%")
@@ -6,8 +6,12 @@ import pyupbit
 import pandas as pd
 from strategies import Strategy1_MeanReversion
 from backtest import Backtester
+from candle_store import CandleStore
 import config
 
+# 캔들은 로컬 저장소에서 재사용 (새 캔들만 다운로드)
+store = CandleStore()
+
 print("=" * 80)
 print("🔬 RSI 파라미터 최적화 (최근 6개월)")
 print("=" * 80)
@@ -29,7 +33,7 @@ for rsi_threshold in range(20, 65, 5):
     strategy = Strategy1_MeanReversion(params)
     
     # 백테스터
-    backtester = Backtester(strategy, initial_balance=1000000)
+    backtester = Backtester(strategy, initial_balance=1000000, data_source=store)
     
     # 백테스팅 실행
     result = backtester.run(
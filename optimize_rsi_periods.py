@@ -6,9 +6,13 @@ import pyupbit
 import pandas as pd
 from strategies import Strategy1_MeanReversion
 from backtest import Backtester
+from candle_store import CandleStore
 import config
 from datetime import datetime, timedelta
 
+# 캔들은 로컬 저장소에서 재사용 (새 캔들만 다운로드)
+store = CandleStore()
+
 # 기간 설정
 periods = {
     '1개월': '20260117',
@@ -34,7 +38,7 @@ for period_name, start_date in periods.items():
         strategy = Strategy1_MeanReversion(params)
         
         # 백테스터
-        backtester = Backtester(strategy, initial_balance=1000000)
+        backtester = Backtester(strategy, initial_balance=1000000, data_source=store)
         
         # 백테스팅 실행
         result = backtester.run(
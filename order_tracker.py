@@ -0,0 +1,163 @@
+"""
+주문 체결 추적
+시장가 주문 응답에는 체결가가 없으므로 백그라운드 스레드가 주문 상태(trades 목록)를 확인해
+거래량 가중 평균 체결가(VWAP), 체결 수량, 수수료를 계산하고 콜백으로 넘긴다.
+응답에 이미 체결 내역이 있으면(모의투자) 바로 콜백을 부르고 요청하지 않는다.
+"""
+import time
+import threading
+
+
+# 더 이상 체결되지 않는 주문 상태 (업비트 시장가 매수는 남은 금액이 환불되며 'cancel'로 끝나기도 함)
+FINAL_STATES = ('done', 'cancel')
+
+
+def fill_summary(order):
+    """
+    주문 체결 내역 요약
+
+    Args:
+        order: 업비트 주문 응답 (trades 포함)
+
+    Returns:
+        {'volume': 체결 수량, 'price': VWAP, 'funds': 체결 금액, 'fee': 수수료}
+    """
+    trades = order.get('trades') or []
+    volume = sum(float(trade['volume']) for trade in trades)
+    funds = sum(float(trade['funds']) for trade in trades)
+    return {
+        'volume': volume,
+        'price': funds / volume if volume else 0.0,
+        'funds': funds,
+        'fee': float(order.get('paid_fee') or 0),
+    }
+
+
+class OrderTracker:
+    """
+    주문 체결 추적기
+
+    사용법:
+        tracker = OrderTracker(client)
+        order = client.buy_market_order("KRW-BTC", 100_000)
+        tracker.track(order, lambda fill, order: print(fill['price']))
+    """
+
+    def __init__(self, source, interval=0.2, max_interval=5.0):
+        """
+        Args:
+            source: get_order(uuid)가 있는 객체 (UpbitClient 또는 PaperTrader)
+            interval: 주문 상태 확인 간격 (초)
+            max_interval: 조회 실패가 이어질 때 늘어나는 확인 간격 상한 (초)
+        """
+        self.source = source
+        self.interval = interval
+        self.max_interval = max_interval
+        self.pending = {}       # uuid → 체결 콜백
+        self.fills = {}         # uuid → 체결 요약 (완료된 주문)
+        self.failures = {}      # uuid → 연속 조회 실패 횟수
+        self.next_check = {}    # uuid → 다음 조회 시각 (실패 후 백오프)
+        self.cond = threading.Condition()
+        self.thread = None
+        self.stopped = False
+
+    def track(self, order, on_fill):
+        """
+        주문 추적 등록 (응답이 이미 최종 상태 + 체결 내역이면 바로 콜백)
+
+        Args:
+            order: 주문 응답
+            on_fill: 체결 완료 콜백 on_fill(체결 요약, 주문)
+        """
+        if order.get('state') in FINAL_STATES and order.get('trades'):
+            self._finish(order, on_fill)
+            return
+
+        with self.cond:
+            self.pending[order['uuid']] = on_fill
+            if self.thread is None or not self.thread.is_alive():
+                self.stopped = False
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+            self.cond.notify_all()
+
+    def _finish(self, order, on_fill):
+        summary = fill_summary(order)
+        try:
+            on_fill(summary, order)
+        except Exception as e:
+            print(f"⚠️ 체결 반영 실패: {e}")
+        with self.cond:
+            self.fills[order['uuid']] = summary
+            self.cond.notify_all()
+
+    def poll(self):
+        """
+        대기 중인 주문 상태 1번씩 확인
+
+        Returns:
+            이번에 체결 완료된 주문 수
+        """
+        with self.cond:
+            pending = list(self.pending.items())
+
+        finished = 0
+        now = time.monotonic()
+        for order_id, on_fill in pending:
+            if self.next_check.get(order_id, 0) > now:
+                continue
+            try:
+                order = self.source.get_order(order_id)
+            except Exception as e:
+                # 실패가 이어지면 확인 간격을 2배씩 (max_interval까지)
+                failures = self.failures.get(order_id, 0) + 1
+                delay = min(self.interval * 2 ** failures, self.max_interval)
+                self.failures[order_id] = failures
+                self.next_check[order_id] = now + delay
+                print(f"⚠️ 주문 조회 실패 ({failures}회째, {delay:.1f}초 뒤 재시도): {e}")
+                continue
+            self.failures.pop(order_id, None)
+            self.next_check.pop(order_id, None)
+            if order['state'] not in FINAL_STATES:
+                continue
+
+            with self.cond:
+                self.pending.pop(order_id, None)
+            self._finish(order, on_fill)
+            finished += 1
+        return finished
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while not self.pending and not self.stopped:
+                    self.cond.wait()
+                if self.stopped:
+                    return
+            self.poll()
+            with self.cond:
+                self.cond.wait(self.interval)
+
+    def wait(self, order_id, timeout=5.0):
+        """
+        주문 체결 반영까지 대기 (테스트/종료 처리용)
+
+        Returns:
+            체결 요약 또는 시간 초과면 None
+        """
+        deadline = time.monotonic() + timeout
+        with self.cond:
+            while order_id not in self.fills:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self.cond.wait(remaining)
+            return self.fills[order_id]
+
+    def stop(self):
+        with self.cond:
+            self.stopped = True
+            self.cond.notify_all()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
@@ -0,0 +1,284 @@
+"""
+모의투자 (페이퍼 트레이딩) 엔진
+TRADING_MODE='test'에서 실제 주문 대신 현재가 + 슬리피지 모델(calculate_slippage)로
+시장가 체결을 흉내 내고, 가상 KRW/코인 잔고를 유지한다.
+체결은 고정 크기 레코드로 원장 파일에 이어 쓰므로 재시작해도 잔고/평균 매수가가 복원된다.
+UpbitClient와 같은 주문/잔고 메서드를 가져 TradingBot이 그대로 쓴다.
+"""
+import os
+import time
+import uuid
+import threading
+import numpy as np
+from backtest_by_capital import calculate_slippage
+
+
+DEFAULT_LEDGER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'paper', 'ledger.bin')
+MIN_ORDER = 5000            # 최소 주문 금액 (원)
+
+# 원장 레코드 (57바이트): 입금은 side=0, 매수 1, 매도 -1
+LEDGER_DTYPE = np.dtype([
+    ('time', '<f8'),        # UNIX 시각
+    ('ticker', 'S16'),
+    ('side', '<i1'),
+    ('price', '<f8'),       # 체결가 (슬리피지 포함)
+    ('volume', '<f8'),      # 수량 (입금은 0)
+    ('funds', '<f8'),       # 체결 금액 (입금은 입금액)
+    ('fee', '<f8'),
+])
+
+DEPOSIT, BUY, SELL = 0, 1, -1
+
+
+class PaperTrader:
+    """
+    가상 계좌 + 시장가 체결 시뮬레이터
+
+    사용법:
+        paper = PaperTrader(price_source=client.get_current_price, initial_krw=1_000_000)
+        paper.buy_market_order("KRW-BTC", 500_000)
+        paper.get_balance("BTC")
+        paper.sell_market_order("KRW-BTC", paper.get_balance("BTC"))
+    """
+
+    def __init__(self, price_source, ledger_path=DEFAULT_LEDGER, initial_krw=1_000_000, fee=0.0005,
+                 slippage=calculate_slippage):
+        """
+        Args:
+            price_source: 티커 → 현재가 함수 (라이브 현재가)
+            ledger_path: 원장 파일 (None이면 저장하지 않음)
+            initial_krw: 원장이 없을 때 시작 KRW 잔고
+            fee: 거래 수수료율
+            slippage: 거래 금액 → 슬리피지 비율 함수
+        """
+        self.price_source = price_source
+        self.ledger_path = ledger_path
+        self.fee = fee
+        self.slippage = slippage
+        self.lock = threading.Lock()
+
+        self.balances = {'KRW': 0.0}
+        self.locked = {}        # 코인 → 대기 지정가 매도에 잠긴 수량
+        self.orders = {}        # uuid → 대기 지정가 주문 (원장에 남기지 않음, 재시작하면 다시 걸어야 함)
+        self.avg_buy_price = {}
+        self.bought_at = {}     # 코인 → 마지막 매수 시각 (UNIX)
+        self.fills = 0
+
+        records = self.load_ledger()
+        if len(records) == 0:
+            self._record(DEPOSIT, 'KRW', 0.0, 0.0, float(initial_krw), 0.0)
+        else:
+            for record in records:
+                self._apply(record)
+            self.fills = int((records['side'] != DEPOSIT).sum())
+
+    def load_ledger(self):
+        """
+        원장 전체 (구조화 배열)
+        """
+        if not self.ledger_path or not os.path.exists(self.ledger_path):
+            return np.zeros(0, dtype=LEDGER_DTYPE)
+        return np.fromfile(self.ledger_path, dtype=LEDGER_DTYPE)
+
+    def _apply(self, record):
+        """
+        레코드 1개를 잔고에 반영
+        """
+        side = int(record['side'])
+        ticker = record['ticker'].decode() if isinstance(record['ticker'], bytes) else record['ticker']
+
+        if side == DEPOSIT:
+            self.balances['KRW'] += float(record['funds'])
+            return
+
+        coin = ticker.split('-')[1]
+        volume = float(record['volume'])
+        funds = float(record['funds'])
+        fee = float(record['fee'])
+        held = self.balances.get(coin, 0.0)
+
+        if side == BUY:
+            avg = self.avg_buy_price.get(coin, 0.0)
+            self.avg_buy_price[coin] = (avg * held + funds) / (held + volume)
+            self.balances[coin] = held + volume
+            self.balances['KRW'] -= funds + fee
+            self.bought_at[coin] = float(record['time'])
+        else:
+            self.balances[coin] = max(held - volume, 0.0)
+            self.balances['KRW'] += funds - fee
+            if self.balances[coin] <= 1e-12:
+                self.avg_buy_price.pop(coin, None)
+
+    def _record(self, side, ticker, price, volume, funds, fee):
+        """
+        레코드 반영 + 원장 파일에 추가
+        """
+        record = np.zeros(1, dtype=LEDGER_DTYPE)
+        record[0] = (time.time(), ticker.encode(), side, price, volume, funds, fee)
+        self._apply(record[0])
+
+        if self.ledger_path:
+            os.makedirs(os.path.dirname(self.ledger_path), exist_ok=True)
+            with open(self.ledger_path, 'ab') as f:
+                record.tofile(f)
+        return record[0]
+
+    def _order(self, ticker, side, price, volume, funds, fee, ord_type=None):
+        """
+        체결 결과 → 업비트 주문 응답 형식
+        """
+        return {
+            'uuid': str(uuid.uuid4()),
+            'side': 'bid' if side == BUY else 'ask',
+            'ord_type': ord_type or ('price' if side == BUY else 'market'),
+            'state': 'done',
+            'market': ticker,
+            'executed_volume': volume,
+            'paid_fee': fee,
+            'trades': [{'price': price, 'volume': volume, 'funds': funds}],
+        }
+
+    def buy_market_order(self, ticker, price):
+        """
+        시장가 매수 (price: 총 주문 금액, 수수료는 별도 차감)
+
+        Returns:
+            주문 결과 (체결 완료) 또는 잔고 부족/최소 금액 미만이면 None
+        """
+        with self.lock:
+            amount = float(price)
+            if amount < MIN_ORDER or self.balances['KRW'] < amount * (1 + self.fee):
+                return None
+
+            fill_price = self.price_source(ticker) * (1 + self.slippage(amount))
+            volume = amount / fill_price
+            fee = amount * self.fee
+            self._record(BUY, ticker, fill_price, volume, amount, fee)
+            self.fills += 1
+            return self._order(ticker, BUY, fill_price, volume, amount, fee)
+
+    def sell_market_order(self, ticker, volume):
+        """
+        시장가 매도 (volume: 수량)
+
+        Returns:
+            주문 결과 (체결 완료) 또는 보유 수량 부족이면 None
+        """
+        with self.lock:
+            volume = float(volume)
+            if volume <= 0 or volume > self.get_balance(ticker) + 1e-12:
+                return None
+
+            price = self.price_source(ticker)
+            funds = price * volume
+            fill_price = price * (1 - self.slippage(funds))
+            funds = fill_price * volume
+            fee = funds * self.fee
+            self._record(SELL, ticker, fill_price, volume, funds, fee)
+            self.fills += 1
+            return self._order(ticker, SELL, fill_price, volume, funds, fee)
+
+    def sell_limit_order(self, ticker, price, volume):
+        """
+        지정가 매도 (현재가가 주문 가격 이상이 되면 주문 가격으로 체결, 슬리피지 없음)
+
+        Returns:
+            주문 결과 (대기 또는 바로 체결) 또는 보유 수량 부족이면 None
+        """
+        with self.lock:
+            coin = ticker.split('-')[1]
+            volume = float(volume)
+            if volume <= 0 or volume > self.get_balance(ticker) + 1e-12:
+                return None
+
+            order = self._order(ticker, SELL, float(price), volume, 0.0, 0.0, ord_type='limit')
+            order.update({'state': 'wait', 'price': float(price), 'volume': volume,
+                          'executed_volume': 0.0, 'trades': []})
+            self.locked[coin] = self.locked.get(coin, 0.0) + volume
+            self.orders[order['uuid']] = order
+            self._match(order)
+            return dict(order)
+
+    def _match(self, order):
+        """
+        대기 지정가 매도를 현재가와 비교해 체결
+        """
+        if order['state'] != 'wait' or self.price_source(order['market']) < order['price']:
+            return
+        coin = order['market'].split('-')[1]
+        self.locked[coin] -= order['volume']
+        funds = order['price'] * order['volume']
+        fee = funds * self.fee
+        self._record(SELL, order['market'], order['price'], order['volume'], funds, fee)
+        self.fills += 1
+        order.update({'state': 'done', 'executed_volume': order['volume'], 'paid_fee': fee,
+                      'trades': [{'price': order['price'], 'volume': order['volume'], 'funds': funds}]})
+
+    def get_order(self, order_id):
+        """
+        주문 조회 (대기 주문은 조회할 때 현재가로 체결 확인)
+        """
+        with self.lock:
+            order = self.orders[order_id]
+            self._match(order)
+            return dict(order)
+
+    def cancel_order(self, order_id):
+        """
+        대기 주문 취소 (잠긴 수량 해제)
+        """
+        with self.lock:
+            order = self.orders[order_id]
+            if order['state'] != 'wait':
+                return None
+            self.locked[order['market'].split('-')[1]] -= order['volume']
+            order['state'] = 'cancel'
+            return dict(order)
+
+    def holding(self, ticker):
+        """
+        보유 현황 (재시작 시 봇 포지션 복원용)
+
+        Returns:
+            (수량, 평균 매수가, 마지막 매수 UNIX 시각) 또는 보유하지 않으면 None
+        """
+        coin = ticker.split('-')[1]
+        volume = self.balances.get(coin, 0.0)
+        if volume <= 1e-12:
+            return None
+        return volume, self.avg_buy_price[coin], self.bought_at.get(coin, time.time())
+
+    def get_balance(self, ticker="KRW"):
+        """
+        주문 가능 가상 잔고 ('KRW-BTC'나 'BTC' 모두 가능, 대기 주문에 잠긴 수량 제외)
+        """
+        if '-' in ticker:
+            ticker = ticker.split('-')[1]
+        return self.balances.get(ticker, 0.0) - self.locked.get(ticker, 0.0)
+
+    def get_balances(self):
+        """
+        가상 계좌 (업비트 accounts 응답 형식)
+        """
+        return [{
+            'currency': currency,
+            'balance': str(balance - self.locked.get(currency, 0.0)),
+            'locked': str(self.locked.get(currency, 0.0)),
+            'avg_buy_price': str(self.avg_buy_price.get(currency, 0)),
+            'unit_currency': 'KRW',
+        } for currency, balance in self.balances.items() if currency == 'KRW' or balance > 1e-12]
+
+    def equity(self, prices=None):
+        """
+        평가 금액 (KRW + 코인 × 현재가)
+
+        Args:
+            prices: {코인: 가격} (None이면 price_source로 조회)
+        """
+        total = self.balances['KRW']
+        for currency, balance in self.balances.items():
+            if currency == 'KRW' or balance <= 1e-12:
+                continue
+            price = prices[currency] if prices else self.price_source(f"KRW-{currency}")
+            total += balance * price
+        return total
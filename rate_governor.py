@@ -0,0 +1,351 @@
+"""
+업비트 요청 속도 제한 (토큰 버킷)
+업비트는 엔드포인트 그룹별로 초당 요청 수를 제한하므로(시세 그룹 10회, 주문 8회, 나머지 거래 API 30회)
+그룹마다 토큰 버킷을 두고, 토큰을 기다리는 요청은 우선순위(주문 > 손절 확인 > 캔들 > 백필) 순서로 보낸다.
+봇 루프, 최적화 스크립트, 백필이 한 프로세스에서 GOVERNOR 하나를 함께 쓰고,
+config.RATE_LIMIT_FILE을 주면 버킷 상태를 파일 잠금으로 프로세스끼리도 공유한다.
+대기 시간은 그룹/우선순위별로 모아 metrics()로 볼 수 있다.
+"""
+import os
+import json
+import time
+import heapq
+import asyncio
+import itertools
+import threading
+import contextvars
+from contextlib import contextmanager
+import config
+
+try:
+    import fcntl
+except ImportError:     # Windows: 프로세스 간 공유 없이 프로세스 안에서만 제한
+    fcntl = None
+
+
+# 우선순위 (작을수록 먼저)
+ORDER = 0           # 주문 생성/취소/조회
+STOP_CHECK = 1      # 손절/익절 현재가 확인, 잔고
+CANDLES = 2         # 봉 마감 캔들
+BACKFILL = 3        # 과거 캔들 백필, 최적화 데이터
+
+PRIORITY_NAMES = {ORDER: 'order', STOP_CHECK: 'stop_check', CANDLES: 'candles', BACKFILL: 'backfill'}
+
+# 엔드포인트 그룹 → 초당 요청 수 (Remaining-Req 헤더의 group 이름과 같음)
+GROUP_LIMITS = {
+    'market': 10,
+    'candles': 10,
+    'trades': 10,
+    'ticker': 10,
+    'orderbook': 10,
+    'order': 8,
+    'default': 30,
+}
+
+# 이 컨텍스트에서 보내는 요청의 우선순위 (None이면 엔드포인트 기본값)
+_priority = contextvars.ContextVar('request_priority', default=None)
+
+
+@contextmanager
+def priority(level):
+    """
+    블록 안 요청의 우선순위 지정 (스레드에서 UpbitClient를 불러도 이어짐)
+
+    예: with priority(BACKFILL): client.get_ohlcv(...)
+    """
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def classify(method, path):
+    """
+    요청 → (엔드포인트 그룹, 기본 우선순위)
+
+    Args:
+        method: HTTP 메서드
+        path: API 경로 ('candles/days', 'ticker', 'orders' 등)
+
+    Returns:
+        (그룹, 우선순위) — priority() 블록 안이면 그 우선순위
+    """
+    if (path, method) in (('orders', 'POST'), ('order', 'DELETE')):
+        group, level = 'order', ORDER
+    elif path == 'order':
+        group, level = 'default', ORDER
+    elif path.startswith('candles'):
+        group, level = 'candles', CANDLES
+    elif path == 'ticker':
+        group, level = 'ticker', STOP_CHECK
+    elif path.startswith('trades'):
+        group, level = 'trades', CANDLES
+    elif path.startswith('orderbook'):
+        group, level = 'orderbook', STOP_CHECK
+    elif path.startswith('market'):
+        group, level = 'market', CANDLES
+    else:
+        group, level = 'default', STOP_CHECK
+
+    override = _priority.get()
+    return group, level if override is None else override
+
+
+class TokenBuckets:
+    """
+    그룹별 토큰 버킷 (프로세스 안)
+    """
+
+    def __init__(self, limits, burst=None, clock=time.monotonic):
+        """
+        Args:
+            limits: {그룹: 초당 요청 수}
+            burst: 버킷 크기 (None이면 초당 요청 수, 1초 안에 몰아 보낼 수 있는 양)
+            clock: 현재 시각 함수
+        """
+        self.limits = limits
+        self.burst = burst
+        self.clock = clock
+        self.state = {}     # 그룹 → [남은 토큰, 갱신 시각]
+
+    def capacity(self, group):
+        return self.burst or self.limits[group]
+
+    def _refill(self, state, group, now):
+        tokens, updated = state.get(group, (self.capacity(group), now))
+        tokens = min(self.capacity(group), tokens + (now - updated) * self.limits[group])
+        state[group] = [tokens, now]
+        return state[group]
+
+    def _take(self, state, group, now):
+        bucket = self._refill(state, group, now)
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        return (1 - bucket[0]) / self.limits[group]
+
+    def take(self, group):
+        """
+        토큰 1개 사용
+
+        Returns:
+            0이면 사용, 아니면 다음 토큰까지 남은 시간 (초)
+        """
+        return self._take(self.state, group, self.clock())
+
+    def limit(self, group, remaining):
+        """
+        남은 토큰을 remaining 이하로 (다른 프로세스/서버 응답 기준, 429면 0)
+        """
+        bucket = self._refill(self.state, group, self.clock())
+        bucket[0] = min(bucket[0], remaining)
+
+
+class FileTokenBuckets(TokenBuckets):
+    """
+    파일 잠금으로 프로세스끼리 공유하는 토큰 버킷 (같은 파일을 쓰는 봇/최적화/백필이 함께 제한)
+    """
+
+    def __init__(self, path, limits, burst=None):
+        if fcntl is None:
+            raise RuntimeError("프로세스 간 요청 제한은 fcntl이 있는 OS에서만 지원합니다")
+        # 프로세스마다 시작 시각이 다르므로 벽시계 사용
+        super().__init__(limits, burst, clock=time.time)
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _update(self, apply):
+        with open(self.path, 'a+') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                try:
+                    state = json.loads(f.read() or '{}')
+                except ValueError:
+                    state = {}
+                result = apply(state, self.clock())
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(state))
+                f.flush()
+                return result
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def take(self, group):
+        return self._update(lambda state, now: self._take(state, group, now))
+
+    def limit(self, group, remaining):
+        def apply(state, now):
+            bucket = self._refill(state, group, now)
+            bucket[0] = min(bucket[0], remaining)
+        self._update(apply)
+
+
+class RateGovernor:
+    """
+    업비트 요청 속도 제한 (그룹별 토큰 버킷 + 우선순위 대기열)
+
+    사용법:
+        delay = GOVERNOR.acquire('candles', BACKFILL)     # 스레드
+        delay = await GOVERNOR.aacquire('order', ORDER)   # 이벤트 루프
+        GOVERNOR.metrics()['candles']['backfill']['avg_delay']
+    """
+
+    def __init__(self, limits=None, rate=None, burst=None, lock_path=None, clock=time.monotonic):
+        """
+        Args:
+            limits: {그룹: 초당 요청 수} (기본값: GROUP_LIMITS)
+            rate: 모든 그룹에 같은 초당 요청 수 (테스트용, limits보다 우선)
+            burst: 버킷 크기 (None이면 초당 요청 수)
+            lock_path: 프로세스 간 공유 상태 파일 (None이면 프로세스 안에서만)
+            clock: 대기 시간 측정 시각 함수
+        """
+        limits = dict(limits or GROUP_LIMITS)
+        if rate:
+            limits = {group: rate for group in limits}
+        self.limits = limits
+        self.clock = clock
+        if lock_path:
+            self.buckets = FileTokenBuckets(lock_path, limits, burst)
+        else:
+            self.buckets = TokenBuckets(limits, burst, clock)
+
+        self.cond = threading.Condition()
+        self.queues = {}        # 그룹 → [(우선순위, 순번)] 힙
+        self.sequence = itertools.count()
+        self.delays = {}        # (그룹, 우선순위) → [요청 수, 대기 합계, 최대 대기]
+
+    def _enter(self, group, level):
+        if group not in self.limits:
+            group = 'default'
+        entry = (level, next(self.sequence))
+        with self.cond:
+            heapq.heappush(self.queues.setdefault(group, []), entry)
+        return group, entry
+
+    def _poll(self, group, entry):
+        """
+        대기열 맨 앞이면 토큰 사용 시도
+
+        Returns:
+            0이면 통과, 아니면 다시 확인할 때까지 시간 (초)
+        """
+        with self.cond:
+            queue = self.queues[group]
+            if queue[0] == entry:
+                wait = self.buckets.take(group)
+                if wait == 0:
+                    heapq.heappop(queue)
+                    self.cond.notify_all()
+                return wait
+            return 1 / self.limits[group]
+
+    def _leave(self, group, entry):
+        """
+        취소/중단된 요청을 대기열에서 제거
+        """
+        with self.cond:
+            queue = self.queues[group]
+            if entry in queue:
+                queue.remove(entry)
+                heapq.heapify(queue)
+                self.cond.notify_all()
+
+    def _record(self, group, level, delay):
+        with self.cond:
+            stats = self.delays.setdefault((group, level), [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += delay
+            stats[2] = max(stats[2], delay)
+
+    def acquire(self, group, level=CANDLES):
+        """
+        토큰을 받을 때까지 대기 (스레드용)
+
+        Returns:
+            대기한 시간 (초)
+        """
+        started = self.clock()
+        group, entry = self._enter(group, level)
+        try:
+            while True:
+                wait = self._poll(group, entry)
+                if wait == 0:
+                    break
+                with self.cond:
+                    self.cond.wait(wait)
+        except BaseException:
+            self._leave(group, entry)
+            raise
+
+        delay = self.clock() - started
+        self._record(group, level, delay)
+        return delay
+
+    async def aacquire(self, group, level=CANDLES):
+        """
+        토큰을 받을 때까지 대기 (이벤트 루프용, 루프를 막지 않음)
+
+        Returns:
+            대기한 시간 (초)
+        """
+        started = self.clock()
+        group, entry = self._enter(group, level)
+        try:
+            while True:
+                wait = self._poll(group, entry)
+                if wait == 0:
+                    break
+                await asyncio.sleep(wait)
+        except BaseException:
+            self._leave(group, entry)
+            raise
+
+        delay = self.clock() - started
+        self._record(group, level, delay)
+        return delay
+
+    def observe(self, group, remaining):
+        """
+        응답의 Remaining-Req(초당 남은 요청 수) 반영
+        다른 프로세스나 서버가 먼저 쓴 만큼 남은 토큰을 줄인다.
+        """
+        if group in self.limits:
+            with self.cond:
+                self.buckets.limit(group, remaining)
+
+    def throttled(self, group):
+        """
+        429 응답: 그룹의 남은 토큰을 비워 다음 토큰까지 모든 요청 대기
+        """
+        self.observe(group, 0)
+
+    def metrics(self):
+        """
+        대기 시간 통계
+
+        Returns:
+            {그룹: {우선순위 이름: {'requests', 'avg_delay', 'max_delay', 'waiting'}}}
+        """
+        with self.cond:
+            result = {}
+            for (group, level), (count, total, longest) in sorted(self.delays.items()):
+                result.setdefault(group, {})[PRIORITY_NAMES.get(level, level)] = {
+                    'requests': count,
+                    'avg_delay': total / count,
+                    'max_delay': longest,
+                    'waiting': sum(1 for entry in self.queues.get(group, []) if entry[0] == level),
+                }
+            return result
+
+    def reset_metrics(self):
+        with self.cond:
+            self.delays.clear()
+
+
+# 프로세스 공용 (config.RATE_LIMIT_FILE이 있으면 프로세스 간 공유)
+GOVERNOR = RateGovernor(lock_path=config.RATE_LIMIT_FILE or None)
@@ -0,0 +1,294 @@
+"""
+TradingBot 리플레이
+가상 시계(VirtualClock)와 저장된 캔들을 재생하는 시세 제공자(ReplayMarket)를 넣어
+TradingBot.run의 실제 판단 경로(봉 마감 스케줄러, 캔들 링 버퍼, 스트리밍 지표,
+손절/익절, 모의투자 체결)를 실제 시간보다 수천 배 빠르게 돌린다.
+결과는 Backtester.run과 같은 구조로 돌려주므로 라이브 경로와 백테스트를 나란히 비교할 수 있다.
+"""
+import io
+import time
+import contextlib
+import numpy as np
+import pandas as pd
+import config
+from bot import TradingBot
+from candle_clock import VirtualClock, INTERVAL_SECONDS, KST_OFFSET
+from notifier import TelegramNotifier
+from paper_trading import PaperTrader
+
+
+def _drive(coro):
+    """
+    기다릴 것이 없는 코루틴을 이벤트 루프 없이 실행해 결과 반환
+    """
+    try:
+        coro.send(None)
+    except StopIteration as done:
+        return done.value
+    raise RuntimeError("리플레이 시세는 대기 없이 끝나야 합니다.")
+
+
+class _AsyncMarket:
+    """
+    UpbitClient.aio와 같은 비동기 메서드 (get_market_snapshot용)
+    """
+
+    def __init__(self, market):
+        self.market = market
+
+    async def get_ohlcv(self, ticker="KRW-BTC", interval="day", count=200, to=None):
+        return self.market.get_ohlcv(ticker, interval=interval, count=count)
+
+    async def get_current_price(self, ticker="KRW-BTC"):
+        return self.market.get_current_price(ticker)
+
+
+class ReplayMarket:
+    """
+    저장된 캔들을 가상 시계에 맞춰 보여주는 시세 제공자 (UpbitClient 대신 TradingBot에 넣음)
+
+    진행 중인 봉은 시가 → 저가/고가 → 종가를 잇는 경로(양봉은 저가 먼저, 음봉은 고가 먼저)를
+    시간 비율대로 따라가며 현재가/고가/저가를 만든다.
+    """
+
+    def __init__(self, candles, clock, interval="day"):
+        """
+        Args:
+            candles: 캔들 DataFrame (KST 인덱스, open/high/low/close/volume)
+            clock: VirtualClock
+            interval: 캔들 주기
+        """
+        self.df = candles
+        self.clock = clock
+        self.interval = interval
+
+        self.starts = (candles.index - KST_OFFSET).values.astype('datetime64[ns]').astype(np.int64) / 1e9      # 봉 시작 UNIX 시각
+        length = INTERVAL_SECONDS.get(interval)
+        if length is None:
+            length = float(np.median(np.diff(self.starts))) if len(self.starts) > 1 else 86400.0
+        self.ends = np.append(self.starts[1:], self.starts[-1] + length)
+        self.ends = np.minimum(self.ends, self.starts + length)     # 빈 구간이 있어도 봉 길이까지만
+
+        self.open = candles['open'].to_numpy(dtype=float)
+        self.high = candles['high'].to_numpy(dtype=float)
+        self.low = candles['low'].to_numpy(dtype=float)
+        self.close = candles['close'].to_numpy(dtype=float)
+        self.aio = _AsyncMarket(self)
+
+    def position(self):
+        """
+        (현재 봉 위치, 봉 안에서 지난 비율 0~1)
+        """
+        now = self.clock.time()
+        pos = max(int(np.searchsorted(self.starts, now, side='right')) - 1, 0)
+        span = self.ends[pos] - self.starts[pos]
+        fraction = min(max((now - self.starts[pos]) / span, 0.0), 1.0)
+        return pos, fraction
+
+    def _path(self, pos, fraction):
+        """
+        진행 중인 봉의 (현재가, 지금까지 고가, 지금까지 저가)
+        """
+        o, h, l, c = self.open[pos], self.high[pos], self.low[pos], self.close[pos]
+        h, l = max(h, o, c), min(l, o, c)
+        first, second = (l, h) if c >= o else (h, l)
+        points = (0.0, 1 / 3, 2 / 3, 1.0)
+        values = (o, first, second, c)
+
+        price = float(np.interp(fraction, points, values))
+        visited = [v for p, v in zip(points, values) if p <= fraction] + [price]
+        return price, max(visited), min(visited)
+
+    def get_current_price(self, ticker="KRW-BTC"):
+        return self._path(*self.position())[0]
+
+    def get_ohlcv(self, ticker="KRW-BTC", interval="day", count=200, to=None):
+        """
+        지금까지의 캔들 (마지막 행은 진행 중인 봉)
+        """
+        pos, fraction = self.position()
+        df = self.df.iloc[max(pos + 1 - count, 0):pos + 1].copy()
+
+        price, high, low = self._path(pos, fraction)
+        last = len(df) - 1
+        df.iloc[last, df.columns.get_loc('close')] = price
+        df.iloc[last, df.columns.get_loc('high')] = high
+        df.iloc[last, df.columns.get_loc('low')] = low
+        df.iloc[last, df.columns.get_loc('volume')] *= fraction
+        if 'value' in df.columns:
+            df.iloc[last, df.columns.get_loc('value')] *= fraction
+        return df
+
+    def gather(self, *coros):
+        return [_drive(coro) for coro in coros]
+
+
+class ReplayBot(TradingBot):
+    """
+    체결/자산을 기록하는 TradingBot (판단 경로는 그대로)
+    """
+
+    def __init__(self, market, **kwargs):
+        super().__init__(client=market, **kwargs)
+        self.market = market
+        self.trades = []
+        self.equity = {}
+        self.cost = 0.0         # 현재 포지션 매수 비용 (수수료 포함)
+
+    def _record(self, result, trade_type):
+        fill = result['trades'][0]
+        price = float(fill['price'])
+        quantity = float(fill['volume'])
+        pos, _ = self.market.position()
+        trade = {
+            'date': self.market.df.index[pos],
+            'type': trade_type,
+            'price': price,
+            'quantity': quantity,
+            'balance': self.upbit.get_balance("KRW"),
+        }
+
+        if trade_type == 'buy':
+            self.cost = float(fill['funds']) + float(result['paid_fee'])
+        else:
+            proceeds = float(fill['funds']) - float(result['paid_fee'])
+            trade['profit'] = proceeds - self.cost
+            trade['profit_ratio'] = trade['profit'] / self.cost if self.cost else 0.0
+        self.trades.append(trade)
+
+    def buy(self, ticker, amount=None, ratio=None):
+        result = super().buy(ticker, amount=amount, ratio=ratio)
+        if result:
+            self._record(result, 'buy')
+        return result
+
+    def sell(self, ticker, amount=None):
+        result = super().sell(ticker, amount=amount)
+        if result:
+            self._record(result, 'sell')
+        return result
+
+    def check_exit(self, ticker, current_price):
+        reason = super().check_exit(ticker, current_price)
+        if reason:
+            self.trades[-1]['type'] = reason
+        return reason
+
+    def evaluate_signal(self, ticker, interval, closed_before=None):
+        signal = super().evaluate_signal(ticker, interval, closed_before)
+        if signal is not None and closed_before is not None:
+            # 방금 마감된 봉 기준 평가 금액
+            index = self.market.df.index
+            closed = index[max(index.searchsorted(closed_before) - 1, 0)]
+            coin = ticker.split('-')[1]
+            self.equity[closed] = self.upbit.equity({coin: self.market.get_current_price()})
+        return signal
+
+
+def replay_bot(candles, ticker="KRW-BTC", interval="day", initial_balance=1000000, warmup=None,
+               sleep_sec=60, close_offset=2, fee=0.0, slippage=None, verbose=False):
+    """
+    저장된 캔들로 TradingBot.run 리플레이
+
+    Args:
+        candles: 캔들 DataFrame (KST 인덱스)
+        ticker: 티커
+        interval: 캔들 주기
+        initial_balance: 모의투자 시작 KRW
+        warmup: 리플레이 시작 봉 위치 (기본값: 봇의 candle_count, 그 전은 지표 준비용)
+        sleep_sec: 봉 마감 사이 현재가 확인 간격 (가상 초)
+        close_offset: 봉 마감 후 신호 판단까지 (가상 초)
+        fee: 수수료율 (기본값 0 - Backtester와 같은 조건)
+        slippage: 금액 → 슬리피지 함수 (기본값: 없음 - Backtester와 같은 조건)
+        verbose: 봇 출력 표시 여부
+
+    Returns:
+        Backtester.run과 같은 구조의 결과 딕셔너리 (+ wall_time, speedup)
+    """
+    df = candles.copy()
+    df.columns = [col.lower() for col in df.columns]
+
+    start_clock = VirtualClock(0)
+    market = ReplayMarket(df, start_clock, interval)
+    paper = PaperTrader(market.get_current_price, ledger_path=None, initial_krw=initial_balance,
+                        fee=fee, slippage=slippage or (lambda amount: 0.0))
+
+    quiet = contextlib.nullcontext if verbose else lambda: contextlib.redirect_stdout(io.StringIO())
+    with quiet():
+        # 익절은 Backtester와 같이 현재가 확인으로 (지정가 주문 없이)
+        bot = ReplayBot(market, paper=paper, clock=start_clock, notifier=TelegramNotifier("", ""),
+                        take_profit_order=False)
+
+    warmup = bot.candle_count if warmup is None else warmup
+    warmup = min(max(warmup, 1), len(df) - 1)
+    start_clock.current = started_at = market.starts[warmup] + close_offset
+    start_clock.end = market.ends[-1] + close_offset + 1
+
+    started = time.perf_counter()
+    with quiet():
+        bot.run(ticker, interval, sleep_sec=sleep_sec, use_ticker_feed=False, close_offset=close_offset)
+    wall_time = time.perf_counter() - started
+
+    final_balance = paper.equity({ticker.split('-')[1]: float(df['close'].iloc[-1])})
+    total_return = final_balance - initial_balance
+    return_ratio = (final_balance / initial_balance - 1) * 100
+
+    sell_trades = [t for t in bot.trades if t['type'] in ['sell', 'stop_loss', 'take_profit']]
+    win_trades = [t for t in sell_trades if t.get('profit', 0) > 0]
+    win_rate = len(win_trades) / len(sell_trades) * 100 if sell_trades else 0
+
+    replayed = df.iloc[warmup - 1:]
+    buy_hold_return = (replayed['close'].iloc[-1] / replayed['close'].iloc[0] - 1) * 100
+
+    return {
+        'initial_balance': initial_balance,
+        'final_balance': final_balance,
+        'total_return': total_return,
+        'return_ratio': return_ratio,
+        'trades': bot.trades,
+        'win_rate': win_rate,
+        'buy_hold_return': buy_hold_return,
+        'equity': pd.Series(bot.equity, dtype=float),
+        'wall_time': wall_time,
+        'speedup': (start_clock.end - started_at) / wall_time,
+    }
+
+
+if __name__ == "__main__":
+    from backtest import Backtester
+    from strategies import STRATEGIES, STRATEGY_CONFIGS
+    from candle_store import CandleStore
+
+    ticker = config.TARGET_COIN
+    interval = config.INTERVAL
+    strategy_config = STRATEGY_CONFIGS[config.SELECTED_STRATEGY]
+
+    print("=" * 60)
+    print("⏩ TradingBot 리플레이 vs 백테스트")
+    print("=" * 60)
+    print(f"   전략: #{config.SELECTED_STRATEGY} {strategy_config['name']} / {ticker} {interval}")
+
+    candles = CandleStore(offline=True).load(ticker, interval)
+    if candles is None or len(candles) < 300:
+        from sample_data import make_candles
+        print("   저장된 캔들이 없어 합성 캔들 사용")
+        candles = make_candles(n=730, start='2023-01-01 09:00')
+    candles = candles.tail(730)
+
+    replay = replay_bot(candles, ticker, interval)
+
+    # 같은 구간을 백테스트 (지표는 전체로 계산, 거래는 리플레이 첫 판단 봉부터 - 백테스트는 31번째 행부터 거래)
+    strategy = STRATEGIES[config.SELECTED_STRATEGY](config.STRATEGY_PARAMS)
+    warmup = strategy.live_candle_count()   # 봇의 candle_count
+    frame = strategy.calculate_indicators(candles.copy()).iloc[warmup - 31:]
+    started = time.perf_counter()
+    backtest = Backtester(strategy).run_frame(frame, verbose=False)
+    backtest_time = time.perf_counter() - started
+
+    print()
+    print(f"{'':12} {'리플레이':>12} {'백테스트':>12}")
+    print(f"{'수익률':12} {replay['return_ratio']:>+11.2f}% {backtest['return_ratio']:>+11.2f}%")
+    print(f"{'거래 횟수':12} {len(replay['trades']):>12} {len(backtest['trades']):>12}")
+    print(f"{'승률':12} {replay['win_rate']:>11.1f}% {backtest['win_rate']:>11.1f}%")
+    print(f"{'소요 시간':12} {replay['wall_time']:>11.2f}s {backtest_time:>11.3f}s")
+    print(f"\n⚡ 리플레이 속도: 실제 시간의 {replay['speedup']:,.0f}배")
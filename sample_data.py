@@ -0,0 +1,37 @@
+"""
+합성 캔들 데이터
+네트워크 없이 검증/시뮬레이션할 때 쓰는 랜덤워크 OHLCV
+"""
+import numpy as np
+import pandas as pd
+
+
+def make_candles(n=400, seed=42, start='2025-01-01', freq='D', price=50_000_000):
+    """
+    랜덤워크 합성 OHLCV (급등락/거래량 폭발 포함)
+
+    Args:
+        n: 캔들 개수
+        seed: 난수 시드
+        start: 첫 캔들 시각
+        freq: 캔들 간격 (pandas 빈도 문자열)
+        price: 시작 가격
+
+    Returns:
+        DataFrame (pyupbit와 같은 columns: open, high, low, close, volume, value)
+    """
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0, 0.02, n)
+    returns[rng.random(n) < 0.05] *= 4  # 가끔 ±5% 이상 변동
+    close = price * np.cumprod(1 + returns)
+    volume = rng.lognormal(5, 0.5, n)
+    volume[rng.random(n) < 0.05] *= 4  # 가끔 거래량 폭발
+
+    return pd.DataFrame({
+        'open': close * (1 - returns / 2),
+        'high': close * 1.01,
+        'low': close * 0.99,
+        'close': close,
+        'volume': volume,
+        'value': close * volume,
+    }, index=pd.date_range(start, periods=n, freq=freq))
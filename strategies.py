@@ -1,8 +1,9 @@
 """
 트레이딩 전략 프리셋
 """
+import numpy as np
 import pandas as pd
-import ta
+from indicators import IndicatorPipeline, ALL_COLUMNS
 
 
 class BaseStrategy:
@@ -10,59 +11,113 @@ class BaseStrategy:
     기본 전략 클래스
     """
     
+    # 신호 판단에 읽는 지표 컬럼 (자식 클래스에서 선언, None이면 전체)
+    required_indicators = None
+    # 지표 외에 신호 판단에 필요한 최근 캔들 개수 (current, previous, prev2, 거래량 평균 등)
+    signal_lookback = 1
+    
     def __init__(self, params=None):
         self.params = params or {}
         self.name = "Base Strategy"
         
-    def calculate_indicators(self, df):
+    def indicator_columns(self):
         """
-        기술적 지표 계산
+        계산할 지표 컬럼
         """
-        # RSI
-        rsi_period = self.params.get('rsi_period', 14)
-        df['rsi'] = ta.momentum.RSIIndicator(
-            close=df['close'], 
-            window=rsi_period
-        ).rsi()
-        
-        # MACD
-        macd_fast = self.params.get('macd_fast', 12)
-        macd_slow = self.params.get('macd_slow', 26)
-        macd_signal = self.params.get('macd_signal', 9)
-        
-        macd = ta.trend.MACD(
-            close=df['close'],
-            window_fast=macd_fast,
-            window_slow=macd_slow,
-            window_sign=macd_signal
-        )
-        df['macd'] = macd.macd()
-        df['macd_signal'] = macd.macd_signal()
-        df['macd_diff'] = macd.macd_diff()
-        
-        # 볼린저 밴드
-        bollinger = ta.volatility.BollingerBands(
-            close=df['close'],
-            window=20,
-            window_dev=2
-        )
-        df['bb_upper'] = bollinger.bollinger_hband()
-        df['bb_middle'] = bollinger.bollinger_mavg()
-        df['bb_lower'] = bollinger.bollinger_lband()
+        if self.required_indicators is None:
+            return ALL_COLUMNS
+        return self.required_indicators
+    
+    def calculate_indicators(self, df):
+        """
+        기술적 지표 계산 (전략이 읽는 지표만)
         
-        # 이동평균선
-        df['ma_5'] = df['close'].rolling(window=5).mean()
-        df['ma_20'] = df['close'].rolling(window=20).mean()
-        df['ma_60'] = df['close'].rolling(window=60).mean()
-        df['ma_120'] = df['close'].rolling(window=120).mean()
+        같은 종가 데이터 + 같은 파라미터는 지표 캐시에서 재사용
+        (RSI 기준값, 투자비율, 손절/익절만 바꾸는 스윕은 지표를 한 번만 계산)
+        """
+        return IndicatorPipeline(self.params).build(df, self.indicator_columns())
+    
+    def lookback(self):
+        """
+        신호 판단에 필요한 최소 캔들 개수 (지표 안정화 + 최근 봉)
+        """
+        warmup = IndicatorPipeline(self.params).lookback(self.indicator_columns())
+        return warmup + self.signal_lookback
+    
+    def live_candle_count(self):
+        """
+        실시간 봇이 조회할 캔들 개수 (진행 중인 봉 포함, 요청 1번 = 최대 200개)
         
-        return df
+        상태 줄/매수 알림에 RSI를 출력하므로 RSI를 쓰지 않는 전략(7, 8 등)도
+        RSI가 안정될 만큼은 받는다 (RSI: nan 방지)
+        """
+        rsi_warmup = IndicatorPipeline(self.params).lookback(('rsi',))
+        return min(max(self.lookback(), rsi_warmup) + 1, 200)
     
     def generate_signal(self, df):
         """
         매매 신호 생성 (자식 클래스에서 구현)
         """
         return 'hold'
+    
+    def generate_signals(self, df):
+        """
+        전체 구간 매매 신호 일괄 생성
+        
+        i번째 값은 generate_signal(df.iloc[:i+1])과 같다.
+        기본 구현은 봉마다 generate_signal을 호출하고,
+        자식 클래스에서 shift 컬럼으로 벡터화한다.
+        
+        Args:
+            df: 지표가 계산된 데이터프레임
+                (벡터화된 전략은 {컬럼: NumPy 배열} 딕셔너리도 받음)
+            
+        Returns:
+            봉별 'buy', 'sell', 'hold' 배열
+        """
+        return np.array(
+            [self.generate_signal(df.iloc[:i+1]) for i in range(len(df))],
+            dtype=object
+        )
+    
+    @staticmethod
+    def _shift(values, periods=1):
+        """
+        한 칸 이전 값 (Series면 shift, NumPy 배열이면 앞을 NaN으로 채움)
+        
+        generate_signals가 DataFrame 대신 {컬럼: 배열} 딕셔너리로도 동작하게 한다
+        (지표 기간 스윕에서 조합마다 pandas 연산을 하지 않도록)
+        """
+        if isinstance(values, pd.Series):
+            return values.shift(periods)
+        
+        shifted = np.full(len(values), np.nan)
+        shifted[periods:] = values[:len(values) - periods]
+        return shifted
+    
+    @staticmethod
+    def _rolling_mean(values, window):
+        """
+        직전 window개(부족하면 있는 만큼) 평균
+        """
+        return pd.Series(values).rolling(window=window, min_periods=1).mean().to_numpy()
+    
+    @staticmethod
+    def _to_signals(buy, sell, min_len=1):
+        """
+        매수/매도 조건 배열 → 신호 배열 (매수 우선)
+        
+        Args:
+            buy: 봉별 매수 조건 (bool)
+            sell: 봉별 매도 조건 (bool)
+            min_len: 신호 판단에 필요한 최소 봉 개수
+        """
+        buy = np.asarray(buy, dtype=bool)
+        sell = np.asarray(sell, dtype=bool)
+        
+        signals = np.where(buy, 'buy', np.where(sell, 'sell', 'hold')).astype(object)
+        signals[:min_len - 1] = 'hold'
+        return signals
 
 
 class Strategy1_MeanReversion(BaseStrategy):
@@ -77,6 +132,9 @@ class Strategy1_MeanReversion(BaseStrategy):
     성과: +1.67% (3개월, Buy & Hold -37.84%)
     """
     
+    required_indicators = ('rsi', 'macd', 'macd_signal', 'ma_20', 'bb_lower', 'bb_upper')
+    signal_lookback = 2
+    
     def __init__(self, params=None):
         super().__init__(params)
         self.name = "Strategy #1: Mean Reversion"
@@ -132,6 +190,38 @@ class Strategy1_MeanReversion(BaseStrategy):
             return 'sell'
         else:
             return 'hold'
+    
+    def generate_signals(self, df):
+        close = df['close']
+        rsi = df['rsi']
+        macd = df['macd']
+        prev_close = self._shift(close)
+        prev_rsi = self._shift(rsi)
+        prev_macd = self._shift(macd)
+        prev_macd_signal = self._shift(df['macd_signal'])
+        
+        rsi_oversold = self.params.get('rsi_oversold', 45)
+        rsi_overbought = self.params.get('rsi_overbought', 70)
+        
+        # 매수 신호 개수
+        buy_count = (
+            (rsi < rsi_oversold).astype(int) +
+            ((close < df['ma_20']) & (macd > prev_macd)).astype(int) +
+            (close < df['bb_lower'] * 1.10).astype(int) +
+            ((close < prev_close) &
+             (rsi > prev_rsi) &
+             (rsi < rsi_oversold + 15)).astype(int)
+        )
+        
+        # 매도 신호 개수
+        sell_count = (
+            (rsi > rsi_overbought).astype(int) +
+            ((macd < df['macd_signal']) &
+             (prev_macd >= prev_macd_signal)).astype(int) +
+            (close > df['bb_upper']).astype(int)
+        )
+        
+        return self._to_signals(buy_count >= 2, sell_count >= 2, min_len=2)
 
 
 class Strategy2_TrendFollowing(BaseStrategy):
@@ -150,6 +240,9 @@ class Strategy2_TrendFollowing(BaseStrategy):
     - 큰 수익 노림, 작은 손실 수용
     """
     
+    required_indicators = ('macd', 'macd_signal', 'ma_5', 'ma_20', 'ma_60')
+    signal_lookback = 3
+    
     def __init__(self, params=None):
         super().__init__(params)
         self.name = "Strategy #2: Trend Following"
@@ -217,6 +310,42 @@ class Strategy2_TrendFollowing(BaseStrategy):
             return 'sell'
         else:
             return 'hold'
+    
+    def generate_signals(self, df):
+        close = df['close']
+        ma_5 = df['ma_5']
+        ma_20 = df['ma_20']
+        macd = df['macd']
+        macd_signal = df['macd_signal']
+        prev_close = self._shift(close)
+        prev_ma_5 = self._shift(ma_5)
+        prev_ma_20 = self._shift(ma_20)
+        prev_macd = self._shift(macd)
+        prev_macd_signal = self._shift(macd_signal)
+        
+        # 매수 신호
+        golden_cross = (ma_5 > ma_20) & (prev_ma_5 <= prev_ma_20)
+        uptrend = ma_20 > df['ma_60']
+        macd_golden = (macd > macd_signal) & (prev_macd <= prev_macd_signal)
+        ma20_support = (close > ma_20) & (prev_close <= prev_ma_20)
+        volume_surge = df['volume'] > self._shift(df['volume']) * 1.3
+        
+        buy_count = (
+            golden_cross.astype(int) +
+            uptrend.astype(int) +
+            macd_golden.astype(int) +
+            ma20_support.astype(int) +
+            volume_surge.astype(int)
+        )
+        
+        # 매도 신호 (MACD 데드크로스는 판단에 쓰이지 않음)
+        dead_cross = (ma_5 < ma_20) & (prev_ma_5 >= prev_ma_20)
+        ma20_breakdown = (close < ma_20) & (prev_close >= prev_ma_20)
+        
+        buy = ((golden_cross | ma20_support) & (buy_count >= 2)) | (buy_count >= 3)
+        sell = dead_cross | ma20_breakdown
+        
+        return self._to_signals(buy, sell, min_len=3)
 
 
 class Strategy3_Scalping(BaseStrategy):
@@ -232,6 +361,9 @@ class Strategy3_Scalping(BaseStrategy):
     ⚠️ 주의: 수수료 부담 큼, 실전 검증 필요
     """
     
+    required_indicators = ('rsi', 'bb_middle', 'bb_lower')
+    signal_lookback = 2
+    
     def __init__(self, params=None):
         super().__init__(params)
         self.name = "Strategy #3: Scalping"
@@ -254,6 +386,15 @@ class Strategy3_Scalping(BaseStrategy):
             return 'sell'
         
         return 'hold'
+    
+    def generate_signals(self, df):
+        close = df['close']
+        rsi = df['rsi']
+        
+        buy = (close <= df['bb_lower']) & (rsi < 35)
+        sell = (close >= df['bb_middle']) | (rsi > 55)
+        
+        return self._to_signals(buy, sell, min_len=2)
 
 
 class Strategy4_MACDOnly(BaseStrategy):
@@ -267,6 +408,9 @@ class Strategy4_MACDOnly(BaseStrategy):
     - 손절 2%, 익절 8%
     """
     
+    required_indicators = ('macd', 'macd_signal')
+    signal_lookback = 2
+    
     def __init__(self, params=None):
         super().__init__(params)
         self.name = "Strategy #4: MACD Only"
@@ -289,6 +433,17 @@ class Strategy4_MACDOnly(BaseStrategy):
             return 'sell'
         
         return 'hold'
+    
+    def generate_signals(self, df):
+        macd = df['macd']
+        macd_signal = df['macd_signal']
+        prev_macd = self._shift(macd)
+        prev_macd_signal = self._shift(macd_signal)
+        
+        buy = (macd > macd_signal) & (prev_macd <= prev_macd_signal)
+        sell = (macd < macd_signal) & (prev_macd >= prev_macd_signal)
+        
+        return self._to_signals(buy, sell, min_len=2)
 
 
 class Strategy5_Momentum(BaseStrategy):
@@ -301,6 +456,9 @@ class Strategy5_Momentum(BaseStrategy):
     - 손절 3%, 익절 15%
     """
     
+    required_indicators = ('rsi',)
+    signal_lookback = 20  # 평균 거래량 20봉
+    
     def __init__(self, params=None):
         super().__init__(params)
         self.name = "Strategy #5: Momentum Bomb"
@@ -328,6 +486,23 @@ class Strategy5_Momentum(BaseStrategy):
             return 'sell'
         
         return 'hold'
+    
+    def generate_signals(self, df):
+        close = df['close']
+        rsi = df['rsi']
+        volume = df['volume']
+        
+        # 봉마다 직전 20개(부족하면 있는 만큼) 평균 거래량
+        avg_volume = self._rolling_mean(volume, 20)
+        
+        buy = (
+            (volume > avg_volume * 2) &
+            (close > self._shift(close)) &
+            (rsi > self._shift(rsi))
+        )
+        sell = (volume < avg_volume * 0.5) | (rsi > 75)
+        
+        return self._to_signals(buy, sell, min_len=3)
 
 
 class Strategy6_Contrarian(BaseStrategy):
@@ -341,6 +516,9 @@ class Strategy6_Contrarian(BaseStrategy):
     - 손절 1%, 익절 20%
     """
     
+    required_indicators = ('rsi', 'bb_lower')
+    signal_lookback = 2
+    
     def __init__(self, params=None):
         super().__init__(params)
         self.name = "Strategy #6: Contrarian"
@@ -361,6 +539,14 @@ class Strategy6_Contrarian(BaseStrategy):
             return 'sell'
         
         return 'hold'
+    
+    def generate_signals(self, df):
+        rsi = df['rsi']
+        
+        buy = (rsi < 20) | (df['close'] < df['bb_lower'] * 0.90)
+        sell = rsi > 50
+        
+        return self._to_signals(buy, sell, min_len=2)
 
 
 class Strategy7_Random(BaseStrategy):
@@ -376,6 +562,9 @@ class Strategy7_Random(BaseStrategy):
     목적: 통제군 (다른 전략과 비교)
     """
     
+    required_indicators = ()
+    signal_lookback = 1
+    
     def __init__(self, params=None):
         super().__init__(params)
         self.name = "Strategy #7: Random Monkey 🐵"
@@ -391,6 +580,14 @@ class Strategy7_Random(BaseStrategy):
             return 'sell'
         else:
             return 'hold'
+    
+    def generate_signals(self, df):
+        import random
+        
+        # 봉마다 generate_signal을 부른 것과 같은 난수 순서
+        rand = np.array([random.random() for _ in range(len(df['close']))])
+        
+        return self._to_signals(rand < 0.1, (rand >= 0.1) & (rand < 0.2))
 
 
 class Strategy8_AlwaysBuy(BaseStrategy):
@@ -405,6 +602,9 @@ class Strategy8_AlwaysBuy(BaseStrategy):
     ⚠️ 절대 실전 금지
     """
     
+    required_indicators = ()
+    signal_lookback = 1
+    
     def __init__(self, params=None):
         super().__init__(params)
         self.name = "Strategy #8: Always Buy"
@@ -412,6 +612,9 @@ class Strategy8_AlwaysBuy(BaseStrategy):
     def generate_signal(self, df):
         # 항상 매수
         return 'buy'
+    
+    def generate_signals(self, df):
+        return np.full(len(df['close']), 'buy', dtype=object)
 
 
 class Strategy9_BuyTheDip(BaseStrategy):
@@ -424,6 +627,9 @@ class Strategy9_BuyTheDip(BaseStrategy):
     - 손절 3%, 익절 12%
     """
     
+    required_indicators = ()
+    signal_lookback = 2
+    
     def __init__(self, params=None):
         super().__init__(params)
         self.name = "Strategy #9: Buy The Dip"
@@ -447,6 +653,12 @@ class Strategy9_BuyTheDip(BaseStrategy):
             return 'sell'
         
         return 'hold'
+    
+    def generate_signals(self, df):
+        close = df['close']
+        change = (close / self._shift(close) - 1) * 100
+        
+        return self._to_signals(change < -5, change > 5, min_len=2)
 
 
 class Strategy10_MoonShot(BaseStrategy):
@@ -462,6 +674,9 @@ class Strategy10_MoonShot(BaseStrategy):
     위험도: ⚠️⚠️⚠️ 극고위험
     """
     
+    required_indicators = ('rsi',)
+    signal_lookback = 20  # 평균 거래량 20봉
+    
     def __init__(self, params=None):
         super().__init__(params)
         self.name = "Strategy #10: Moon Shot 🚀"
@@ -490,6 +705,19 @@ class Strategy10_MoonShot(BaseStrategy):
             return 'sell'
         
         return 'hold'
+    
+    def generate_signals(self, df):
+        close = df['close']
+        rsi = df['rsi']
+        volume = df['volume']
+        
+        avg_volume = self._rolling_mean(volume, 20)
+        change = (close / self._shift(close) - 1) * 100
+        
+        buy = (change > 3) & (volume > avg_volume * 1.5) & (rsi > 60)
+        sell = (change < -2) | (rsi < 50)
+        
+        return self._to_signals(buy, sell, min_len=3)
 
 
 # 전략 레지스트리
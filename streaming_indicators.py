@@ -0,0 +1,263 @@
+"""
+스트리밍 지표 엔진 (봉당 O(1) 갱신)
+라이브 봇이 매 루프마다 200개 캔들 전체로 지표를 다시 계산하지 않도록
+RSI(Wilder), MACD(EMA), 볼린저 밴드, 이동평균을 누적 상태로 유지한다.
+(ta 라이브러리 일괄 계산과 같은 값, 허용 오차 내)
+"""
+import math
+from collections import deque
+import numpy as np
+
+
+NAN = float('nan')
+
+
+class RollingWindow:
+    """
+    고정 길이 이동 합계 (평균/모분산)
+
+    값을 기준값만큼 빼서 누적해 큰 가격에서도 분산 계산 오차를 줄이고,
+    window개마다 버퍼로 합계를 다시 계산해 누적 오차를 없앤다 (분할 상환 O(1)).
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.shift = 0.0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.since_resum = 0
+
+    def _resum(self):
+        self.shift = self.values[0] if self.values else 0.0
+        self.total = sum(v - self.shift for v in self.values)
+        self.total_sq = sum((v - self.shift) ** 2 for v in self.values)
+        self.since_resum = 0
+
+    def push(self, value):
+        """
+        값 추가 (가장 오래된 값은 빠짐)
+        """
+        if len(self.values) == self.window:
+            dropped = self.values[0] - self.shift
+            self.total -= dropped
+            self.total_sq -= dropped * dropped
+
+        self.values.append(value)
+        d = value - self.shift
+        self.total += d
+        self.total_sq += d * d
+
+        self.since_resum += 1
+        if self.since_resum >= self.window:
+            self._resum()
+
+    def stats(self, value=None):
+        """
+        (평균, 모표준편차) - value를 주면 그 값을 추가했다고 가정 (상태 변경 없음)
+
+        값이 window개 미만이면 NaN
+        """
+        total = self.total
+        total_sq = self.total_sq
+        count = len(self.values)
+
+        if value is not None:
+            if count == self.window:
+                dropped = self.values[0] - self.shift
+                total -= dropped
+                total_sq -= dropped * dropped
+            else:
+                count += 1
+            d = value - self.shift
+            total += d
+            total_sq += d * d
+
+        if count < self.window:
+            return NAN, NAN
+
+        mean = total / count
+        var = max(total_sq / count - mean * mean, 0.0)
+        return mean + self.shift, math.sqrt(var)
+
+
+class EMA:
+    """
+    지수이동평균 (pandas ewm(adjust=False)와 같은 재귀식)
+    """
+
+    def __init__(self, alpha, min_periods):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.value = None
+        self.count = 0
+
+    def step(self, x):
+        """
+        x를 반영한 (새 상태값, 관측 개수) - 상태 변경 없음
+        """
+        if self.value is None:
+            return x, 1
+        return self.value + self.alpha * (x - self.value), self.count + 1
+
+    def push(self, x):
+        self.value, self.count = self.step(x)
+
+    def output(self, value, count):
+        return value if count >= self.min_periods else NAN
+
+
+class StreamingIndicators:
+    """
+    BaseStrategy.calculate_indicators와 같은 컬럼을 봉 단위로 갱신
+
+    사용법:
+        engine = StreamingIndicators(config.STRATEGY_PARAMS)
+        for close in closes:          # 마감된 봉
+            engine.push(close)
+        engine.preview(forming_close) # 진행 중인 봉 (상태 변경 없음)
+    """
+
+    MA_WINDOWS = (5, 20, 60, 120)
+
+    def __init__(self, params=None, history=3):
+        self.params = params = params or {}
+        rsi_period = params.get('rsi_period', 14)
+        macd_fast = params.get('macd_fast', 12)
+        macd_slow = params.get('macd_slow', 26)
+        macd_signal = params.get('macd_signal', 9)
+
+        # RSI (Wilder: alpha = 1/period)
+        self.rsi_up = EMA(1 / rsi_period, rsi_period)
+        self.rsi_down = EMA(1 / rsi_period, rsi_period)
+
+        # MACD (span → alpha = 2/(span+1))
+        self.ema_fast = EMA(2 / (macd_fast + 1), macd_fast)
+        self.ema_slow = EMA(2 / (macd_slow + 1), macd_slow)
+        self.ema_signal = EMA(2 / (macd_signal + 1), macd_signal)
+
+        # 볼린저 (20, 2) + 이동평균
+        self.bollinger = RollingWindow(20)
+        self.bb_dev = 2
+        self.ma = {w: RollingWindow(w) for w in self.MA_WINDOWS}
+
+        self.prev_close = None
+        self.last_time = None
+        self.count = 0
+
+        # 최근 마감 봉 지표 (generate_signal의 previous/prev2용)
+        self.history = deque(maxlen=history)
+
+    def _compute(self, close):
+        """
+        close를 다음 봉으로 반영한 (지표 딕셔너리, 새 상태) - 상태 변경 없음
+        """
+        # RSI (첫 봉 변화량은 0으로 계산 - ta와 동일)
+        diff = 0.0 if self.prev_close is None else close - self.prev_close
+        up = self.rsi_up.step(diff if diff > 0 else 0.0)
+        down = self.rsi_down.step(-diff if diff < 0 else 0.0)
+        up_value = self.rsi_up.output(*up)
+        down_value = self.rsi_down.output(*down)
+
+        if down_value == 0:
+            rsi = 100.0
+        else:
+            rsi = 100 - 100 / (1 + up_value / down_value)
+
+        # MACD (신호선은 MACD 값이 나온 뒤부터 누적)
+        fast = self.ema_fast.step(close)
+        slow = self.ema_slow.step(close)
+        macd = self.ema_fast.output(*fast) - self.ema_slow.output(*slow)
+
+        if math.isnan(macd):
+            signal = (self.ema_signal.value, self.ema_signal.count)
+            macd_signal = NAN
+        else:
+            signal = self.ema_signal.step(macd)
+            macd_signal = self.ema_signal.output(*signal)
+
+        # 볼린저 밴드
+        bb_mean, bb_std = self.bollinger.stats(close)
+
+        values = {
+            'rsi': rsi,
+            'macd': macd,
+            'macd_signal': macd_signal,
+            'macd_diff': macd - macd_signal,
+            'bb_upper': bb_mean + self.bb_dev * bb_std,
+            'bb_middle': bb_mean,
+            'bb_lower': bb_mean - self.bb_dev * bb_std,
+        }
+        for w, window in self.ma.items():
+            values[f'ma_{w}'] = window.stats(close)[0]
+
+        return values, (up, down, fast, slow, signal, math.isnan(macd))
+
+    def push(self, close, time=None):
+        """
+        마감된 봉 반영
+
+        Returns:
+            이 봉의 지표 딕셔너리
+        """
+        close = float(close)
+        values, (up, down, fast, slow, signal, macd_missing) = self._compute(close)
+
+        self.rsi_up.value, self.rsi_up.count = up
+        self.rsi_down.value, self.rsi_down.count = down
+        self.ema_fast.value, self.ema_fast.count = fast
+        self.ema_slow.value, self.ema_slow.count = slow
+        if not macd_missing:
+            self.ema_signal.value, self.ema_signal.count = signal
+
+        self.bollinger.push(close)
+        for window in self.ma.values():
+            window.push(close)
+
+        self.prev_close = close
+        self.last_time = time
+        self.count += 1
+        self.history.append(values)
+
+        return values
+
+    def preview(self, close):
+        """
+        진행 중인 봉 지표 (상태 변경 없음, 같은 봉을 몇 번 불러도 됨)
+        """
+        return self._compute(float(close))[0]
+
+    def reset(self):
+        """
+        상태 초기화 (파라미터는 유지)
+        """
+        self.__init__(self.params, history=self.history.maxlen)
+
+    def apply(self, df):
+        """
+        캔들 DataFrame에 지표 컬럼 채우기 (마지막 행은 진행 중인 봉)
+
+        처음이거나 저장된 마지막 봉이 df에 없으면 df로 다시 시드하고,
+        그 외에는 새로 마감된 봉만 반영한다.
+        마지막 history+1개 행만 값이 채워지고 나머지는 NaN.
+        """
+        closed = df.iloc[:-1]
+
+        if self.last_time is None or self.last_time not in closed.index:
+            self.reset()
+            new_rows = closed
+        else:
+            new_rows = closed[closed.index > self.last_time]
+
+        for time, close in zip(new_rows.index, new_rows['close'].to_numpy()):
+            self.push(close, time)
+
+        rows = list(self.history) + [self.preview(df['close'].iloc[-1])]
+        rows = rows[-len(df):]
+
+        for column in rows[-1]:
+            values = np.full(len(df), np.nan)
+            values[len(df) - len(rows):] = [row[column] for row in rows]
+            df[column] = values
+
+        return df
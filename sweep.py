@@ -0,0 +1,189 @@
+"""
+병렬 파라미터 스윕
+(전략 파라미터 × RunConfig × 자본) 조합을 프로세스 풀로 나눠 실행하고
+끝나는 순서대로 결과를 돌려준다. config 전역값은 건드리지 않는다.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from backtest_by_capital import BacktesterWithSlippage
+from candle_store import CandleStore, candle_count
+
+
+# 워커 프로세스별 오프라인 캔들 저장소 (프로세스마다 한 번만 읽음)
+_store = None
+
+
+def _init_worker(store_root):
+    global _store
+    _store = CandleStore(store_root, offline=True)
+
+
+def _run_job(job, market, backtester_class, run_kwargs):
+    """
+    조합 1개 백테스트 (워커 프로세스에서 실행)
+    """
+    store = _store or CandleStore(offline=True)
+
+    strategy = job['strategy_class'](job['params'])
+
+    # 자본 목록이면 한 번의 봉 순회로 전체 자본 평가 (결과도 목록)
+    if isinstance(job['capital'], (list, tuple)):
+        backtester = backtester_class(strategy, data_source=store, run_config=job['run_config'])
+        ticker, start_date, end_date, interval = market
+        return job, backtester.run_capitals(ticker, start_date, end_date, job['capital'], interval, **run_kwargs)
+
+    backtester = backtester_class(
+        strategy,
+        initial_balance=job['capital'],
+        data_source=store,
+        run_config=job['run_config']
+    )
+
+    return job, backtester.run(*market, **run_kwargs)
+
+
+def make_job(strategy_class, params, capital, run_config, **tags):
+    """
+    스윕 조합 1개
+
+    Args:
+        strategy_class: 전략 클래스
+        params: 전략 파라미터
+        capital: 초기 자본 (목록이면 BacktesterWithSlippage.run_capitals로 한 번에)
+        run_config: RunConfig (투자비율/손절/익절)
+        tags: 결과 정리에 쓸 값 (예: rsi=30)
+    """
+    return {
+        'strategy_class': strategy_class,
+        'params': params,
+        'capital': capital,
+        'run_config': run_config,
+        'tags': tags,
+    }
+
+
+def run_sweep(jobs, ticker, start_date, end_date, interval="day",
+              processes=None, backtester_class=BacktesterWithSlippage,
+              store=None, run_kwargs=None, verbose=True):
+    """
+    스윕 실행 (제너레이터, 끝나는 순서대로 (job, result) 반환)
+
+    캔들은 시작 전에 부모 프로세스에서 한 번 받아 저장소에 두고,
+    워커들은 저장소를 오프라인으로 읽는다.
+
+    Args:
+        jobs: make_job 목록
+        ticker, start_date, end_date, interval: 백테스트 구간
+        processes: 워커 개수 (기본값: CPU 개수)
+        backtester_class: BacktesterWithSlippage 또는 Backtester
+        store: 캔들 저장소 (기본값: CandleStore())
+        run_kwargs: backtester.run 추가 인자 (예: Backtester면 {'verbose': False})
+        verbose: 진행률/처리량 출력
+    """
+    jobs = list(jobs)
+    market = (ticker, start_date, end_date, interval)
+    store = store or CandleStore()
+    processes = processes or os.cpu_count() or 1
+    run_kwargs = run_kwargs or {}
+
+    # 캔들 미리 받기 (워커는 네트워크 사용 안 함)
+    store.get_ohlcv(ticker, interval=interval, to=end_date,
+                    count=candle_count(interval, start_date, end_date))
+
+    started = time.time()
+    done = 0
+
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                             initargs=(store.root,)) as executor:
+        futures = [executor.submit(_run_job, job, market, backtester_class, run_kwargs) for job in jobs]
+
+        for future in as_completed(futures):
+            done += 1
+            if verbose and (done % 10 == 0 or done == len(jobs)):
+                elapsed = time.time() - started
+                print(f"진행: {done}/{len(jobs)} ({done / elapsed:.1f}회/초)", end='\r')
+
+            yield future.result()
+
+    if verbose:
+        elapsed = time.time() - started
+        print()
+        print(f"⚡ {len(jobs)}개 조합 {elapsed:.1f}초 "
+              f"({len(jobs) / elapsed if elapsed else 0:.1f}회/초, 프로세스 {processes}개)")
+
+
+def sweep_indicator_periods(df, strategy_class, params, rsi_periods=None, macd_triples=None,
+                            run_config=None, initial_balance=1000000):
+    """
+    지표 기간 스윕 (RSI 기간 × MACD (fast, slow, signal) 조합)
+
+    조합별 지표는 batch_indicators로 한 번에 계산하고, 공통 지표 배열의
+    rsi/macd 컬럼만 바꿔 끼우며 배열 엔진으로 점수를 매긴다
+    (조합마다 ta 호출, DataFrame 생성/연산 없음).
+
+    Args:
+        df: 캔들 DataFrame (기간 필터링, 소문자 컬럼)
+        strategy_class: 전략 클래스
+        params: 기본 전략 파라미터 (스윕하지 않는 값)
+        rsi_periods: RSI 기간 목록 (기본값: params의 rsi_period)
+        macd_triples: (fast, slow, signal) 목록 (기본값: params의 MACD 설정)
+        run_config: RunConfig (기본값: config 모듈 설정)
+        initial_balance: 초기 자본금
+
+    Returns:
+        조합별 결과 딕셔너리 목록 (rsi_period, macd, final_balance, return_ratio, trades, win_rate)
+    """
+    from batch_indicators import rsi_batch, macd_batch
+    from backtest_engine import run_backtest_arrays, RunConfig, BUY
+
+    run_config = run_config or RunConfig.from_config()
+    rsi_periods = list(rsi_periods or [params.get('rsi_period', 14)])
+    macd_triples = [tuple(t) for t in macd_triples or [(
+        params.get('macd_fast', 12), params.get('macd_slow', 26), params.get('macd_signal', 9)
+    )]]
+
+    strategy = strategy_class(params)
+    indicator_frame = strategy.calculate_indicators(df.copy())
+
+    # 신호 계산은 {컬럼: 배열} 딕셔너리로 (조합마다 pandas 연산 없음)
+    frame = {column: indicator_frame[column].to_numpy(dtype=float) for column in indicator_frame.columns}
+    close = frame['close']
+
+    # 조합 × 봉 2차원 배열 (종가 한 번 순회)
+    rsi = rsi_batch(close, rsi_periods) if 'rsi' in frame else None
+    macd = macd_batch(close, macd_triples) if 'macd' in frame else None
+
+    results = []
+    for i, rsi_period in enumerate(rsi_periods):
+        for j, triple in enumerate(macd_triples):
+            if rsi is not None:
+                frame['rsi'] = rsi[i]
+            if macd is not None:
+                for column, values in zip(('macd', 'macd_signal', 'macd_diff'), macd):
+                    if column in frame:
+                        frame[column] = values[j]
+
+            strategy.params = dict(params, rsi_period=rsi_period, macd_fast=triple[0],
+                                   macd_slow=triple[1], macd_signal=triple[2])
+            result = run_backtest_arrays(
+                close,
+                strategy.generate_signals(frame),
+                stop_loss=run_config.stop_loss,
+                take_profit=run_config.take_profit,
+                invest_ratio=run_config.invest_ratio,
+                initial_balance=initial_balance
+            )
+
+            trades = result['trades']
+            sells = trades[trades['type'] != BUY]
+            results.append({
+                'rsi_period': rsi_period,
+                'macd': triple,
+                'final_balance': result['final_balance'],
+                'return_ratio': (result['final_balance'] / initial_balance - 1) * 100,
+                'trades': int((trades['type'] == BUY).sum()),
+                'win_rate': (sells['profit'] > 0).mean() * 100 if len(sells) else 0,
+            })
+
+    return results
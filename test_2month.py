@@ -1,7 +1,11 @@
 from strategies import Strategy1_MeanReversion
 from backtest import Backtester
+from candle_store import CandleStore
 import config
 
+# 캔들은 로컬 저장소에서 재사용 (새 캔들만 다운로드)
+store = CandleStore()
+
 print("=" * 60)
 print("📅 최근 2개월 RSI 최적화")
 print("=" * 60)
@@ -11,7 +15,7 @@ for rsi in [20, 25, 30, 35, 40, 45, 50]:
     params = config.STRATEGY_PARAMS.copy()
     params['rsi_oversold'] = rsi
     strategy = Strategy1_MeanReversion(params)
-    backtester = Backtester(strategy, initial_balance=1000000)
+    backtester = Backtester(strategy, initial_balance=1000000, data_source=store)
     
     result = backtester.run("KRW-BTC", "20251217", "20260217", "day")
     
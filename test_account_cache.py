@@ -0,0 +1,74 @@
+"""
+계좌 스냅샷 캐시 검증
+잔고는 get_balances 1번으로 모든 통화를 받아 두고, 주문 직전에는 잔고를 조회하지 않으며,
+체결 직후와 max_age가 지나면 갱신되는지 로컬 모의 거래소로 확인 (네트워크 없이 테스트)
+"""
+import time
+import config
+from account_cache import AccountCache
+from mock_exchange import MockExchange
+from upbit_client import UpbitClient
+from sample_data import make_candles
+
+ACCESS_KEY = "mock-access"
+SECRET_KEY = "mock-secret-key-for-local-exchange-0000"
+
+print("=" * 60)
+print("🔬 계좌 스냅샷 캐시")
+print("=" * 60)
+
+candles = make_candles(n=400, seed=3, start='2023-01-01 09:00')
+exchange = MockExchange(candles, interval="day", access_key=ACCESS_KEY, secret_key=SECRET_KEY,
+                        balances={'KRW': 5_000_000, 'ETH': 2.5, 'XRP': 1000})
+client = UpbitClient(ACCESS_KEY, SECRET_KEY, base_url=exchange.start(), rate=None)
+
+# 1) 통화 여러 개 → 요청 1번, max_age 안에서는 캐시
+now = [0.0]
+account = AccountCache(client, max_age=30, clock=lambda: now[0])
+assert account.get_balance("KRW") == 5_000_000 and account.get_balance("KRW-ETH") == 2.5
+assert account.get_balance("XRP") == 1000 and account.get_balance("DOGE") == 0
+assert exchange.requests['/v1/accounts'] == 1
+now[0] = 29
+account.get_balance("KRW")
+assert exchange.requests['/v1/accounts'] == 1
+now[0] = 30
+account.get_balance("KRW")
+assert exchange.requests['/v1/accounts'] == 2
+print("✅ 잔고 4개 조회 → 요청 1번, 30초 지나면 1번 갱신")
+
+# 2) 백그라운드 주기 갱신
+account = AccountCache(client, max_age=0.1).start()
+time.sleep(0.3)
+account.stop()
+assert account.refreshes >= 3, account.refreshes
+print(f"✅ 백그라운드 갱신 ({account.refreshes}회 / 0.3초)")
+
+# 3) TradingBot: 주문 직전 잔고 조회 없음, 체결 직후 갱신
+from bot import TradingBot
+
+config.TRADING_MODE = 'real'
+bot = TradingBot(ACCESS_KEY, SECRET_KEY, client=client, take_profit_order=False)
+bot.send_telegram = lambda message: None
+bot.account.refresh()
+
+before_order = []
+for name in ('buy_market_order', 'sell_market_order'):
+    place = getattr(client, name)
+    client.__dict__[name] = lambda *args, place=place: before_order.append(exchange.requests['/v1/accounts']) or place(*args)
+
+exchange.requests.clear()
+order = bot.buy("KRW-BTC", ratio=0.5)
+assert order and bot.orders.wait(order['uuid'])
+assert before_order == [0] and exchange.requests['/v1/accounts'] == 1    # 체결 확인 후 1번
+assert bot.get_balance("BTC") > 0 and bot.get_balance("KRW") < 5_000_000 * 0.51
+assert exchange.requests['/v1/accounts'] == 1
+
+assert bot.sell("KRW-BTC")
+assert before_order == [0, 1] and exchange.requests['/v1/accounts'] == 2
+assert bot.get_balance("BTC") == 0
+print("✅ 매수/매도: 주문 전 잔고 요청 0번, 체결 후 갱신 1번씩")
+
+client.close()
+exchange.stop()
+config.TRADING_MODE = 'test'
+print("\n✅ 전체 통과")
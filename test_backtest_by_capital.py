@@ -0,0 +1,118 @@
+"""
+자본 규모별 백테스트 검증
+run_capitals(봉 순회 한 번, 자본 축 배열)가 자본마다 따로 돌린 BacktesterWithSlippage.run 및
+예전 자본 1개 행 순회와 같은 거래/최종 자산을 내는지 확인 (네트워크 없이 테스트)
+"""
+import numpy as np
+from strategies import STRATEGIES
+from backtest_by_capital import BacktesterWithSlippage, calculate_slippage
+from backtest_engine import RunConfig
+from sample_data import make_candles
+import config
+
+CAPITALS = [300_000, 1_000_000, 3_000_000, 5_000_000, 8_000_000, 10_000_000, 25_000_000]
+
+
+class LocalSource:
+    """
+    pyupbit.get_ohlcv 대신 미리 만든 캔들을 돌려주는 데이터 소스
+    """
+
+    def __init__(self, candles):
+        self.candles = candles
+
+    def get_ohlcv(self, ticker, interval="day", to=None, count=200):
+        return self.candles.copy()
+
+
+def row_loop(strategy, df, capital, run_config):
+    """
+    예전 BacktesterWithSlippage.run의 자본 1개 행 순회 (비교 기준)
+
+    Returns:
+        (거래 목록 [(날짜, 종류, 체결가, 수량, 현금)], 최종 자산)
+    """
+    df = strategy.calculate_indicators(df.copy())
+    signals = strategy.generate_signals(df)
+    balance, position, entry_price, trades = capital, None, 0, []
+
+    for i in range(30, len(df)):
+        price = df['close'].iloc[i]
+        if signals[i] == 'buy' and position is None:
+            invest_amount = balance * run_config.invest_ratio
+            entry_price = price * (1 + calculate_slippage(invest_amount))
+            position = invest_amount / entry_price
+            balance -= invest_amount
+            trades.append((df.index[i], 'buy', entry_price, position, balance))
+
+        if position is not None:
+            ratio = (price - entry_price) / entry_price
+            if run_config.stop_loss > 0 and ratio <= -run_config.stop_loss:
+                kind = 'stop_loss'
+            elif ratio >= run_config.take_profit:
+                kind = 'take_profit'
+            else:
+                continue
+            actual_price = price * (1 - calculate_slippage(position * price))
+            balance += position * actual_price
+            trades.append((df.index[i], kind, actual_price, position, balance))
+            position = None
+
+    if position is not None:
+        balance += position * df['close'].iloc[-1]
+    return trades, balance
+
+
+print("=" * 60)
+print("🔬 자본 규모별 백테스트 (봉 순회 한 번)")
+print("=" * 60)
+
+# 1) 슬리피지 배열 버전 == 금액 1개 버전 (구간 경계 포함)
+amounts = [0, 999_999, 1_000_000, 3_000_000, 4_999_999, 5_000_000, 7_500_000, 10_000_000, 40_000_000]
+backtester = BacktesterWithSlippage(None)
+assert np.allclose(backtester.calculate_slippage_array(amounts), [calculate_slippage(a) for a in amounts])
+print("✅ 슬리피지 배열 계산 = 금액별 계산")
+
+# 2) run_capitals == 자본마다 run / 예전 행 순회
+checked = 0
+for seed in [2, 11]:
+    candles = make_candles(n=700, seed=seed, start='2023-01-01 09:00')
+    source = LocalSource(candles)
+    for strategy_num in [1, 3, 5, 9]:
+        for run_config in [RunConfig.for_strategy(strategy_num), RunConfig(0.9, 0.02, 0.04)]:
+            strategy = STRATEGIES[strategy_num](config.STRATEGY_PARAMS)
+            results = BacktesterWithSlippage(strategy, data_source=source, run_config=run_config).run_capitals(
+                "KRW-BTC", "20230101", "20241231", CAPITALS)
+            assert [r['initial_balance'] for r in results] == CAPITALS
+
+            for capital, result in zip(CAPITALS, results):
+                single = BacktesterWithSlippage(strategy, initial_balance=capital, data_source=source,
+                                                run_config=run_config)
+                expected = single.run("KRW-BTC", "20230101", "20241231")
+                assert abs(result['final_balance'] - expected['final_balance']) < 1e-6
+                assert [(t['date'], t['type']) for t in result['trades']] == \
+                       [(t['date'], t['type']) for t in expected['trades']]
+                assert single.balance == expected['cash'] and single.trades == expected['trades']
+                assert result['win_rate'] == expected['win_rate']
+
+                trades, final_balance = row_loop(strategy, candles.loc["20230101":"20241231"], capital, run_config)
+                assert [(t['date'], t['type']) for t in result['trades']] == [t[:2] for t in trades]
+                if trades:
+                    assert np.allclose([(t['actual_price'], t['quantity'], t['balance']) for t in result['trades']],
+                                       [t[2:] for t in trades])
+                assert abs(result['final_balance'] - final_balance) < 1e-6
+                checked += 1
+
+print(f"✅ 자본 {len(CAPITALS)}개 × 전략 4개 × 시드 2개 × 손익 설정 2개 = {checked}건 일치")
+
+# 3) 데이터가 없으면 None
+class EmptySource:
+    def get_ohlcv(self, *args, **kwargs):
+        return None
+
+
+assert BacktesterWithSlippage(strategy, data_source=EmptySource()).run_capitals(
+    "KRW-BTC", "20230101", "20241231", CAPITALS) is None
+print("✅ 데이터 없음 → None")
+
+print("\n✅ 전체 통과")
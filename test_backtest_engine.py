@@ -0,0 +1,106 @@
+"""
+배열 백테스트 엔진 검증
+run_backtest_arrays / Backtester.run_frame 결과(거래, 최종 자산)가 예전 행 순회 백테스트와 같은지
+여러 전략/시드/손익 설정으로 확인하고, 분봉 1년치(50만 봉) 실행 시간을 잰다 (네트워크 없이 테스트)
+"""
+import time
+import random
+import numpy as np
+from strategies import STRATEGIES
+from backtest import Backtester
+from backtest_engine import RunConfig, run_backtest_arrays, TRADE_TYPES
+from sample_data import make_candles
+import config
+
+
+def row_loop(close, signals, run_config, initial_balance, start=30):
+    """
+    예전 Backtester.run의 행 순회 매매 (비교 기준)
+
+    Returns:
+        (거래 목록 [(봉 위치, 종류, 가격, 수량, 현금)], 최종 자산)
+    """
+    trades = []
+    balance = initial_balance
+    position = None
+    entry_price = 0
+
+    for i in range(start, len(close)):
+        signal = signals[i]
+        price = close[i]
+
+        if signal == 'buy' and position is None:
+            invest_amount = balance * run_config.invest_ratio
+            position = invest_amount / price
+            entry_price = price
+            balance -= invest_amount
+            trades.append((i, 'buy', price, position, balance))
+        elif signal == 'sell' and position is not None:
+            balance += position * price
+            trades.append((i, 'sell', price, position, balance))
+            position = None
+
+        if position is not None:
+            ratio = (price - entry_price) / entry_price
+            if run_config.stop_loss > 0 and ratio <= -run_config.stop_loss:
+                balance += position * price
+                trades.append((i, 'stop_loss', price, position, balance))
+                position = None
+            elif ratio >= run_config.take_profit:
+                balance += position * price
+                trades.append((i, 'take_profit', price, position, balance))
+                position = None
+
+    if position is not None:
+        balance += position * close[-1]
+    return trades, balance
+
+
+print("=" * 60)
+print("🔬 배열 백테스트 엔진 (행 순회와 비교)")
+print("=" * 60)
+
+checked = 0
+for seed in [1, 7, 42]:
+    candles = make_candles(n=600, seed=seed)
+    for strategy_num in [1, 2, 3, 5, 7, 9]:
+        for run_config in [RunConfig.for_strategy(strategy_num), RunConfig(0.5, 0, 0.03)]:
+            strategy = STRATEGIES[strategy_num](config.STRATEGY_PARAMS)
+            df = strategy.calculate_indicators(candles.copy())
+            random.seed(seed)
+            signals = strategy.generate_signals(df)
+            close = df['close'].to_numpy()
+            expected, expected_balance = row_loop(close, signals, run_config, 1_000_000)
+
+            # 엔진 직접 호출
+            result = run_backtest_arrays(close, signals, run_config.stop_loss, run_config.take_profit,
+                                         run_config.invest_ratio, initial_balance=1_000_000)
+            trades = [(int(t['index']), TRADE_TYPES[t['type']], t['price'], t['quantity'], t['balance'])
+                      for t in result['trades']]
+            assert [t[:2] for t in trades] == [t[:2] for t in expected], (strategy_num, seed)
+            assert np.allclose([t[2:] for t in trades], [t[2:] for t in expected]) if trades else not expected
+            assert abs(result['final_balance'] - expected_balance) < 1e-6
+
+            # Backtester.run_frame (같은 신호가 나오도록 시드 고정)
+            random.seed(seed)
+            backtest = Backtester(strategy, initial_balance=1_000_000, run_config=run_config).run_frame(df, verbose=False)
+            assert [(df.index.get_loc(t['date']), t['type']) for t in backtest['trades']] == [t[:2] for t in expected]
+            assert abs(backtest['final_balance'] - expected_balance) < 1e-6
+            checked += 1
+
+print(f"✅ 전략 6개 × 시드 3개 × 손익 설정 2개 = {checked}개 구간 거래/최종 자산 일치")
+
+# 분봉 1년치 (약 52.5만 봉)
+n = 525_600
+rng = np.random.default_rng(0)
+close = 50_000_000 * np.cumprod(1 + rng.normal(0, 0.001, n))
+codes = rng.choice([1, -1, 0], size=n, p=[0.01, 0.01, 0.98]).astype(np.int8)
+
+started = time.perf_counter()
+result = run_backtest_arrays(close, codes, 0.015, 0.07, 0.1)
+elapsed = time.perf_counter() - started
+assert len(result['equity']) == n and len(result['trades']) > 100
+assert elapsed < 2.0, elapsed
+print(f"✅ {n:,}봉 {elapsed:.2f}초 (거래 {len(result['trades']):,}회)")
+
+print("\n✅ 전체 통과")
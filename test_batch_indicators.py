@@ -0,0 +1,50 @@
+"""
+다중 기간 지표 검증
+rsi_batch / macd_batch 결과가 기간별 ta 계산과 허용 오차 내에서 같은지 확인
+(네트워크 없이 합성 캔들로 테스트)
+"""
+import numpy as np
+from batch_indicators import rsi_batch, macd_batch
+from indicators import compute_rsi, compute_macd
+from sample_data import make_candles
+
+RTOL = 1e-9  # 종가 대비 허용 오차
+
+print("=" * 60)
+print("🔬 다중 기간 지표 vs ta")
+print("=" * 60)
+
+failed = []
+
+rsi_periods = [2, 7, 14, 21, 50]
+macd_triples = [(12, 26, 9), (8, 21, 5), (5, 35, 9), (26, 12, 9)]
+
+
+def check(name, expected, actual, tolerance):
+    expected = expected.to_numpy()
+    same_nan = (np.isnan(expected) == np.isnan(actual)).all()
+    valid = ~np.isnan(expected)
+    if not same_nan or (np.abs(actual[valid] - expected[valid]) > tolerance).any():
+        failed.append(name)
+
+
+for n in [10, 60, 3000]:
+    close = make_candles(n=n, seed=n)['close']
+    tolerance = close.mean() * RTOL
+
+    rsi = rsi_batch(close.to_numpy(), rsi_periods)
+    for row, period in enumerate(rsi_periods):
+        check(f"n={n} RSI {period}", compute_rsi(close, period)[0], rsi[row], 1e-9)
+
+    macd = macd_batch(close.to_numpy(), macd_triples)
+    for row, triple in enumerate(macd_triples):
+        for column, expected, actual in zip(('macd', 'signal', 'diff'), compute_macd(close, *triple), macd):
+            check(f"n={n} MACD {triple} {column}", expected, actual[row], tolerance)
+
+    print(f"n={n}: {'✅' if not failed else '❌'}")
+
+for name in failed:
+    print(f"❌ {name} 불일치")
+
+assert not failed, "다중 기간 지표 불일치"
+print("\n✅ RSI/MACD 모든 기간 일치")
@@ -0,0 +1,83 @@
+"""
+캔들 경계 스케줄러 검증
+주기별 봉 시작/마감 시각이 업비트 기준(UTC 경계, 일봉 09:00 KST, 주봉 월요일)과 같은지,
+마감 직후에만 신호 판단이 한 번씩 돌아오는지 확인
+"""
+import pandas as pd
+from candle_clock import INTERVAL_SECONDS, CandleScheduler, candle_start, next_candle_close, to_kst
+
+
+def utc(text):
+    return pd.Timestamp(text, tz='UTC').timestamp()
+
+
+print("=" * 60)
+print("🔬 캔들 경계 스케줄러")
+print("=" * 60)
+
+now = utc('2024-03-06 13:47:31')   # 수요일 22:47:31 KST
+
+# 1) 주기별 봉 시작 (KST)
+expected = {
+    'minute1': '2024-03-06 22:47',
+    'minute3': '2024-03-06 22:45',
+    'minute5': '2024-03-06 22:45',
+    'minute10': '2024-03-06 22:40',
+    'minute15': '2024-03-06 22:45',
+    'minute30': '2024-03-06 22:30',
+    'minute60': '2024-03-06 22:00',
+    'minute240': '2024-03-06 21:00',     # 09, 13, 17, 21시 KST
+    'day': '2024-03-06 09:00',
+    'week': '2024-03-04 09:00',          # 월요일 09:00 KST
+    'month': '2024-03-01 09:00',
+}
+for interval, start in expected.items():
+    assert to_kst(candle_start(interval, now)) == pd.Timestamp(start), interval
+    close = next_candle_close(interval, now)
+    assert close > now and candle_start(interval, close) == close, interval
+    if interval in INTERVAL_SECONDS:
+        assert close - candle_start(interval, now) == INTERVAL_SECONDS[interval], interval
+assert to_kst(next_candle_close('month', utc('2024-12-15'))) == pd.Timestamp('2025-01-01 09:00')
+print(f"✅ {len(expected)}개 주기 봉 경계")
+
+# 2) 일봉: 마감 직후 1번만 판단, 그 사이는 check_sec마다 현재가 확인
+clock = [utc('2024-03-06 23:59:00')]
+scheduler = CandleScheduler('day', offset=2, check_sec=60, clock=lambda: clock[0])
+
+assert scheduler.due()                                  # 시작 직후 1번
+assert scheduler.closed_before() == pd.Timestamp('2024-03-06 09:00')
+scheduler.mark()
+assert not scheduler.due()
+assert scheduler.sleep_time() == 60
+
+evaluations = 0
+checks = 0
+while clock[0] < utc('2024-03-09 00:00:00'):           # 약 2일
+    if scheduler.due():
+        assert clock[0] - candle_start('day', clock[0]) == 2   # 마감 + 2초
+        evaluations += 1
+        scheduler.mark()
+    else:
+        checks += 1
+    clock[0] += scheduler.sleep_time()
+
+assert evaluations == 2, evaluations
+assert checks > 2000
+print(f"✅ 일봉 2일: 신호 판단 {evaluations}번, 현재가 확인 {checks}번")
+
+# 3) 분봉: offset 전에는 직전 봉 기준
+scheduler = CandleScheduler('minute5', offset=3, check_sec=60, clock=lambda: clock[0])
+clock[0] = utc('2024-03-06 00:05:01')
+assert scheduler.closed_before() == pd.Timestamp('2024-03-06 09:00')      # 아직 00:05 봉 확정 전
+assert scheduler.sleep_time() == 2
+clock[0] += 2
+assert scheduler.closed_before() == pd.Timestamp('2024-03-06 09:05')
+print("✅ 분봉 마감 offset")
+
+try:
+    CandleScheduler('minute7')
+    raise AssertionError("지원하지 않는 주기 허용")
+except ValueError:
+    pass
+
+print("\n✅ 전체 통과")
@@ -0,0 +1,72 @@
+"""
+캔들 저장소 시간대 검증
+서버 시간대가 UTC여도 KST 캔들 인덱스 기준으로 빠진 캔들 개수/받은 구간을 계산해
+오래된 분봉 저장소를 빈틈없이 최신화하는지, 백필 기본 끝 시각이 KST 현재인지 확인 (네트워크 없이 테스트)
+"""
+import os
+import time
+
+os.environ['TZ'] = 'UTC'    # 클라우드 서버 기본값 (KST보다 9시간 느림)
+time.tzset()
+
+import tempfile
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from candle_clock import to_kst
+from candle_store import CandleStore
+from backfill import Backfiller
+
+print("=" * 60)
+print("🔬 캔들 저장소 시간대 (TZ=UTC)")
+print("=" * 60)
+
+
+class LocalSource:
+    """
+    pyupbit.get_ohlcv 대신 KST 현재 분까지의 분봉을 돌려주는 원본 (요청 개수 기록)
+    """
+
+    def __init__(self, candles):
+        self.candles = candles
+        self.counts = []
+
+    def get_ohlcv(self, ticker, interval="minute1", count=200, to=None):
+        self.counts.append(count)
+        window = self.candles if to is None else self.candles[self.candles.index < pd.Timestamp(to)]
+        return window.tail(count).copy()
+
+
+now = to_kst(time.time()).floor('min')
+index = pd.date_range(end=now, periods=24 * 60, freq='min')
+close = 50_000_000 + np.arange(len(index), dtype=float)
+candles = pd.DataFrame({'open': close, 'high': close, 'low': close, 'close': close,
+                        'volume': 1.0, 'value': close}, index=index)
+assert abs((datetime.now() - now).total_seconds() - (-9 * 3600)) < 120   # 로컬 시각은 KST보다 9시간 전
+
+# 1) 12시간 묵은 분봉 저장소 → 빠진 720개 + 2개를 한 번에 받음
+source = LocalSource(candles)
+store = CandleStore(tempfile.mkdtemp(), source=source)
+stale = candles[candles.index <= now - pd.Timedelta(hours=12)]
+store.merge("KRW-BTC", "minute1", stale)
+
+df = store.get_ohlcv("KRW-BTC", "minute1", count=200)
+assert source.counts[0] >= 12 * 60 + 1, source.counts
+stored = store.load("KRW-BTC", "minute1")
+assert stored.index[-1] == now and (np.diff(stored.index.values) == np.timedelta64(60, 's')).all()
+assert len(df) == 200 and df.index[-1] == now
+print(f"✅ 12시간 묵은 분봉 → {source.counts[0]}개 요청, 빈틈 없음")
+
+# 2) 받은 구간 기록도 KST 현재까지 (빈 구간을 받은 것으로 기록하지 않음)
+assert store.covers("KRW-BTC", "minute1", stale.index[-1], now)
+assert not store.covers("KRW-BTC", "minute1", now, now + pd.Timedelta(hours=9))
+print("✅ 받은 구간 = 마지막 저장 캔들 ~ KST 현재")
+
+# 3) 백필 기본 끝 시각 = KST 현재 (9시간 전 UTC 시각이 아님)
+source = LocalSource(candles)
+store = CandleStore(tempfile.mkdtemp(), source=source)
+filled = Backfiller(store, workers=1, source=source).fill("KRW-BTC", "minute1", now - pd.Timedelta(hours=2))
+assert filled.index[-1] == now and len(filled) == 2 * 60 + 1
+print(f"✅ 백필 끝 시각 = KST 현재 ({len(filled)}개)")
+
+print("\n✅ 전체 통과")
@@ -0,0 +1,101 @@
+"""
+캔들 링 버퍼 검증
+한 번 채운 뒤 새 봉만 이어 붙여도 매번 전체를 받은 결과와 같은지,
+진행 중인 봉이 제자리에서 갱신되는지, TradingBot이 새 봉만 요청하는지 확인
+"""
+import time
+import asyncio
+import numpy as np
+import pandas as pd
+from candle_window import CandleWindow
+from candle_clock import to_kst
+from sample_data import make_candles
+
+print("=" * 60)
+print("🔬 캔들 링 버퍼")
+print("=" * 60)
+
+CANDLES = make_candles(n=1000, seed=11, start='2024-01-01 09:00', freq='min')
+CAPACITY = 120
+
+
+def forming(i, fraction):
+    """
+    i번째 봉이 진행 중일 때의 모습 (종가/고가/거래량 일부만)
+    """
+    row = CANDLES.iloc[i].copy()
+    row['close'] = row['open'] + (row['close'] - row['open']) * fraction
+    row['volume'] *= fraction
+    return row
+
+
+# 1) 새 봉만 이어 붙이기 = 매번 전체 조회
+window = CandleWindow(CAPACITY)
+window.seed(CANDLES.iloc[:200])
+assert len(window) == CAPACITY and window.last_time == CANDLES.index[199]
+
+for end in range(201, 1000, 3):
+    assert window.update(CANDLES.iloc[end - 4:end])     # 마지막 저장 봉과 겹치게
+    expected = CANDLES.iloc[end - CAPACITY:end]
+    df = window.frame()
+    assert (df.index == expected.index).all()
+    assert np.array_equal(df.to_numpy(), expected.to_numpy())
+print("✅ 새 봉 추가 (버퍼 여러 바퀴) = 전체 조회 결과")
+
+# 2) 진행 중인 봉은 제자리 갱신
+last = len(CANDLES) - 1
+window.seed(CANDLES.iloc[:last])
+partial = CANDLES.iloc[:last + 1].copy()
+partial.iloc[-1] = forming(last, 0.3)
+assert window.update(partial.tail(2))
+assert len(window) == CAPACITY and window.frame()['close'].iloc[-1] == partial['close'].iloc[-1]
+assert window.update(CANDLES.tail(2))
+df = window.frame()
+assert df.index[-1] == CANDLES.index[-1] and np.array_equal(df.iloc[-1].to_numpy(), CANDLES.iloc[-1].to_numpy())
+assert df.index.is_unique
+print("✅ 진행 중인 봉 제자리 갱신")
+
+# 3) 사이가 비면 False (다시 채워야 함)
+window.seed(CANDLES.iloc[:300])
+assert not window.update(CANDLES.iloc[301:303])
+assert window.fetch_count('minute1', CANDLES.index[305]) == 8      # 299~305번 봉 + 여유 1
+assert window.fetch_count('minute1', CANDLES.index[299] + pd.Timedelta(days=30)) == CAPACITY
+print("✅ 빈 구간 감지 / 요청 개수")
+
+# 4) TradingBot: 처음만 전체, 이후엔 마지막 봉부터만
+from bot import TradingBot
+from paper_trading import PaperTrader
+
+now = to_kst(time.time()).floor('min')
+live = make_candles(n=300, seed=12, start=now - pd.Timedelta(minutes=299), freq='min')
+requests = []
+
+
+class Aio:
+    async def get_ohlcv(self, ticker, interval="day", count=200, to=None):
+        requests.append(count)
+        return live.tail(count).copy()
+
+    async def get_current_price(self, ticker):
+        return float(live['close'].iloc[-1])
+
+
+class LocalClient:
+    aio = Aio()
+
+    def gather(self, *coros):
+        async def run_all():
+            return await asyncio.gather(*coros)
+        return asyncio.run(run_all())
+
+
+bot = TradingBot(client=LocalClient(), paper=PaperTrader(lambda ticker: 0, ledger_path=None))
+for _ in range(3):
+    df, price = bot.get_window_snapshot("KRW-BTC", "minute1")
+    assert (df.index == live.index[-bot.candle_count:]).all()
+    assert np.array_equal(df.to_numpy(), live.tail(bot.candle_count).to_numpy())
+
+assert requests[0] == bot.candle_count and max(requests[1:]) <= 3, requests
+print(f"✅ TradingBot 요청 캔들 수: {requests}")
+
+print("\n✅ 전체 통과")
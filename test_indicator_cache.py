@@ -0,0 +1,132 @@
+"""
+지표 캐시 검증
+파라미터 스윕에서의 캐시 적중/미스, LRU 제거, INDICATOR_CACHE_DIR 디스크 계층 왕복, 메모리/디스크 크기 상한,
+IndicatorPipeline.build 결과가 캐시 없는 calculate_indicators(ta)와 같은지 확인 (네트워크 없이 테스트)
+"""
+import os
+import sys
+import tempfile
+import subprocess
+import numpy as np
+from indicators import IndicatorCache, IndicatorPipeline, cached_indicator, fingerprint, ALL_COLUMNS
+from strategies import STRATEGIES
+from strategy import Strategy
+from sample_data import make_candles
+import config
+
+print("=" * 60)
+print("🔬 지표 캐시 (LRU + 디스크)")
+print("=" * 60)
+
+candles = make_candles(n=500, seed=4)
+close = candles['close']
+
+# 1) 지문: 값이 같으면 같고, 하나라도 다르면 다름
+changed = close.copy()
+changed.iloc[-1] += 1
+assert fingerprint(close) == fingerprint(close.copy()) == fingerprint(close.to_numpy())
+assert fingerprint(close) != fingerprint(changed) and fingerprint(close) != fingerprint(close[:-1])
+print("✅ 종가 지문")
+
+# 2) 파라미터 스윕: RSI 기준값/손익만 바꾸면 지표는 처음 한 번만 계산
+cache = IndicatorCache()
+for oversold in [25, 30, 35, 40]:
+    params = dict(config.STRATEGY_PARAMS, rsi_oversold=oversold)
+    IndicatorPipeline(params, cache).build(candles.copy())
+groups = len({source[:2] for source in IndicatorPipeline(config.STRATEGY_PARAMS).sources.values()})
+assert cache.misses == groups and cache.hits == 3 * groups, (cache.hits, cache.misses)
+
+# RSI 기간을 바꾸면 RSI만 새로 계산
+IndicatorPipeline(dict(config.STRATEGY_PARAMS, rsi_period=21), cache).build(candles.copy())
+assert cache.misses == groups + 1 and cache.hits == 4 * groups - 1
+print(f"✅ 스윕 5회: 미스 {cache.misses}개, 적중 {cache.hits}개")
+
+# 3) 반환값은 복사본 (수정해도 캐시는 그대로)
+rsi, = cached_indicator('rsi', close, (14,), cache=cache)
+rsi[:] = 0
+again, = cached_indicator('rsi', close, (14,), cache=cache)
+assert np.nanmax(again) > 0
+print("✅ 캐시 값은 읽기 전용, 호출마다 복사본")
+
+# 4) LRU 제거: 가장 오래 안 쓴 항목부터
+cache = IndicatorCache(maxsize=2)
+for window in [5, 20]:
+    cached_indicator('ma', close, (window,), cache=cache)
+cached_indicator('ma', close, (5,), cache=cache)        # 5를 최근으로
+cached_indicator('ma', close, (60,), cache=cache)       # 20 제거
+assert len(cache._entries) == 2
+assert cache.get((fingerprint(close), 'ma', (20,))) is None
+assert cache.get((fingerprint(close), 'ma', (5,))) is not None
+print("✅ LRU 제거 (maxsize=2)")
+
+# 5) 디스크 계층: 메모리를 비워도 (다른 프로세스여도) 파일에서 읽음
+disk_dir = tempfile.mkdtemp()
+cache = IndicatorCache(disk_dir=disk_dir)
+expected = cached_indicator('macd', close, (12, 26, 9), cache=cache)
+cache.clear()
+loaded = cached_indicator('macd', close, (12, 26, 9), cache=cache)
+assert cache.hits == 1 and cache.misses == 0 and len(os.listdir(disk_dir)) == 1
+for a, b in zip(expected, loaded):
+    assert np.array_equal(a, b, equal_nan=True)
+
+script = (
+    "import indicators, sample_data;"
+    "close = sample_data.make_candles(n=500, seed=4)['close'];"
+    "indicators.cached_indicator('macd', close, (12, 26, 9));"
+    "print(indicators.INDICATOR_CACHE.disk_dir == %r, indicators.INDICATOR_CACHE.hits, indicators.INDICATOR_CACHE.misses)"
+    % disk_dir
+)
+env = dict(os.environ, INDICATOR_CACHE_DIR=disk_dir)
+output = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True, check=True)
+assert output.stdout.split() == ['True', '1', '0'], output.stdout
+print("✅ INDICATOR_CACHE_DIR 디스크 계층 (다른 프로세스에서 적중)")
+
+# 6) 크기 상한: 메모리는 바이트, 디스크는 전체 파일 크기 (수정 시각이 오래된 파일부터 삭제)
+entry_bytes = len(close) * 8
+cache = IndicatorCache(max_bytes=entry_bytes * 3)
+for window in [5, 10, 20, 60]:
+    cached_indicator('ma', close, (window,), cache=cache)
+assert len(cache._entries) == 3 and cache.nbytes == entry_bytes * 3
+assert cache.get((fingerprint(close), 'ma', (5,))) is None
+
+disk_dir = tempfile.mkdtemp()
+file_bytes = entry_bytes + 128     # .npy 헤더
+cache = IndicatorCache(disk_dir=disk_dir, disk_max_bytes=file_bytes * 3)
+closes = [close + i for i in range(5)]      # 새 캔들 데이터마다 파일 1개
+for i, series in enumerate(closes[:3]):
+    cached_indicator('ma', series, (5,), cache=cache)
+    os.utime(cache._disk_path((fingerprint(series), 'ma', (5,))), (1000 + i, 1000 + i))
+cache.clear()
+cached_indicator('ma', closes[0], (5,), cache=cache)      # 디스크 적중 → 최근 사용으로 갱신
+assert cache.hits == 1
+for series in closes[3:]:
+    cached_indicator('ma', series, (5,), cache=cache)
+files = os.listdir(disk_dir)
+assert len(files) == 3 and sum(os.path.getsize(os.path.join(disk_dir, f)) for f in files) <= file_bytes * 3
+kept = {cache._disk_path((fingerprint(series), 'ma', (5,))) for series in (closes[0], closes[3], closes[4])}
+assert {os.path.join(disk_dir, f) for f in files} == kept
+cache.clear()
+assert cached_indicator('ma', closes[1], (5,), cache=cache) and cache.misses == 1      # 지워진 파일은 다시 계산
+print(f"✅ 크기 상한: 메모리 {entry_bytes * 3:,}바이트, 디스크 파일 3개분 (오래 안 쓴 것부터 삭제)")
+
+# 7) IndicatorPipeline.build == 캐시 없는 calculate_indicators (ta)
+for params in [config.STRATEGY_PARAMS, dict(config.STRATEGY_PARAMS, rsi_period=9, macd_fast=8, macd_slow=21)]:
+    expected = Strategy(params).calculate_indicators(candles.copy())
+    expected['ma_120'] = expected['close'].rolling(window=120).mean()
+    built = IndicatorPipeline(params, IndicatorCache()).build(candles.copy())
+    assert list(built.columns) == list(candles.columns) + list(ALL_COLUMNS)
+    for column in ALL_COLUMNS:
+        assert np.allclose(built[column], expected[column], equal_nan=True), column
+
+# 전략은 읽는 지표 컬럼만
+expected = Strategy(config.STRATEGY_PARAMS).calculate_indicators(candles.copy())
+expected['ma_120'] = expected['close'].rolling(window=120).mean()
+for num, strategy_class in STRATEGIES.items():
+    strategy = strategy_class(config.STRATEGY_PARAMS)
+    df = strategy.calculate_indicators(candles.copy())
+    assert set(df.columns) - set(candles.columns) == set(strategy.indicator_columns()), num
+    for column in strategy.indicator_columns():
+        assert np.allclose(df[column], expected[column], equal_nan=True), (num, column)
+print("✅ IndicatorPipeline.build 컬럼/값 = calculate_indicators, 전략은 필요한 컬럼만")
+
+print("\n✅ 전체 통과")
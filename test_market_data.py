@@ -0,0 +1,134 @@
+"""
+시세 공유 데몬 검증
+데몬 하나가 모의 거래소에서 시세를 받고 봇 여러 개가 Unix 소켓으로 구독할 때
+동시 캔들/현재가 요청이 업비트 요청 1번으로 합쳐지는지, 체결가 푸시, 재연결,
+구독 모드 TradingBot이 업비트에 시세를 요청하지 않는지 확인 (네트워크 없이 테스트)
+"""
+import io
+import os
+import time
+import contextlib
+import tempfile
+import threading
+import config
+from mock_exchange import MockExchange
+from upbit_client import AsyncUpbitClient, UpbitClient
+from market_data import MarketDataServer, MarketDataClient, MarketDataError
+from paper_trading import PaperTrader
+from sample_data import make_candles
+
+print("=" * 60)
+print("🔬 시세 공유 데몬 (Unix 소켓)")
+print("=" * 60)
+
+candles = make_candles(n=400, seed=9, start='2023-01-01 09:00')
+exchange = MockExchange(candles, interval="day", balances={'KRW': 1_000_000})
+base_url = exchange.start()
+path = os.path.join(tempfile.mkdtemp(), "market.sock")
+
+
+def start_server():
+    return MarketDataServer(["KRW-BTC"], path=path, client=AsyncUpbitClient(base_url=base_url, rate=None),
+                            use_ticker_feed=False, candle_ttl=5.0, price_ttl=5.0).start()
+
+
+server = start_server()
+BOTS = 10
+clients = [MarketDataClient(path) for _ in range(BOTS)]
+
+# 1) 봇 10개가 동시에 캔들 요청 → 업비트 요청 1번
+exchange.requests.clear()
+results = [None] * BOTS
+
+
+def fetch(i):
+    results[i] = clients[i].get_ohlcv("KRW-BTC", "day", count=120)
+
+
+threads = [threading.Thread(target=fetch, args=(i,)) for i in range(BOTS)]
+for t in threads:
+    t.start()
+for t in threads:
+    t.join()
+direct = UpbitClient(base_url=base_url, rate=None)
+expected = direct.get_ohlcv("KRW-BTC", "day", count=120)
+direct.close()
+assert exchange.requests['/v1/candles/days'] == 2     # 데몬 1번 + 비교용 직접 조회 1번
+for df in results:
+    assert len(df) == 120 and (df.index == expected.index).all()
+    assert (df['close'].to_numpy() == expected['close'].to_numpy()).all()
+print(f"✅ 봇 {BOTS}개 캔들 요청 → 업비트 요청 1번 (데몬 업비트 요청 {server.stats['fetches']}개)")
+
+# 2) 현재가: 동시에 몇 개가 물어도 일괄 조회 1번, TTL 안에서는 재사용
+exchange.requests.clear()
+prices = clients[0].gather(*[c.aio.get_current_price("KRW-BTC") for c in clients[:1]])
+prices += [c.get_current_price("KRW-BTC") for c in clients[1:]]
+assert set(prices) == {exchange.price("KRW-BTC")}
+assert clients[0].get_current_price(["KRW-BTC"]) == {"KRW-BTC": exchange.price("KRW-BTC")}
+assert dict(exchange.requests) == {'/v1/ticker': 1}, exchange.requests
+print("✅ 현재가 11번 → 업비트 요청 1번")
+
+# 3) 오류는 구독자에게 그대로 (없는 티커)
+try:
+    clients[0].get_current_price("KRW-NOPE")
+    assert False
+except MarketDataError as e:
+    assert "404" in str(e)
+assert clients[0].get_ohlcv("KRW-NOPE", "day", count=10) is None
+print("✅ 업비트 오류 전달")
+
+# 4) 체결가 푸시: 구독한 봇에게만
+received = []
+clients[1].subscribe(["KRW-BTC"], on_price=lambda ticker, price: received.append((ticker, price)))
+clients[2].subscribe(["KRW-ETH"], on_price=lambda ticker, price: received.append(('other', price)))
+server.publish("KRW-BTC", 123_000_000.0)
+deadline = time.monotonic() + 2
+while not received and time.monotonic() < deadline:
+    time.sleep(0.01)
+time.sleep(0.05)
+assert received == [("KRW-BTC", 123_000_000.0)], received
+assert clients[1].latest("KRW-BTC") == 123_000_000.0 and clients[0].latest("KRW-BTC") is None
+exchange.requests.clear()
+assert clients[3].get_current_price("KRW-BTC") == 123_000_000.0 and not exchange.requests
+print("✅ 체결가 푸시 (구독 티커만), 현재가 요청도 체결가로 응답")
+
+# 5) 데몬 재시작 → 다음 요청에서 다시 연결하고 구독 복구
+server.stop()
+deadline = time.monotonic() + 2
+while clients[1].aio.connected and time.monotonic() < deadline:
+    time.sleep(0.01)
+assert clients[1].latest("KRW-BTC") is None
+server = start_server()
+assert clients[1].get_current_price("KRW-BTC") == exchange.price("KRW-BTC")
+server.publish("KRW-BTC", 124_000_000.0)
+deadline = time.monotonic() + 2
+while len(received) < 2 and time.monotonic() < deadline:
+    time.sleep(0.01)
+assert received[-1] == ("KRW-BTC", 124_000_000.0)
+print("✅ 데몬 재시작 후 재연결 + 구독 복구")
+
+# 6) 구독 모드 TradingBot: 업비트에 시세를 요청하지 않음 (업비트 클라이언트는 닿지 않는 주소)
+from bot import TradingBot
+
+config.TRADING_MODE = 'test'
+config.SELECTED_STRATEGY = 8
+offline = UpbitClient(base_url="http://127.0.0.1:9/v1", rate=None, retries=0)
+bot = TradingBot(client=offline, market_data=clients[4],
+                 paper=PaperTrader(lambda ticker: bot.get_current_price(ticker), ledger_path=None))
+bot.send_telegram = lambda message: None
+exchange.requests.clear()
+output = io.StringIO()
+with contextlib.redirect_stdout(output):
+    assert bot.evaluate_signal("KRW-BTC", "day") == 'buy' and bot.position == 'long'
+assert bot.candle_count > bot.strategy.lookback() + 1 and "RSI: nan" not in output.getvalue()   # 지표 없는 전략도 RSI 출력
+assert bot.orders.wait(bot.entry_order) and bot.entry_price > 0
+assert exchange.requests.get('/v1/candles/days', 0) <= 1
+print(f"✅ 구독 모드 봇: 데몬 캔들/현재가로 신호 → 모의 매수 @ {bot.entry_price:,.0f}원")
+
+for client in clients:
+    client.close()
+offline.close()
+server.stop()
+exchange.stop()
+assert not os.path.exists(path)
+print("\n✅ 전체 통과")
@@ -0,0 +1,156 @@
+"""
+모의 거래소 검증
+로컬 모의 거래소로 UpbitClient 시세/잔고/주문과 TradingBot 매수→매도를 실제 API 키 없이 확인하고,
+응답 지연을 준 상태에서 봇 루프 처리량과 신호→주문 지연을 잰다 (네트워크 없이 테스트)
+"""
+import time
+import threading
+import numpy as np
+import config
+from mock_exchange import MockExchange
+from upbit_client import UpbitClient, UpbitAPIError
+from sample_data import make_candles
+
+ACCESS_KEY = "mock-access"
+SECRET_KEY = "mock-secret-key-for-local-exchange-0000"
+
+print("=" * 60)
+print("🔬 모의 거래소 (로컬 서버)")
+print("=" * 60)
+
+candles = make_candles(n=600, seed=21, start='2023-01-01 09:00')
+exchange = MockExchange(candles, interval="day", access_key=ACCESS_KEY, secret_key=SECRET_KEY,
+                        balances={'KRW': 10_000_000})
+base_url = exchange.start()
+client = UpbitClient(ACCESS_KEY, SECRET_KEY, base_url=base_url, rate=None)
+
+# 1) 시세: 현재 봉까지만 보임
+df = client.get_ohlcv("KRW-BTC", "day", count=300)
+assert len(df) == 201 and df.index[-1] == exchange.now
+assert client.get_current_price("KRW-BTC") == candles['close'].iloc[200]
+exchange.advance()
+assert client.get_current_price("KRW-BTC") == candles['close'].iloc[201]
+print("✅ 캔들/현재가 재생")
+
+# 2) 시장가 매수: 호가창 체결 (현재가보다 비싸게), 수수료 차감
+price = exchange.price("KRW-BTC")
+order = client.buy_market_order("KRW-BTC", 3_000_000)
+assert order['state'] == 'done' and order['side'] == 'bid'
+detail = client.get_order(order['uuid'])
+volume = sum(float(t['volume']) for t in detail['trades'])
+funds = sum(float(t['funds']) for t in detail['trades'])
+assert abs(funds - 3_000_000) < 1e-3 and funds / volume > price
+assert abs(client.get_balance("KRW") - (10_000_000 - 3_000_000 * 1.0005)) < 1e-3
+assert abs(client.get_balance("BTC") - volume) < 1e-8
+print(f"✅ 시장가 매수 (체결가 {funds / volume:,.0f}원, 현재가 {price:,.0f}원)")
+
+# 3) 잔고 부족 / 최소 주문 금액
+for call, name in [(lambda: client.buy_market_order("KRW-BTC", 100_000_000), 'insufficient_funds_bid'),
+                   (lambda: client.buy_market_order("KRW-BTC", 1000), 'under_min_total_bid'),
+                   (lambda: client.sell_market_order("KRW-BTC", volume * 2), 'insufficient_funds_ask')]:
+    try:
+        call()
+        raise AssertionError(name)
+    except UpbitAPIError as e:
+        assert e.status == 400 and e.name == name, e
+print("✅ 주문 거절 (잔고 부족, 최소 금액)")
+
+# 4) 지정가: 닿을 때까지 대기, 취소하면 잠금 해제
+target = candles['high'].iloc[202:].max() * 0.999
+order = client.sell_limit_order("KRW-BTC", target, volume / 2)
+assert order['state'] == 'wait' and client.get_balance("BTC") < volume
+cancel = client.sell_limit_order("KRW-BTC", target * 10, volume / 2)
+client.cancel_order(cancel['uuid'])
+assert client.get_order(cancel['uuid'])['state'] == 'cancel'
+
+while client.get_order(order['uuid'])['state'] == 'wait':
+    assert exchange.advance()
+assert float(client.get_order(order['uuid'])['trades'][0]['price']) == float(f"{target:.8f}")
+assert abs(client.get_balance("BTC") - volume / 2) < 1e-8
+print("✅ 지정가 대기 → 체결 / 취소")
+
+# 5) TradingBot 실전 모드: 매수 → 손절 체크 → 매도 (API 키 없이 모의 거래소로)
+from bot import TradingBot
+
+config.TRADING_MODE = 'real'
+client.sell_market_order("KRW-BTC", client.get_balance("BTC"))
+bot = TradingBot(ACCESS_KEY, SECRET_KEY, client=client)
+bot.send_telegram = lambda message: None
+
+tickers = exchange.requests['/v1/ticker']
+started = time.perf_counter()
+order = bot.buy("KRW-BTC", ratio=0.5)
+assert order and exchange.requests['/v1/ticker'] == tickers     # 매수 경로에 현재가 요청 없음
+buy_latency = exchange.order_times[order['uuid']] - started
+
+# 체결가는 주문 추적이 백그라운드에서 확인 (매수 호출은 현재가를 다시 조회하지 않음)
+fill = bot.orders.wait(order['uuid'])
+detail = client.get_order(order['uuid'])
+vwap = sum(float(t['funds']) for t in detail['trades']) / sum(float(t['volume']) for t in detail['trades'])
+assert fill and abs(bot.entry_price - vwap) < 1e-6 and bot.volume == float(detail['executed_volume'])
+assert len(detail['trades']) > 1 and fill['fee'] == float(detail['paid_fee'])     # 호가 여러 단계 체결
+# 매수 직후 익절 지정가 매도가 걸려 수량이 잠김
+assert bot.position == 'long' and bot.take_profit_uuid and exchange.locked['BTC'] > 0
+assert exchange.orders[bot.take_profit_uuid]['price'] == bot.take_profit_price
+
+assert bot.sell("KRW-BTC") and bot.position is None
+assert client.get_balance("BTC") == 0
+print(f"✅ TradingBot 매수→매도 (매수 호출→주문 접수 {buy_latency*1000:.1f}ms)")
+
+# 체결 확인(주문 조회)이 계속 실패: 추적은 간격을 늘리고, ORDER_WAIT_SEC 뒤 현재가를 진입가로 → 손절 동작
+calls = []
+
+
+def failing_get_order(order_id):
+    calls.append(time.monotonic())
+    raise UpbitAPIError(401, 'jwt_verification', "인증 실패")
+
+
+get_order = client.get_order
+client.get_order = failing_get_order
+bot.ORDER_WAIT_SEC = 0.5
+order = bot.buy("KRW-BTC", ratio=0.5)
+assert order and bot.position == 'long' and bot.entry_price == 0
+price = exchange.price("KRW-BTC")
+assert bot.check_exit("KRW-BTC", price) is None and bot.entry_price == 0     # 대기 중에는 판단 보류
+time.sleep(1.6)
+assert len(calls) <= 4, len(calls)      # 0.2초 간격이면 8번 → 0.4/0.8초로 늘어남
+assert bot.check_exit("KRW-BTC", price) is None and bot.entry_price == price
+assert bot.check_exit("KRW-BTC", price * (1 - config.STOP_LOSS) * 0.99) == 'stop_loss' and bot.position is None
+client.get_order = get_order
+assert bot.orders.wait(order['uuid']) and bot.position is None     # 늦게 확인된 체결은 이미 정리된 포지션에 반영 안 함
+assert client.get_balance("BTC") == 0
+print(f"✅ 체결 확인 실패 → 조회 {len(calls)}번(백오프), {bot.ORDER_WAIT_SEC}초 뒤 현재가로 손절 판단")
+
+# 6) 응답 지연 50ms에서 봇 신호 판단 루프 부하 (봇 8개 동시)
+exchange.latency = 0.05
+bots = [TradingBot(ACCESS_KEY, SECRET_KEY, client=client) for _ in range(8)]
+durations = []
+
+
+def run_bot(bot, rounds=10):
+    for _ in range(rounds):
+        bot.window_key = None               # 매번 전체 캔들 조회 (최악의 경우)
+        started = time.perf_counter()
+        df, _ = bot.get_window_snapshot("KRW-BTC", "day")
+        durations.append(time.perf_counter() - started)
+        assert df is not None
+
+
+started = time.perf_counter()
+threads = [threading.Thread(target=run_bot, args=(bot,)) for bot in bots]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+elapsed = time.perf_counter() - started
+
+p50, p99 = np.percentile(durations, [50, 99])
+assert len(durations) == 80 and p50 >= 0.05
+print(f"✅ 부하: 스냅샷 {len(durations)}개 {elapsed:.2f}초 ({len(durations)/elapsed:.0f}회/초), "
+      f"p50 {p50*1000:.0f}ms / p99 {p99*1000:.0f}ms")
+
+config.TRADING_MODE = 'test'
+client.close()
+exchange.stop()
+print(f"\n✅ 전체 통과 (요청 {sum(exchange.requests.values())}개)")
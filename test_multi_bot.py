@@ -0,0 +1,112 @@
+"""
+멀티 티커 봇 검증
+로컬 모의 거래소에서 티커 12개를 봇 하나로 돌려 현재가 일괄 조회(요청 1번), 봉 마감마다
+전 티커 동시 신호/주문, 티커별 포지션 상태, 공용 요청 속도 제한을 확인 (네트워크 없이 테스트)
+"""
+import time
+import asyncio
+import config
+from mock_exchange import MockExchange
+from upbit_client import AsyncUpbitClient
+from rate_governor import RateGovernor
+from candle_clock import CandleScheduler, VirtualClock, KST_OFFSET
+from notifier import TelegramNotifier
+from sample_data import make_candles
+from order_tracker import fill_summary
+
+ACCESS_KEY = "mock-access"
+SECRET_KEY = "mock-secret-key-for-local-exchange-0000"
+TICKERS = [f"KRW-C{i:02d}" for i in range(12)]
+
+print("=" * 60)
+print("🔬 멀티 티커 봇 (로컬 모의 거래소)")
+print("=" * 60)
+
+candles = {t: make_candles(n=260, seed=i, start='2023-01-01 09:00') for i, t in enumerate(TICKERS)}
+exchange = MockExchange(candles, interval="day", access_key=ACCESS_KEY, secret_key=SECRET_KEY,
+                        balances={'KRW': 10_000_000})
+base_url = exchange.start()
+
+# 전략 #8 (무조건 매수) → 봉 마감에 모든 티커가 동시에 매수 신호
+config.TRADING_MODE = 'real'
+config.SELECTED_STRATEGY = 8
+from multi_bot import MultiTickerBot
+
+
+def exchange_time():
+    """
+    모의 거래소 현재 봉 시작 + 2초 (UNIX)
+    """
+    return (exchange.now - KST_OFFSET).timestamp() + 2
+
+
+async def main():
+    client = AsyncUpbitClient(ACCESS_KEY, SECRET_KEY, base_url=base_url, rate=100)
+    clock = VirtualClock(exchange_time())
+    bot = MultiTickerBot(TICKERS, "day", ACCESS_KEY, SECRET_KEY, client=client,
+                         notifier=TelegramNotifier("", ""), clock=clock)
+    scheduler = CandleScheduler("day", offset=2, check_sec=60, clock=clock.time)
+
+    # 1) 첫 봉 마감: 현재가 1번 + 티커별 캔들 + 주문, 모든 티커 매수
+    exchange.requests.clear()
+    started = time.perf_counter()
+    signals = await bot.step(scheduler)
+    elapsed = time.perf_counter() - started
+    assert signals == {t: 'buy' for t in TICKERS}, signals
+    assert all(bot.states[t].position == 'long' for t in TICKERS)
+    assert exchange.requests['/v1/ticker'] == 1
+    assert exchange.requests['/v1/candles/days'] == len(TICKERS)
+    # 잔고 조회 → 주문이 차례로 실행되어 매번 남은 KRW의 INVEST_RATIO만 사용
+    expected = 10_000_000 * (1 - config.INVEST_RATIO * (1 + exchange.fee)) ** len(TICKERS)
+    assert abs(exchange.balances['KRW'] - expected) < 1, (exchange.balances['KRW'], expected)
+    # 진입가 = 거래소 체결 내역의 평균 체결가 (시세 조회 현재가가 아님)
+    for order in exchange.orders.values():
+        assert abs(bot.states[order['market']].entry_price - fill_summary(order)['price']) < 1e-6
+    assert any(bot.states[t].entry_price != bot.prices[t] for t in TICKERS)
+    print(f"✅ 봉 마감: 티커 {len(TICKERS)}개 동시 매수 ({elapsed*1000:.0f}ms, "
+          f"요청 {sum(exchange.requests.values())}개)")
+
+    # 2) 봉 사이: 보유 티커 수와 관계없이 현재가 1번 (+ 오래된 계좌 스냅샷 1번)
+    exchange.requests.clear()
+    clock.sleep(60)
+    assert await bot.step(scheduler) is None
+    assert dict(exchange.requests) == {'/v1/ticker': 1, '/v1/accounts': 1}
+    assert all(bot.account.balance(t) > 0 for t in TICKERS)
+    print("✅ 봉 사이 손절/익절 확인: 현재가 일괄 조회 1번, 코인 12개 잔고도 1번")
+
+    # 3) 티커별 상태: 한 티커만 손절, 나머지는 보유 유지
+    target = bot.states[TICKERS[3]]
+    reason = await bot.check_exit(target, target.entry_price * (1 - config.STOP_LOSS) * 0.99)
+    assert reason == 'stop_loss' and target.position is None
+    assert exchange.balances.get('C03', 0) == 0
+    assert sum(bot.states[t].position == 'long' for t in TICKERS) == len(TICKERS) - 1
+    print("✅ 티커별 포지션 (C03만 손절)")
+
+    # 4) 다음 봉 마감: 캔들은 새 봉만 (티커당 요청 1번, 2개)
+    exchange.advance()
+    clock.current = exchange_time()
+    exchange.requests.clear()
+    signals = await bot.step(scheduler)
+    assert all(s == 'buy' for s in signals.values())
+    assert target.position == 'long'
+    assert exchange.requests['/v1/candles/days'] == len(TICKERS)
+    assert all(len(bot.states[t].window) == bot.candle_count for t in TICKERS)
+    print("✅ 다음 봉 마감: 새 캔들만 받아 전 티커 신호 (C03 재매수)")
+
+    # 5) 공용 속도 제한: 초당 20개로 줄이면 티커 12개 캔들 요청이 0.5초 이상 분산
+    client.governor = RateGovernor(rate=20, burst=1)
+    exchange.advance()
+    clock.current = exchange_time()
+    started = time.perf_counter()
+    await bot.step(scheduler)
+    elapsed = time.perf_counter() - started
+    assert elapsed >= (len(TICKERS) - 1) / 20, elapsed
+    print(f"✅ 공용 속도 제한 (초당 20개): 봉 마감 처리 {elapsed:.2f}초")
+
+    await client.close()
+
+
+asyncio.run(main())
+exchange.stop()
+config.TRADING_MODE = 'test'
+print("\n✅ 전체 통과")
@@ -0,0 +1,132 @@
+"""
+비동기 텔레그램 알림 검증
+로컬 HTTP 서버(텔레그램 sendMessage 흉내)로 즉시 반환, 묶음 전송,
+재시도(5xx/429), 큐 초과 시 버림 정책을 확인 (네트워크 없이 테스트)
+"""
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+from notifier import TelegramNotifier
+
+TOKEN = "123:test"
+received = []           # 받은 메시지 본문
+server_state = {'delay': 0.0, 'fail': 0, 'status': 500, 'retry_after': 0}
+
+
+class TelegramHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = parse_qs(self.rfile.read(int(self.headers['Content-Length'])).decode())
+        assert self.path == f"/bot{TOKEN}/sendMessage" and body['parse_mode'] == ['HTML']
+        time.sleep(server_state['delay'])
+
+        if server_state['fail'] > 0:
+            server_state['fail'] -= 1
+            payload = {'ok': False, 'parameters': {'retry_after': server_state['retry_after']}}
+            self.reply(server_state['status'], payload)
+            return
+
+        received.append(body['text'][0])
+        self.reply(200, {'ok': True})
+
+    def reply(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), TelegramHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def make_notifier(**kwargs):
+    options = dict(api_url=api_url, batch_window=0.05, backoff=0.05)
+    options.update(kwargs)
+    return TelegramNotifier(TOKEN, "42", **options)
+
+
+print("=" * 60)
+print("🔬 비동기 텔레그램 알림 (로컬 서버)")
+print("=" * 60)
+
+api_url = start_server()
+
+# 1) 느린 서버에서도 send는 바로 반환
+server_state['delay'] = 0.5
+notifier = make_notifier()
+started = time.perf_counter()
+notifier.send("📈 <b>매수</b>")
+elapsed = time.perf_counter() - started
+assert elapsed < 0.01, elapsed
+assert notifier.flush() and received == ["📈 <b>매수</b>"]
+server_state['delay'] = 0.0
+print(f"✅ 느린 서버(0.5초)에도 send {elapsed*1000:.2f}ms")
+
+# 2) 몰린 메시지는 묶음으로
+received.clear()
+messages = [f"알림 {i}" for i in range(25)]
+for message in messages:
+    notifier.send(message)
+assert notifier.flush()
+assert len(received) == 3, len(received)                      # max_batch=10 → 10 + 10 + 5
+assert all(text.startswith("📬") for text in received)
+assert all(message in "".join(received) for message in messages)
+assert notifier.delivered == 26 and notifier.sent == 4
+print(f"✅ 메시지 25개 → 요청 {len(received)}번")
+
+# 3) 5xx는 재시도
+received.clear()
+server_state.update(fail=2, status=500)
+notifier.send("재시도")
+assert notifier.flush() and received == ["재시도"]
+print("✅ 5xx 2번 후 재시도 성공")
+
+# 4) 429는 retry_after만큼 기다린 뒤 재시도
+received.clear()
+server_state.update(fail=1, status=429, retry_after=0.3)
+started = time.perf_counter()
+notifier.send("속도 제한")
+assert notifier.flush() and received == ["속도 제한"]
+assert time.perf_counter() - started >= 0.3
+print("✅ 429 retry_after 대기 후 재시도")
+
+# 5) 재시도해도 실패하면 버리고 계속
+received.clear()
+server_state.update(fail=10, status=500)
+notifier.send("실패")
+assert notifier.flush() and notifier.failed == 1
+server_state['fail'] = 0
+notifier.send("다음")
+assert notifier.flush() and received == ["다음"]
+notifier.close()
+print("✅ 재시도 초과 메시지는 실패 처리 후 계속 전송")
+
+# 6) 큐가 가득 차면 정책대로 버림
+for policy, kept in [('oldest', [f"m{i}" for i in range(15, 20)]), ('newest', [f"m{i}" for i in range(5)])]:
+    received.clear()
+    server_state['delay'] = 0.2
+    notifier = make_notifier(max_queue=5, max_batch=1, drop_policy=policy)
+    notifier.send("첫 메시지")
+    time.sleep(0.05)                    # 첫 메시지 전송 중 (큐 비어 있음)
+    for i in range(20):
+        notifier.send(f"m{i}")
+    server_state['delay'] = 0.0
+    assert notifier.close()
+    assert received == ["첫 메시지"] + kept, received
+    assert notifier.dropped == 15
+    print(f"✅ 큐 초과 정책 {policy}: 15개 버림")
+
+# 7) 토큰이 없으면 알림 끔
+assert not TelegramNotifier("", "").send("무시")
+print("✅ 토큰 없으면 알림 끔")
+
+print("\n✅ 전체 통과")
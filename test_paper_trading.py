@@ -0,0 +1,83 @@
+"""
+모의투자 엔진 검증
+슬리피지 모델(calculate_slippage) + 수수료로 체결되는지, 원장 파일로 잔고가 복원되는지,
+테스트 모드 TradingBot이 실제로 포지션/손절/손익을 거치는지 확인 (네트워크 없이 테스트)
+"""
+import os
+import tempfile
+import config
+from paper_trading import PaperTrader, LEDGER_DTYPE
+from backtest_by_capital import calculate_slippage
+
+print("=" * 60)
+print("🔬 모의투자 엔진")
+print("=" * 60)
+
+prices = {"KRW-BTC": 50_000_000.0}
+ledger = os.path.join(tempfile.mkdtemp(), "ledger.bin")
+paper = PaperTrader(lambda ticker: prices[ticker], ledger_path=ledger, initial_krw=20_000_000)
+
+# 1) 매수: 현재가 × (1 + 슬리피지), 수수료 별도
+order = paper.buy_market_order("KRW-BTC", 3_000_000)
+fill = order['trades'][0]['price']
+assert fill == 50_000_000 * (1 + calculate_slippage(3_000_000))
+assert abs(paper.get_balance("BTC") - 3_000_000 / fill) < 1e-12
+assert abs(paper.get_balance("KRW") - (20_000_000 - 3_000_000 * 1.0005)) < 1e-6
+print(f"✅ 매수 300만원 → 체결가 {fill:,.0f}원 (슬리피지 {calculate_slippage(3_000_000)*100:.3f}%)")
+
+# 2) 큰 주문일수록 슬리피지 ↑
+small = paper.buy_market_order("KRW-BTC", 500_000)['trades'][0]['price']
+large = paper.buy_market_order("KRW-BTC", 12_000_000)['trades'][0]['price']
+assert small < fill < large
+print("✅ 주문 금액별 슬리피지 (50만 < 300만 < 1200만)")
+
+# 3) 매도: 현재가 × (1 - 슬리피지)
+prices["KRW-BTC"] = 55_000_000.0
+volume = paper.get_balance("BTC")
+order = paper.sell_market_order("KRW-BTC", volume)
+assert order['trades'][0]['price'] < 55_000_000 and paper.get_balance("BTC") == 0
+print(f"✅ 전량 매도 → 잔고 {paper.get_balance('KRW'):,.0f}원")
+
+# 4) 거절: 잔고 부족 / 최소 금액 / 보유 수량 없음
+assert paper.buy_market_order("KRW-BTC", 100_000_000) is None
+assert paper.buy_market_order("KRW-BTC", 1000) is None
+assert paper.sell_market_order("KRW-BTC", 1) is None
+print("✅ 잔고 부족/최소 금액/보유 없음 거절")
+
+# 5) 원장으로 복원 (입금 1 + 체결 4 = 57바이트 × 5)
+paper.buy_market_order("KRW-BTC", 1_000_000)
+restored = PaperTrader(lambda ticker: prices[ticker], ledger_path=ledger, initial_krw=1)
+assert os.path.getsize(ledger) == LEDGER_DTYPE.itemsize * 6 and restored.fills == 5
+assert restored.balances == paper.balances and restored.avg_buy_price == paper.avg_buy_price
+print(f"✅ 원장 복원 ({os.path.getsize(ledger)}바이트, 체결 {restored.fills}건)")
+
+# 6) 테스트 모드 TradingBot: 매수 → 손절 → 재시작 시 포지션 복원
+from bot import TradingBot
+
+
+class PriceClient:
+    def get_current_price(self, ticker):
+        return prices[ticker]
+
+
+config.TRADING_MODE = 'test'
+ledger = os.path.join(tempfile.mkdtemp(), "ledger.bin")
+bot = TradingBot(client=PriceClient(), paper=PaperTrader(lambda t: prices[t], ledger_path=ledger))
+bot.send_telegram = lambda message: None
+
+prices["KRW-BTC"] = 50_000_000.0
+order = bot.buy("KRW-BTC", ratio=config.INVEST_RATIO)
+assert order and bot.position == 'long'
+assert abs(bot.entry_price - order['trades'][0]['price']) < 1e-6 and bot.entry_price > 50_000_000  # 슬리피지 포함 체결가
+assert bot.volume == order['trades'][0]['volume']
+
+restarted = TradingBot(client=PriceClient(), paper=PaperTrader(lambda t: prices[t], ledger_path=ledger))
+assert restarted.restore_paper_position("KRW-BTC") and restarted.entry_price == bot.upbit.avg_buy_price['BTC']
+
+prices["KRW-BTC"] = 50_000_000.0 * (1 - config.STOP_LOSS) * 0.99
+assert bot.check_exit("KRW-BTC", prices["KRW-BTC"]) == 'stop_loss'
+assert bot.position is None and bot.get_balance("BTC") == 0
+assert bot.upbit.get_balance("KRW") < 1_000_000
+print(f"✅ TradingBot 모의투자: 매수 → 손절 → 잔고 {bot.get_balance('KRW'):,.0f}원")
+
+print("\n✅ 전체 통과")
@@ -0,0 +1,139 @@
+"""
+요청 속도 제한 검증
+엔드포인트 그룹별 토큰 버킷, 우선순위(주문 > 손절 확인 > 캔들 > 백필), 429/Remaining-Req 반영,
+파일 잠금으로 프로세스 간 공유, 클라이언트 요청의 그룹 분류와 대기 시간 통계를 확인 (네트워크 없이 테스트)
+"""
+import os
+import time
+import asyncio
+import tempfile
+import threading
+from rate_governor import RateGovernor, ORDER, STOP_CHECK, CANDLES, BACKFILL, classify, priority
+from mock_exchange import MockExchange
+from upbit_client import UpbitClient
+from sample_data import make_candles
+
+ACCESS_KEY = "mock-access"
+SECRET_KEY = "mock-secret-key-for-local-exchange-0000"
+
+print("=" * 60)
+print("🔬 요청 속도 제한 (토큰 버킷)")
+print("=" * 60)
+
+# 1) 엔드포인트 그룹 / 기본 우선순위
+assert classify("POST", "orders") == ('order', ORDER) and classify("DELETE", "order") == ('order', ORDER)
+assert classify("GET", "order") == ('default', ORDER) and classify("GET", "accounts") == ('default', STOP_CHECK)
+assert classify("GET", "ticker") == ('ticker', STOP_CHECK)
+assert classify("GET", "candles/minutes/15") == ('candles', CANDLES)
+with priority(BACKFILL):
+    assert classify("GET", "candles/days") == ('candles', BACKFILL)
+assert classify("GET", "candles/days") == ('candles', CANDLES)
+print("✅ 그룹 분류 (주문 8회, 시세 10회, 나머지 30회)")
+
+# 2) 버킷: 초당 제한만큼은 바로, 그다음은 토큰이 찰 때까지
+governor = RateGovernor()
+started = time.perf_counter()
+for _ in range(10):
+    governor.acquire('candles')
+assert time.perf_counter() - started < 0.05
+for _ in range(3):
+    governor.acquire('candles')
+elapsed = time.perf_counter() - started
+assert 0.25 <= elapsed < 0.5, elapsed
+governor.acquire('ticker')      # 다른 그룹은 따로
+assert time.perf_counter() - started - elapsed < 0.05
+print(f"✅ candles 13개 {elapsed:.2f}초 (10개는 바로, 3개는 0.1초 간격), ticker는 별도 버킷")
+
+# 3) 우선순위: 백필이 먼저 줄을 서도 주문/손절 확인이 먼저 나감
+governor = RateGovernor(rate=20, burst=1)
+governor.acquire('candles')     # 토큰 소진
+granted = []
+
+
+def request(level):
+    governor.acquire('candles', level)
+    granted.append(level)
+
+
+threads = [threading.Thread(target=request, args=(BACKFILL,)) for _ in range(4)]
+for t in threads:
+    t.start()
+time.sleep(0.01)
+for level in (CANDLES, STOP_CHECK, ORDER):
+    threads.append(threading.Thread(target=request, args=(level,)))
+    threads[-1].start()
+for t in threads:
+    t.join()
+assert granted == [ORDER, STOP_CHECK, CANDLES] + [BACKFILL] * 4, granted
+print("✅ 우선순위: 주문 → 손절 확인 → 캔들 → 백필")
+
+# 4) 비동기 + 대기 시간 통계
+governor = RateGovernor(rate=20, burst=1)
+
+
+async def burst():
+    await asyncio.gather(*[governor.aacquire('candles', BACKFILL) for _ in range(5)],
+                         *[governor.aacquire('candles', ORDER) for _ in range(2)])
+
+asyncio.run(burst())
+metrics = governor.metrics()['candles']
+assert metrics['order']['requests'] == 2 and metrics['backfill']['requests'] == 5
+assert metrics['backfill']['max_delay'] > metrics['order']['max_delay']
+assert metrics['backfill']['waiting'] == 0
+print(f"✅ 대기 시간 통계 (주문 평균 {metrics['order']['avg_delay']*1000:.0f}ms, "
+      f"백필 평균 {metrics['backfill']['avg_delay']*1000:.0f}ms)")
+
+# 5) 취소된 대기 요청은 줄에서 빠짐
+async def cancelled():
+    task = asyncio.ensure_future(governor.aacquire('ticker', BACKFILL))
+    governor.throttled('ticker')
+    await asyncio.sleep(0.01)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    return await governor.aacquire('ticker', BACKFILL)
+
+asyncio.run(cancelled())
+assert governor.queues['ticker'] == []
+print("✅ 취소된 대기 요청 정리")
+
+# 6) 429 / Remaining-Req: 남은 토큰을 줄여 다음 요청부터 대기
+governor = RateGovernor()
+governor.throttled('ticker')
+assert governor.acquire('ticker') >= 0.08
+governor.observe('candles', 1)
+governor.acquire('candles')
+assert governor.acquire('candles') >= 0.08
+print("✅ 429 → 그룹 토큰 비움, Remaining-Req → 남은 토큰 반영")
+
+# 7) 프로세스 간 공유: 같은 잠금 파일을 쓰는 governor끼리 초당 제한을 나눔
+path = os.path.join(tempfile.mkdtemp(), "upbit_rate.json")
+bot_side, optimizer_side = RateGovernor(lock_path=path), RateGovernor(lock_path=path)
+for _ in range(10):
+    bot_side.acquire('candles')
+started = time.perf_counter()
+optimizer_side.acquire('candles')
+assert time.perf_counter() - started >= 0.08
+print("✅ 잠금 파일 공유: 다른 프로세스가 쓴 토큰만큼 대기")
+
+# 8) 클라이언트: 요청마다 그룹/우선순위로 토큰을 받음
+candles = make_candles(n=400, seed=3, start='2023-01-01 09:00')
+exchange = MockExchange(candles, interval="day", access_key=ACCESS_KEY, secret_key=SECRET_KEY,
+                        balances={'KRW': 5_000_000})
+governor = RateGovernor()
+client = UpbitClient(ACCESS_KEY, SECRET_KEY, base_url=exchange.start(), governor=governor)
+client.get_ohlcv("KRW-BTC", "day", count=10)
+client.get_current_price("KRW-BTC")
+order = client.buy_market_order("KRW-BTC", 100_000)
+client.get_order(order['uuid'])
+client.get_balances()
+with priority(BACKFILL):
+    client.get_ohlcv("KRW-BTC", "day", count=10, to=candles.index[100])
+metrics = governor.metrics()
+assert set(metrics) == {'candles', 'ticker', 'order', 'default'}
+assert metrics['candles']['backfill']['requests'] == 1 and metrics['candles']['candles']['requests'] == 1
+assert metrics['default']['order']['requests'] == 1 and metrics['default']['stop_check']['requests'] == 1
+client.close()
+exchange.stop()
+print("✅ UpbitClient 요청 → 그룹별 토큰 (candles/ticker/order/default)")
+
+print("\n✅ 전체 통과")
@@ -0,0 +1,67 @@
+"""
+TradingBot 리플레이 검증
+가상 시계 + 저장된 캔들로 TradingBot.run 판단 경로를 돌려
+Backtester.run과 같은 결과 구조, 가상 잔고와의 일치, 실제 시간 대비 속도를 확인 (네트워크 없이 테스트)
+"""
+import config
+from candle_clock import VirtualClock, next_candle_close
+from replay import ReplayMarket, replay_bot
+from sample_data import make_candles
+from strategies import STRATEGIES
+
+print("=" * 60)
+print("🔬 TradingBot 리플레이")
+print("=" * 60)
+
+config.TRADING_MODE = 'test'
+candles = make_candles(n=320, seed=7, start='2023-01-01 09:00')
+warmup = STRATEGIES[config.SELECTED_STRATEGY](config.STRATEGY_PARAMS).live_candle_count()   # 봇의 candle_count
+
+# 1) 시세 제공자: 진행 중인 봉은 시가 → 종가로 움직이고 고가/저가 안에 머무름
+clock = VirtualClock(0)
+market = ReplayMarket(candles, clock, "day")
+clock.current = market.starts[250]
+assert market.get_current_price() == candles['open'].iloc[250]
+df = market.get_ohlcv(count=200)
+assert len(df) == 200 and df.index[-1] == candles.index[250] and df['volume'].iloc[-1] == 0
+
+clock.current = next_candle_close("day", clock.current) - 1
+price = market.get_current_price()
+bar = candles.iloc[250]
+forming = market.get_ohlcv(count=200).iloc[-1]
+assert forming['low'] <= price <= forming['high'] and abs(price - bar['close']) < abs(bar['open'] - bar['close'])
+assert forming['high'] >= bar['high'] and forming['low'] <= bar['low']
+print("✅ 가상 시계에 맞춘 캔들/현재가 재생")
+
+# 2) 봇 리플레이: Backtester.run과 같은 결과 구조
+result = replay_bot(candles, "KRW-BTC", "day")
+keys = {'initial_balance', 'final_balance', 'total_return', 'return_ratio',
+        'trades', 'win_rate', 'buy_hold_return', 'equity'}
+assert keys <= set(result)
+
+trades = result['trades']
+assert trades, "거래가 없습니다"
+for i, trade in enumerate(trades):
+    assert (trade['type'] == 'buy') == (i % 2 == 0), trade
+    assert trade['price'] > 0 and trade['quantity'] > 0
+    if trade['type'] != 'buy':
+        assert 'profit' in trade and 'profit_ratio' in trade
+assert [t['date'] for t in trades] == sorted(t['date'] for t in trades)
+
+exits = {t['type'] for t in trades if t['type'] != 'buy'}
+print(f"✅ 거래 {len(trades)}건 ({', '.join(sorted(exits))}), 수익률 {result['return_ratio']:+.2f}%")
+
+# 3) 매도 손익 합계 = 최종 자산 - 초기 자산 (마지막 포지션은 종가 평가)
+realized = sum(t['profit'] for t in trades if t['type'] != 'buy')
+if trades[-1]['type'] == 'buy':
+    last = trades[-1]
+    realized += last['quantity'] * candles['close'].iloc[-1] - last['quantity'] * last['price']
+assert abs(realized - result['total_return']) < 1e-3, (realized, result['total_return'])
+assert result['equity'].index.equals(candles.index[warmup - 1:])
+print(f"✅ 손익 합계 = 총 수익 ({result['total_return']:,.0f}원), 자산 곡선 {len(result['equity'])}봉")
+
+# 4) 실제 시간보다 수천 배 이상 빠름
+assert result['speedup'] > 1000, result['speedup']
+print(f"✅ {len(candles) - warmup}일을 {result['wall_time']:.2f}초에 재생 (실제 시간의 {result['speedup']:,.0f}배)")
+
+print("\n✅ 전체 통과")
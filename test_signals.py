@@ -0,0 +1,41 @@
+"""
+벡터화 신호 검증
+generate_signals(df) 결과가 봉마다 generate_signal(df.iloc[:i+1])을 부른 결과와 같은지 확인
+(네트워크 없이 합성 캔들로 테스트)
+"""
+import random
+from strategies import STRATEGIES
+from sample_data import make_candles
+import config
+
+
+print("=" * 60)
+print("🔬 벡터화 신호 일치 검증")
+print("=" * 60)
+
+failed = []
+
+for seed in [1, 42, 7]:
+    for strategy_num, strategy_class in STRATEGIES.items():
+        for rsi_oversold in [30, 45]:
+            params = config.STRATEGY_PARAMS.copy()
+            params['rsi_oversold'] = rsi_oversold
+            strategy = strategy_class(params)
+            df = strategy.calculate_indicators(make_candles(seed=seed))
+
+            random.seed(seed)
+            expected = [strategy.generate_signal(df.iloc[:i+1]) for i in range(len(df))]
+            random.seed(seed)
+            signals = strategy.generate_signals(df)
+
+            mismatch = [i for i in range(len(df)) if signals[i] != expected[i]]
+            if mismatch:
+                failed.append((strategy_num, seed, rsi_oversold, mismatch[:5]))
+
+    print(f"seed={seed}: {'✅' if not failed else '❌'}")
+
+for strategy_num, seed, rsi_oversold, mismatch in failed:
+    print(f"❌ 전략 #{strategy_num} (seed={seed}, RSI {rsi_oversold}) 불일치 봉: {mismatch}")
+
+assert not failed, "벡터화 신호 불일치"
+print("\n✅ 10개 전략 모두 일치")
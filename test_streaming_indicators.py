@@ -0,0 +1,61 @@
+"""
+스트리밍 지표 검증
+StreamingIndicators 봉 단위 갱신 결과가 ta 일괄 계산(calculate_indicators)과
+허용 오차 내에서 같은지 확인 (네트워크 없이 합성 캔들로 테스트)
+"""
+import numpy as np
+from strategies import BaseStrategy
+from streaming_indicators import StreamingIndicators
+from sample_data import make_candles
+import config
+
+RTOL = 1e-9  # 종가 대비 허용 오차
+
+print("=" * 60)
+print("🔬 스트리밍 지표 vs ta 일괄 계산")
+print("=" * 60)
+
+failed = []
+
+for seed in [1, 42]:
+    df = make_candles(n=2000, seed=seed)
+    expected = BaseStrategy(config.STRATEGY_PARAMS).calculate_indicators(df.copy())
+    scale = df['close'].to_numpy() * RTOL
+
+    # 1) 마감 봉 단위 push, 진행 중 봉 preview는 push 결과와 같아야 함
+    engine = StreamingIndicators(config.STRATEGY_PARAMS)
+    rows = []
+    for close in df['close']:
+        preview = engine.preview(close * 1.01)  # 진행 중 가격 변동
+        preview = engine.preview(close)
+        rows.append(engine.push(close))
+        if any(not (np.isnan(preview[k]) and np.isnan(rows[-1][k])) and preview[k] != rows[-1][k] for k in preview):
+            failed.append((seed, 'preview'))
+
+    for column in rows[0]:
+        actual = np.array([row[column] for row in rows])
+        target = expected[column].to_numpy()
+
+        same_nan = (np.isnan(actual) == np.isnan(target)).all()
+        valid = ~np.isnan(target)
+        error = np.abs(actual[valid] - target[valid])
+        if not same_nan or (error > scale[valid]).any():
+            failed.append((seed, column))
+
+    # 2) 라이브 봇처럼 캔들 창을 밀면서 apply
+    engine = StreamingIndicators(config.STRATEGY_PARAMS)
+    for end in range(300, 400):
+        window = df.iloc[:end].copy()
+        window = engine.apply(window)
+        target = expected.iloc[end - 1]
+        for column in rows[0]:
+            if abs(window[column].iloc[-1] - target[column]) > scale[end - 1]:
+                failed.append((seed, f'apply {column}'))
+
+    print(f"seed={seed}: {'✅' if not failed else '❌'}")
+
+for seed, column in sorted(set(failed)):
+    print(f"❌ seed={seed} {column} 불일치")
+
+assert not failed, "스트리밍 지표 불일치"
+print("\n✅ RSI/MACD/볼린저/이동평균 모두 허용 오차 내 일치")
@@ -0,0 +1,98 @@
+"""
+병렬 파라미터 스윕 검증
+임시 캔들 저장소를 미리 채워 두고 프로세스 2개로 스윕했을 때 결과가 같은 조합을 하나씩
+직접 돌린 백테스트와 같은지, config 전역값을 건드리지 않는지,
+지표 기간 스윕의 조합별 결과가 지표 전체 계산 + 백테스트와 같은지 확인 (네트워크 없이 테스트)
+"""
+import copy
+import tempfile
+import pandas as pd
+from strategies import Strategy1_MeanReversion, Strategy4_MACDOnly, Strategy5_Momentum, Strategy6_Contrarian
+from backtest import Backtester
+from backtest_by_capital import BacktesterWithSlippage
+from backtest_engine import RunConfig
+from candle_store import CandleStore
+from sample_data import make_candles
+from sweep import make_job, run_sweep, sweep_indicator_periods
+import config
+
+MARKET = ("KRW-BTC", "20230201", "20241130", "day")
+
+print("=" * 60)
+print("🔬 병렬 파라미터 스윕 (프로세스 2개)")
+print("=" * 60)
+
+# 임시 저장소에 캔들 미리 저장 (오프라인으로 읽음)
+candles = make_candles(n=700, seed=8, start='2023-01-01 09:00')
+store = CandleStore(tempfile.mkdtemp(), offline=True)
+store.merge("KRW-BTC", "day", candles, covered=[(candles.index[0], pd.Timestamp.now())])
+
+before = {name: copy.deepcopy(getattr(config, name))
+          for name in ('STRATEGY_PARAMS', 'INVEST_RATIO', 'STOP_LOSS', 'TAKE_PROFIT', 'SELECTED_STRATEGY')}
+
+jobs = []
+for strategy_class in (Strategy1_MeanReversion, Strategy5_Momentum):
+    for oversold in (30, 40):
+        for run_config in (RunConfig(0.5, 0.02, 0.04), RunConfig(0.9, 0, 0.08)):
+            params = dict(config.STRATEGY_PARAMS, rsi_oversold=oversold)
+            jobs.append(make_job(strategy_class, params, 2_000_000, run_config,
+                                 strategy=strategy_class.__name__, rsi=oversold))
+capitals = [500_000, 5_000_000, 20_000_000]
+jobs.append(make_job(Strategy1_MeanReversion, config.STRATEGY_PARAMS, capitals, RunConfig(0.7, 0.03, 0.05)))
+assert jobs[0]['tags'] == {'strategy': 'Strategy1_MeanReversion', 'rsi': 30}
+
+# 1) BacktesterWithSlippage (기본값), 자본 목록 조합 포함
+results = list(run_sweep(jobs, *MARKET, processes=2, store=store, verbose=False))
+assert len(results) == len(jobs)
+for job, result in results:
+    if isinstance(job['capital'], list):
+        serial = [BacktesterWithSlippage(job['strategy_class'](job['params']), initial_balance=capital,
+                                         data_source=store, run_config=job['run_config']).run(*MARKET)
+                  for capital in job['capital']]
+        assert [r['final_balance'] for r in result] == [r['final_balance'] for r in serial]
+        continue
+    serial = BacktesterWithSlippage(job['strategy_class'](job['params']), initial_balance=job['capital'],
+                                    data_source=store, run_config=job['run_config']).run(*MARKET)
+    assert result['final_balance'] == serial['final_balance'], job['tags']
+    assert [(t['date'], t['type']) for t in result['trades']] == [(t['date'], t['type']) for t in serial['trades']]
+print(f"✅ BacktesterWithSlippage 조합 {len(jobs)}개 = 하나씩 직접 실행 (자본 목록 조합 포함)")
+
+# 2) Backtester + run_kwargs
+jobs = jobs[:-1]
+results = list(run_sweep(jobs, *MARKET, processes=2, backtester_class=Backtester, store=store,
+                         run_kwargs={'verbose': False}, verbose=False))
+for job, result in results:
+    serial = Backtester(job['strategy_class'](job['params']), initial_balance=job['capital'],
+                        data_source=store, run_config=job['run_config']).run(*MARKET, verbose=False)
+    assert result['final_balance'] == serial['final_balance'] and len(result['trades']) == len(serial['trades'])
+assert len({round(result['final_balance']) for _, result in results}) > 1
+print(f"✅ Backtester 조합 {len(jobs)}개 = 하나씩 직접 실행")
+
+# 3) 지표 기간 스윕: 조합마다 그 기간으로 지표 전체 계산 + 백테스트한 결과와 같음
+df = candles.loc["20230201":"20241130"]
+rsi_periods = [7, 14, 21]
+macd_triples = [(12, 26, 9), (5, 35, 5), (8, 21, 9)]
+for strategy_class in (Strategy1_MeanReversion, Strategy4_MACDOnly, Strategy6_Contrarian):
+    run_config = RunConfig.for_strategy(1)
+    sweep = sweep_indicator_periods(df, strategy_class, config.STRATEGY_PARAMS, rsi_periods=rsi_periods,
+                                    macd_triples=macd_triples, run_config=run_config)
+    assert [(r['rsi_period'], r['macd']) for r in sweep] == [(p, t) for p in rsi_periods for t in macd_triples]
+    for point in (sweep[0], sweep[4], sweep[-1]):
+        fast, slow, signal = point['macd']
+        params = dict(config.STRATEGY_PARAMS, rsi_period=point['rsi_period'],
+                      macd_fast=fast, macd_slow=slow, macd_signal=signal)
+        strategy = strategy_class(params)
+        expected = Backtester(strategy, run_config=run_config).run_frame(
+            strategy.calculate_indicators(df.copy()), verbose=False)
+        assert abs(point['final_balance'] - expected['final_balance']) < 1e-6, point
+        assert point['trades'] == sum(1 for t in expected['trades'] if t['type'] == 'buy')
+        assert abs(point['win_rate'] - expected['win_rate']) < 1e-9
+    assert len({round(r['final_balance']) for r in sweep}) > 1
+print("✅ 지표 기간 스윕 조합 = 지표 전체 계산 + 백테스트 (RSI 3개 × MACD 3개)")
+
+# 4) config 전역값은 그대로
+for name, value in before.items():
+    assert getattr(config, name) == value, name
+print("✅ config 전역값 변경 없음")
+
+print("\n✅ 전체 통과")
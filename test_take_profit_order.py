@@ -0,0 +1,161 @@
+"""
+익절 지정가 주문 검증
+매수 직후 익절가(호가 단위 올림)에 지정가 매도를 걸고, 체결은 백그라운드 주문 상태 확인으로 반영하며,
+손절/신호 매도 전에는 취소하는지 로컬 모의 거래소와 모의투자 계좌로 확인 (네트워크 없이 테스트)
+"""
+import time
+import threading
+import config
+from mock_exchange import MockExchange
+from upbit_client import UpbitClient, tick_price
+from paper_trading import PaperTrader
+from sample_data import make_candles
+
+ACCESS_KEY = "mock-access"
+SECRET_KEY = "mock-secret-key-for-local-exchange-0000"
+
+print("=" * 60)
+print("🔬 익절 지정가 주문")
+print("=" * 60)
+
+# 1) 호가 단위
+assert tick_price(50_150_321) == 50_151_000 and tick_price(1_234_567) == 1_235_000
+assert tick_price(8_765.4) == 8_766 and tick_price(523.21) == 523.3 and tick_price(999.95, up=False) == 999.9
+assert tick_price(2_000_000) == 2_000_000
+print("✅ 호가 단위 맞춤 (올림/내림)")
+
+candles = make_candles(n=600, seed=5, start='2023-01-01 09:00')
+exchange = MockExchange(candles, interval="day", access_key=ACCESS_KEY, secret_key=SECRET_KEY,
+                        balances={'KRW': 10_000_000})
+client = UpbitClient(ACCESS_KEY, SECRET_KEY, base_url=exchange.start(), rate=None)
+
+from bot import TradingBot
+
+config.TRADING_MODE = 'real'
+config.TAKE_PROFIT = 0.01
+bot = TradingBot(ACCESS_KEY, SECRET_KEY, client=client)
+messages = []
+bot.send_telegram = messages.append
+
+
+def wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def buy():
+    """
+    매수 후 체결 확인(→ 익절 지정가 주문)까지 대기
+    """
+    order = bot.buy("KRW-BTC", ratio=0.3)
+    return order and bot.orders.wait(order['uuid'])
+
+
+# 2) 매수 → 익절가 지정가 매도 대기 → 가격이 닿으면 백그라운드 확인으로 포지션 정리
+assert buy()
+order = exchange.orders[bot.take_profit_uuid]
+assert order['side'] == 'ask' and order['ord_type'] == 'limit' and order['state'] == 'wait'
+assert order['price'] == tick_price(bot.entry_price * 1.01) and exchange.balances['BTC'] == 0
+print(f"✅ 매수 직후 익절 지정가 {order['price']:,.0f}원 (진입가 {bot.entry_price:,.0f}원)")
+
+bot.ORDER_CHECK_SEC = 0.05
+watcher = threading.Thread(target=bot._watch_orders, daemon=True)
+watcher.start()
+while order['state'] == 'wait':
+    assert exchange.advance()
+assert wait_for(lambda: bot.position is None)
+bot.order_watch_stop.set()
+watcher.join()
+assert bot.take_profit_uuid is None and exchange.balances['BTC'] == 0
+assert "익절 (지정가)" in messages[-1]
+print(f"✅ 거래소 체결 → 백그라운드 확인으로 포지션 정리 ({messages[-1].splitlines()[4]})")
+
+# 3) 손절: 지정가 취소 후 시장가 매도
+assert buy()
+order_id = bot.take_profit_uuid
+assert bot.check_exit("KRW-BTC", bot.entry_price * (1 - config.STOP_LOSS) * 0.99) == 'stop_loss'
+assert exchange.orders[order_id]['state'] == 'cancel'
+assert client.get_balance("BTC") == 0 and exchange.locked['BTC'] < 1e-12
+print("✅ 손절 → 익절 지정가 취소 후 시장가 매도")
+
+# 4) 신호 매도: 지정가 취소 후 시장가 매도
+assert buy()
+order_id = bot.take_profit_uuid
+assert bot.sell("KRW-BTC") and bot.position is None
+assert exchange.orders[order_id]['state'] == 'cancel' and client.get_balance("BTC") == 0
+print("✅ 신호 매도 → 익절 지정가 취소 후 시장가 매도")
+
+# 5) 취소하려는 사이 이미 체결: 시장가 매도 없이 익절로 정리
+assert buy()
+order = exchange.orders[bot.take_profit_uuid]
+while order['state'] == 'wait':
+    assert exchange.advance()
+sells = sum(1 for o in exchange.orders.values() if o['ord_type'] == 'market')
+assert bot.sell("KRW-BTC") is None and bot.position is None
+assert sum(1 for o in exchange.orders.values() if o['ord_type'] == 'market') == sells
+assert "익절 (지정가)" in messages[-1]
+print("✅ 취소 전 체결 → 시장가 매도 없이 익절로 정리")
+
+client.close()
+exchange.stop()
+
+# 6) 모의투자 계좌: 현재가가 지정가에 닿으면 지정가로 체결, 취소하면 잠긴 수량 해제
+prices = {"KRW-BTC": 100.0}
+paper = PaperTrader(lambda ticker: prices[ticker], ledger_path=None, fee=0.0005)
+paper.buy_market_order("KRW-BTC", 500_000)
+volume = paper.get_balance("BTC")
+order = paper.sell_limit_order("KRW-BTC", 110, volume)
+assert order['state'] == 'wait' and paper.get_balance("BTC") == 0
+assert paper.sell_market_order("KRW-BTC", volume) is None
+prices["KRW-BTC"] = 111.0
+filled = paper.get_order(order['uuid'])
+assert filled['state'] == 'done' and filled['trades'][0]['price'] == 110
+assert paper.holding("KRW-BTC") is None
+
+paper.buy_market_order("KRW-BTC", 500_000)
+order = paper.sell_limit_order("KRW-BTC", 200, paper.get_balance("BTC"))
+assert paper.cancel_order(order['uuid'])['state'] == 'cancel' and paper.get_balance("BTC") > 0
+print("✅ 모의투자 지정가 매도 (체결/취소)")
+
+# 7) 취소/확인 실패: 지정가 주문을 유지하고 EXIT_RETRY_SEC 뒤 다시 취소 → 손절
+config.TRADING_MODE = 'test'
+prices = {"KRW-BTC": 100.0}
+paper = PaperTrader(lambda ticker: prices[ticker], ledger_path=None, fee=0.0005)
+offline = UpbitClient(base_url="http://127.0.0.1:9/v1", rate=None, retries=0)
+bot = TradingBot(client=offline, paper=paper)
+bot.send_telegram = messages.append
+assert buy() and 100 <= bot.entry_price < 100.1 and bot.take_profit_uuid
+order_id = bot.take_profit_uuid
+
+
+def fail(*args):
+    raise ConnectionError("일시적 오류")
+
+
+paper.cancel_order = fail
+prices["KRW-BTC"] = 90.0
+assert bot.check_exit("KRW-BTC", 90.0) is None
+assert bot.position == 'long' and bot.take_profit_uuid == order_id and paper.orders[order_id]['state'] == 'wait'
+assert bot.exit_retry_at > time.time()
+
+# 주문 확인도 실패 → 예외 없이 재시도 대기, 대기 중에는 틱마다 요청하지 않음
+checks = []
+paper.get_order = lambda order_id: checks.append(order_id) or fail()
+bot.exit_retry_at = 0
+assert bot.check_exit("KRW-BTC", 90.0) is None and checks == [order_id]
+assert bot.check_exit("KRW-BTC", 90.0) is None and checks == [order_id]
+assert bot.position == 'long' and bot.take_profit_uuid == order_id
+
+del paper.cancel_order, paper.get_order
+bot.exit_retry_at = 0
+assert bot.check_exit("KRW-BTC", 90.0) == 'stop_loss' and bot.position is None
+assert paper.orders[order_id]['state'] == 'cancel' and paper.holding("KRW-BTC") is None
+offline.close()
+print("✅ 취소 실패 → 지정가 유지 후 재시도, 다음 시도에 손절")
+
+config.TRADING_MODE = 'test'
+print("\n✅ 전체 통과")
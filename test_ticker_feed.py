@@ -0,0 +1,152 @@
+"""
+웹소켓 체결가 피드 검증
+로컬 웹소켓 서버(업비트 ticker 스트림 흉내)로 틱 전달 지연, 재접속,
+TradingBot의 틱 단위 손절/익절을 확인 (네트워크 없이 테스트)
+"""
+import json
+import time
+import asyncio
+import threading
+import websockets
+import config
+from ticker_feed import TickerFeed
+
+subscriptions = []      # 받은 구독 요청
+clients = set()
+
+
+async def handler(ws):
+    subscriptions.append(json.loads(await ws.recv()))
+    clients.add(ws)
+    try:
+        await ws.wait_closed()
+    finally:
+        clients.discard(ws)
+
+
+def start_server():
+    """
+    별도 스레드에서 서버 실행 → (주소, 이벤트 루프)
+    """
+    loop = asyncio.new_event_loop()
+
+    async def serve():
+        return await websockets.serve(handler, '127.0.0.1', 0)
+    server = loop.run_until_complete(serve())
+    port = server.sockets[0].getsockname()[1]
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return f"ws://127.0.0.1:{port}", loop
+
+
+def push(price, code="KRW-BTC"):
+    """
+    접속한 모든 클라이언트에 체결 메시지 전송 (업비트처럼 bytes)
+    """
+    message = json.dumps({'type': 'ticker', 'code': code, 'trade_price': price}).encode()
+
+    async def send_all():
+        for ws in list(clients):
+            await ws.send(message)
+    asyncio.run_coroutine_threadsafe(send_all(), loop).result()
+
+
+def drop_clients():
+    async def close_all():
+        for ws in list(clients):
+            await ws.close()
+    asyncio.run_coroutine_threadsafe(close_all(), loop).result()
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.001)
+    return True
+
+
+print("=" * 60)
+print("🔬 웹소켓 체결가 피드 (로컬 서버)")
+print("=" * 60)
+
+url, loop = start_server()
+
+# 1) 구독 + 틱 전달 지연
+received = []
+feed = TickerFeed(["KRW-BTC"], on_price=lambda ticker, price: received.append((ticker, price, time.monotonic())),
+                  url=url, reconnect_delay=0.05)
+feed.start()
+assert wait_for(lambda: clients), "접속 실패"
+assert subscriptions[0][1] == {"type": "ticker", "codes": ["KRW-BTC"], "isOnlyRealtime": True}
+
+delays = []
+for i in range(20):
+    sent = time.monotonic()
+    push(50_000_000 + i)
+    assert wait_for(lambda: len(received) == i + 1)
+    delays.append(received[-1][2] - sent)
+
+assert feed.latest("KRW-BTC") == 50_000_019
+assert max(delays) < 0.1, delays
+print(f"✅ 틱 20개 전달 (최대 지연 {max(delays)*1000:.1f}ms)")
+
+# 2) 서버가 연결을 끊으면 재접속 후 다시 수신
+drop_clients()
+assert wait_for(lambda: feed.reconnects == 1 and clients), "재접속 실패"
+push(51_000_000)
+assert wait_for(lambda: received[-1][1] == 51_000_000)
+assert len(subscriptions) == 2
+print(f"✅ 재접속 후 구독 복구 (재접속 {feed.reconnects}회)")
+
+feed.stop()
+assert not feed.connected.is_set()
+
+# 시작 직후 바로 종료해도 예외 없이 정리
+for _ in range(20):
+    quick = TickerFeed(["KRW-BTC"], url="ws://127.0.0.1:9", reconnect_delay=0.05).start()
+    thread = quick.thread
+    quick.stop()
+    assert not thread.is_alive() and quick.thread is None
+print("✅ 피드 종료 (시작 직후 종료 포함)")
+
+# 3) TradingBot: 틱마다 손절/익절 (테스트 모드 → 모의투자 체결)
+from bot import TradingBot
+from paper_trading import PaperTrader
+
+
+class NoClient:
+    """
+    REST 호출이 일어나면 실패 (틱만으로 판단해야 함)
+    """
+    def __getattr__(self, name):
+        raise AssertionError(f"REST 호출: {name}")
+
+
+config.TRADING_MODE = 'test'
+bot = TradingBot(client=NoClient(), paper=PaperTrader(lambda ticker: bot.get_current_price(ticker), ledger_path=None))
+bot.send_telegram = lambda message: None
+bot.ticker = "KRW-BTC"
+bot.price_feed = TickerFeed(["KRW-BTC"], on_price=bot.on_tick, url=url, reconnect_delay=0.05).start()
+assert wait_for(lambda: clients)
+
+exits = []
+check_exit = bot.check_exit
+bot.check_exit = lambda ticker, price: exits.append(check_exit(ticker, price)) or exits[-1]
+
+for price, expected in [(100 * (1 - config.STOP_LOSS) - 1, 'stop_loss'),
+                        (100 * (1 + config.TAKE_PROFIT) + 1, 'take_profit')]:
+    push(100.0)
+    assert wait_for(lambda: bot.price_feed.latest("KRW-BTC") == 100.0)
+    order = bot.buy("KRW-BTC", ratio=0.5)
+    assert order and abs(bot.entry_price - order['trades'][0]['price']) < 1e-9      # 체결가 (슬리피지 포함)
+    exits.clear()
+    push(100.0)                         # 범위 안 → 유지
+    push(price)                         # 범위 밖 → 청산
+    assert wait_for(lambda: bot.position is None and len(exits) == 2), expected    # check_exit 반환까지
+    assert exits == [None, expected], exits
+    assert bot.get_balance("BTC") == 0
+    print(f"✅ 틱 {price:.1f}원 → {expected}")
+
+bot.price_feed.stop()
+print("\n✅ 전체 통과")
@@ -0,0 +1,186 @@
+"""
+비동기 업비트 클라이언트 검증
+로컬 HTTP 서버(업비트 캔들/현재가/계좌 API 흉내)로 클라이언트, 연결 재사용,
+CandleStore/Backfiller/TradingBot 연동을 확인 (네트워크 없이 테스트)
+"""
+import asyncio
+import tempfile
+import threading
+import jwt
+import pandas as pd
+from aiohttp import web
+from upbit_client import UpbitClient
+from candle_store import CandleStore
+from backfill import Backfiller
+from sample_data import make_candles
+
+ACCESS_KEY = "test-access"
+SECRET_KEY = "test-secret-key-for-local-server-0000"
+
+CANDLES = make_candles(n=1000, seed=3, start='2023-01-01 09:00')  # KST 시각
+connections = set()     # 접속한 클라이언트 (주소, 포트)
+request_count = [0]
+
+
+def candle_json(time, row):
+    return {
+        'market': 'KRW-BTC',
+        'candle_date_time_utc': (time - pd.Timedelta(hours=9)).strftime("%Y-%m-%dT%H:%M:%S"),
+        'candle_date_time_kst': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'opening_price': row['open'],
+        'high_price': row['high'],
+        'low_price': row['low'],
+        'trade_price': row['close'],
+        'candle_acc_trade_volume': row['volume'],
+        'candle_acc_trade_price': row['value'],
+    }
+
+
+@web.middleware
+async def track(request, handler):
+    connections.add(request.transport.get_extra_info('peername'))
+    request_count[0] += 1
+    response = await handler(request)
+    response.headers['Remaining-Req'] = "group=market; min=600; sec=9"
+    return response
+
+
+async def candles(request):
+    to = pd.Timestamp(request.query['to']) + pd.Timedelta(hours=9)
+    count = int(request.query['count'])
+    df = CANDLES[CANDLES.index < to].tail(count)
+    return web.json_response([candle_json(t, row) for t, row in df[::-1].iterrows()])
+
+
+async def ticker(request):
+    markets = request.query['markets'].split(',')
+    return web.json_response([
+        {'market': m, 'trade_price': float(CANDLES['close'].iloc[-1]) + i} for i, m in enumerate(markets)
+    ])
+
+
+async def accounts(request):
+    token = request.headers.get('Authorization', '').replace('Bearer ', '')
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
+    except jwt.InvalidTokenError:
+        return web.json_response({'error': {'name': 'invalid_token', 'message': ''}}, status=401)
+    assert payload['access_key'] == ACCESS_KEY
+    return web.json_response([
+        {'currency': 'KRW', 'balance': '1500000.0'},
+        {'currency': 'BTC', 'balance': '0.01'},
+    ])
+
+
+failures = {'status': 502, 'left': 0}    # 남은 게이트웨이 오류 횟수
+
+
+async def orderbook(request):
+    """
+    failures['left']번은 JSON이 아닌 게이트웨이 오류 페이지, 그다음부터 정상 응답
+    """
+    if failures['left'] > 0:
+        failures['left'] -= 1
+        return web.Response(status=failures['status'], text="<html><body>Bad Gateway</body></html>",
+                            content_type='text/html')
+    return web.json_response([{'market': request.query['markets'], 'orderbook_units': []}])
+
+
+def start_server():
+    """
+    별도 스레드에서 서버 실행 → 주소 반환
+    """
+    app = web.Application(middlewares=[track])
+    app.router.add_get('/v1/candles/days', candles)
+    app.router.add_get('/v1/ticker', ticker)
+    app.router.add_get('/v1/accounts', accounts)
+    app.router.add_get('/v1/orderbook', orderbook)
+
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(app)
+    loop.run_until_complete(runner.setup())
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    loop.run_until_complete(site.start())
+    port = site._server.sockets[0].getsockname()[1]
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return f"http://127.0.0.1:{port}/v1"
+
+
+print("=" * 60)
+print("🔬 비동기 업비트 클라이언트 (로컬 서버)")
+print("=" * 60)
+
+base_url = start_server()
+client = UpbitClient(ACCESS_KEY, SECRET_KEY, base_url=base_url, max_connections=4, rate=None)
+end = CANDLES.index[-1] - pd.Timedelta(hours=9) + pd.Timedelta(days=1)  # UTC 기준 마지막 봉 다음
+
+# 1) 캔들 (200개 초과 → 페이지 이어받기)
+df = client.get_ohlcv("KRW-BTC", interval="day", count=450, to=end)
+expected = CANDLES.tail(450)
+assert len(df) == 450 and (df.index == expected.index).all()
+assert (df['close'].to_numpy() == expected['close'].to_numpy()).all()
+print("✅ 캔들 450개 (3페이지) 일치")
+
+# 2) 현재가 (단일/목록)
+assert client.get_current_price("KRW-BTC") == CANDLES['close'].iloc[-1]
+prices = client.get_current_price(["KRW-BTC", "KRW-ETH"])
+assert set(prices) == {"KRW-BTC", "KRW-ETH"}
+print("✅ 현재가 단일/목록")
+
+# 3) 잔고 (JWT 인증)
+assert client.get_balance("KRW") == 1_500_000
+assert client.get_balance("KRW-BTC") == 0.01
+print("✅ 잔고 조회 (JWT)")
+
+# 4) 연결 재사용: 순차 요청 20번 + 동시 요청 20개 → 연결 풀 크기 이하
+connections.clear()
+for _ in range(20):
+    client.get_current_price("KRW-BTC")
+assert len(connections) == 1, connections
+client.gather(*[client.aio.get_current_price("KRW-BTC") for _ in range(20)])
+assert len(connections) <= 4, connections
+print(f"✅ keep-alive 연결 재사용 (요청 40개, 연결 {len(connections)}개)")
+
+# 5) CandleStore / Backfiller 원본으로 사용
+store = CandleStore(tempfile.mkdtemp(), source=client)
+start = CANDLES.index[0] - pd.Timedelta(hours=9)
+filled = Backfiller(store, workers=4, rate=100).fill("KRW-BTC", "day", start, end)
+assert len(filled) == len(CANDLES) and (filled['close'].to_numpy() == CANDLES['close'].to_numpy()).all()
+print(f"✅ 백필 {len(filled)}개 (연결 풀 공유)")
+
+# 6) JSON이 아닌 5xx(게이트웨이 오류 페이지)도 재시도, 4xx는 바로 실패
+from upbit_client import UpbitAPIError
+
+
+def get_orderbook(retries=None):
+    return client.call(client.aio.request("GET", "orderbook", params={'markets': "KRW-BTC"}, retries=retries))
+
+
+failures.update(status=502, left=2)
+assert get_orderbook(retries=2)[0]['market'] == "KRW-BTC" and failures['left'] == 0
+failures.update(status=503, left=5)
+try:
+    get_orderbook(retries=1)
+    assert False
+except UpbitAPIError as e:
+    assert e.status == 503 and failures['left'] == 3
+failures.update(status=404, left=1)
+try:
+    get_orderbook(retries=2)
+    assert False
+except UpbitAPIError as e:
+    assert e.status == 404 and failures['left'] == 0
+print("✅ HTML 502/503 → 재시도, HTML 404 → 바로 실패")
+
+# 7) TradingBot: 캔들 + 현재가 동시 조회
+import config
+from bot import TradingBot
+config.TRADING_MODE = 'real'        # 잔고를 모의투자 계좌 대신 서버에서 (주문은 하지 않음)
+bot = TradingBot(ACCESS_KEY, SECRET_KEY, client=client)
+df, price = bot.get_market_snapshot("KRW-BTC", "day", bot.candle_count)
+assert len(df) == bot.candle_count and price == CANDLES['close'].iloc[-1]
+assert bot.get_balance("KRW") == 1_500_000
+print("✅ TradingBot 시세/잔고")
+
+client.close()
+print(f"\n✅ 전체 통과 (요청 {request_count[0]}개)")
@@ -0,0 +1,181 @@
+"""
+업비트 웹소켓 현재가 피드
+체결 가격이 올 때마다 콜백을 불러 손절/익절을 틱 단위로 판단할 수 있게 한다.
+(REST 폴링 주기 사이에 손절선을 크게 지나치는 문제 방지)
+연결이 끊기면 지수 백오프로 다시 접속하고 구독을 복구한다.
+"""
+import json
+import time
+import uuid
+import asyncio
+import threading
+import websockets
+
+
+WEBSOCKET_URL = "wss://api.upbit.com/websocket/v1"
+
+
+def parse_ticker(message):
+    """
+    웹소켓 메시지 → (티커, 체결가) (ticker 메시지가 아니면 None)
+
+    DEFAULT 형식(code/trade_price)과 SIMPLE 형식(cd/tp) 모두 지원
+    """
+    if isinstance(message, bytes):
+        message = message.decode('utf-8')
+    data = json.loads(message)
+
+    if data.get('type', data.get('ty')) != 'ticker':
+        return None
+    return data.get('code', data.get('cd')), float(data.get('trade_price', data.get('tp')))
+
+
+class TickerFeed:
+    """
+    웹소켓 현재가 구독 (전용 스레드의 이벤트 루프에서 실행)
+
+    사용법:
+        feed = TickerFeed(["KRW-BTC"], on_price=lambda ticker, price: ...)
+        feed.start()
+        feed.latest("KRW-BTC")   # 마지막 체결가
+        feed.stop()
+    """
+
+    def __init__(self, tickers, on_price=None, url=WEBSOCKET_URL,
+                 reconnect_delay=1.0, max_reconnect_delay=30.0, stale_after=10.0):
+        """
+        Args:
+            tickers: 구독할 티커 목록
+            on_price: 체결가마다 호출할 함수 (ticker, price) - 피드 스레드에서 실행
+            url: 웹소켓 주소 (테스트는 로컬 서버 주소)
+            reconnect_delay: 첫 재접속 대기 (초, 실패할수록 2배)
+            max_reconnect_delay: 재접속 대기 상한 (초)
+            stale_after: 마지막 체결 후 이 시간이 지나면 latest()가 None (초)
+        """
+        self.tickers = list(tickers)
+        self.on_price = on_price
+        self.url = url
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.stale_after = stale_after
+
+        self.prices = {}        # 티커 → (체결가, 받은 시각)
+        self.connected = threading.Event()
+        self.messages = 0
+        self.reconnects = 0
+
+        self.loop = None
+        self.thread = None
+        self.ready = threading.Event()
+        self._stopping = None
+
+    def start(self):
+        """
+        피드 스레드 시작
+        """
+        if self.thread and self.thread.is_alive():
+            return self
+
+        self.ready.clear()
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run_loop, daemon=True)
+        self.thread.start()
+        self.ready.wait()       # 종료 이벤트가 생긴 뒤 반환 (바로 stop()해도 안전)
+        return self
+
+    def stop(self, timeout=5):
+        """
+        구독 종료 후 스레드 정리
+        """
+        if not self.thread:
+            return
+        self.loop.call_soon_threadsafe(self._stopping.set)
+        self.thread.join(timeout)
+        self.thread = None
+
+    def latest(self, ticker):
+        """
+        마지막 체결가 (연결이 끊겼거나 오래된 가격이면 None → REST로 대체)
+        """
+        entry = self.prices.get(ticker)
+        if entry is None or not self.connected.is_set():
+            return None
+
+        price, received = entry
+        if time.monotonic() - received > self.stale_after:
+            return None
+        return price
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self._stopping = asyncio.Event()
+        self.ready.set()
+        self.loop.run_until_complete(self._run())
+        self.loop.close()
+
+    def _subscribe_message(self):
+        return json.dumps([
+            {"ticket": str(uuid.uuid4())},
+            {"type": "ticker", "codes": self.tickers, "isOnlyRealtime": True},
+        ])
+
+    async def _run(self):
+        """
+        접속 → 구독 → 수신, 끊기면 백오프 후 재접속
+        """
+        delay = self.reconnect_delay
+
+        while not self._stopping.is_set():
+            try:
+                async with websockets.connect(self.url, ping_interval=20, ping_timeout=20) as ws:
+                    await ws.send(self._subscribe_message())
+                    self.connected.set()
+                    delay = self.reconnect_delay
+
+                    await self._receive(ws)
+            except (OSError, asyncio.TimeoutError, websockets.WebSocketException) as e:
+                if not self._stopping.is_set():
+                    print(f"⚠️ 웹소켓 연결 끊김: {e}")
+            finally:
+                self.connected.clear()
+
+            if self._stopping.is_set():
+                break
+
+            # 재접속 대기 (중지 요청이 오면 바로 종료)
+            self.reconnects += 1
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def _receive(self, ws):
+        """
+        메시지 수신 루프 (중지 요청 시 종료)
+        """
+        stopping = asyncio.ensure_future(self._stopping.wait())
+        try:
+            while True:
+                receiving = asyncio.ensure_future(ws.recv())
+                done, _ = await asyncio.wait({receiving, stopping}, return_when=asyncio.FIRST_COMPLETED)
+
+                if stopping in done:
+                    receiving.cancel()
+                    return
+
+                tick = parse_ticker(receiving.result())
+                if tick is None:
+                    continue
+
+                ticker, price = tick
+                self.prices[ticker] = (price, time.monotonic())
+                self.messages += 1
+
+                if self.on_price:
+                    try:
+                        self.on_price(ticker, price)
+                    except Exception as e:
+                        print(f"❌ 체결가 처리 에러: {e}")
+        finally:
+            stopping.cancel()
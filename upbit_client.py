@@ -0,0 +1,453 @@
+"""
+비동기 업비트 REST 클라이언트
+aiohttp 세션 1개의 keep-alive 연결 풀을 계속 재사용하고 여러 요청을 동시에 보낸다.
+응답은 pyupbit와 같은 형태(캔들 DataFrame, 현재가 float/dict, 잔고, 주문)로 돌려주므로
+TradingBot, CandleStore, Backfiller에 그대로 꽂아 쓸 수 있다.
+base_url을 바꾸면 로컬 HTTP 서버로 테스트할 수 있다.
+"""
+import re
+import math
+import uuid
+import asyncio
+import hashlib
+import threading
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+import aiohttp
+import jwt
+import pandas as pd
+from rate_governor import GOVERNOR, RateGovernor, classify
+
+
+BASE_URL = "https://api.upbit.com/v1"
+PAGE_SIZE = 200             # 캔들 요청 1번 최대 개수
+REQUESTS_PER_SEC = 10       # 업비트 시세 API 초당 요청 제한 (그룹별 제한은 rate_governor)
+
+# 주기 → 캔들 API 경로
+CANDLE_PATHS = {
+    'minute1': 'candles/minutes/1',
+    'minute3': 'candles/minutes/3',
+    'minute5': 'candles/minutes/5',
+    'minute10': 'candles/minutes/10',
+    'minute15': 'candles/minutes/15',
+    'minute30': 'candles/minutes/30',
+    'minute60': 'candles/minutes/60',
+    'minute240': 'candles/minutes/240',
+    'day': 'candles/days',
+    'week': 'candles/weeks',
+    'month': 'candles/months',
+}
+
+# 캔들 응답 필드 → pyupbit 컬럼
+CANDLE_COLUMNS = {
+    'opening_price': 'open',
+    'high_price': 'high',
+    'low_price': 'low',
+    'trade_price': 'close',
+    'candle_acc_trade_volume': 'volume',
+    'candle_acc_trade_price': 'value',
+}
+
+
+class UpbitAPIError(Exception):
+    """
+    업비트 API 오류 응답 (HTTP 상태 + 에러 이름/메시지)
+    """
+
+    def __init__(self, status, name="", message=""):
+        super().__init__(f"[{status}] {name} {message}".strip())
+        self.status = status
+        self.name = name
+        self.message = message
+
+
+def candles_to_frame(contents):
+    """
+    캔들 응답 → pyupbit.get_ohlcv와 같은 DataFrame (KST 시각 인덱스, 오름차순)
+    """
+    index = pd.to_datetime([x['candle_date_time_kst'] for x in contents], format="%Y-%m-%dT%H:%M:%S")
+    df = pd.DataFrame(contents, columns=list(CANDLE_COLUMNS), index=index)
+    return df.rename(columns=CANDLE_COLUMNS).sort_index()
+
+
+def format_to(to):
+    """
+    `to` 파라미터 문자열 (pyupbit와 같이 시간대 없는 시각을 그대로 사용)
+    """
+    if to is None:
+        to = datetime.now(timezone.utc).replace(tzinfo=None)
+    return pd.Timestamp(to).strftime("%Y-%m-%d %H:%M:%S")
+
+
+class AsyncUpbitClient:
+    """
+    비동기 업비트 REST 클라이언트
+
+    사용법:
+        async with AsyncUpbitClient() as client:
+            df, price = await asyncio.gather(
+                client.get_ohlcv("KRW-BTC", "minute60", count=100),
+                client.get_current_price("KRW-BTC"),
+            )
+    """
+
+    def __init__(self, access_key=None, secret_key=None, base_url=BASE_URL,
+                 max_connections=8, timeout=5, retries=2, rate=REQUESTS_PER_SEC, governor=None):
+        """
+        Args:
+            access_key, secret_key: 업비트 API 키 (잔고 조회용, 없으면 시세만)
+            base_url: API 주소 (테스트는 로컬 서버 주소)
+            max_connections: keep-alive 연결 풀 크기 (동시 요청 수)
+            timeout: 요청 타임아웃 (초)
+            retries: 연결 오류/429/5xx 재시도 횟수
+            rate: 초당 요청 수 제한 (기본값이면 프로세스 공용 GOVERNOR의 그룹별 제한,
+                  다른 값이면 모든 그룹에 그 값을 쓰는 전용 제한, None이면 제한 없음)
+            governor: 요청 속도 제한 RateGovernor (주면 rate 무시)
+        """
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.base_url = base_url.rstrip('/')
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.retries = retries
+        if governor is None and rate:
+            governor = GOVERNOR if rate == REQUESTS_PER_SEC else RateGovernor(rate=rate)
+        self.governor = governor
+        self.session = None
+
+        # 마지막 Remaining-Req 헤더 (그룹 → 초당 남은 요청 수)
+        self.remaining = {}
+
+    async def open(self):
+        """
+        연결 풀 세션 생성 (처음 요청할 때 자동 호출)
+        """
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=60)
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={"Accept": "application/json"}
+            )
+        return self
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def _auth_headers(self, params=None):
+        """
+        JWT 인증 헤더 (쿼리가 있으면 SHA512 해시 포함)
+        """
+        payload = {"access_key": self.access_key, "nonce": str(uuid.uuid4())}
+
+        if params:
+            query = urlencode(params, doseq=True).replace("%5B%5D=", "[]=")
+            payload['query_hash'] = hashlib.sha512(query.encode()).hexdigest()
+            payload['query_hash_alg'] = "SHA512"
+
+        token = jwt.encode(payload, self.secret_key, algorithm="HS256")
+        return {"Authorization": f"Bearer {token}"}
+
+    async def request(self, method, path, params=None, private=False, retries=None):
+        """
+        API 요청 1개 (연결 오류/429/5xx는 지수 백오프로 재시도)
+        보내기 전에 엔드포인트 그룹의 토큰을 우선순위 순서로 기다린다.
+
+        Args:
+            retries: 재시도 횟수 (None이면 self.retries)
+
+        Returns:
+            JSON 응답
+        """
+        await self.open()
+        url = f"{self.base_url}/{path}"
+
+        retries = self.retries if retries is None else retries
+        group, level = classify(method, path)
+
+        for attempt in range(retries + 1):
+            if self.governor:
+                await self.governor.aacquire(group, level)
+
+            headers = self._auth_headers(params) if private else None
+            # 주문 생성(POST)은 JSON 본문, 나머지는 쿼리 문자열
+            body = {'json': params} if method == "POST" else {'params': params}
+            try:
+                async with self.session.request(method, url, headers=headers, **body) as resp:
+                    self._remember_remaining(resp.headers.get("Remaining-Req", ""))
+                    try:
+                        data = await resp.json(content_type=None)
+                    except ValueError:
+                        # 게이트웨이 오류 페이지(HTML) 등 JSON이 아닌 본문 → 상태 코드로만 판단
+                        if resp.status < 400:
+                            raise UpbitAPIError(resp.status, 'invalid_response', "JSON이 아닌 응답")
+                        data = {'error': {'name': 'invalid_response', 'message': resp.reason or ''}}
+
+                    if resp.status < 400:
+                        return data
+                    if resp.status == 429 and self.governor:
+                        self.governor.throttled(group)
+
+                    error = (data or {}).get('error', {}) if isinstance(data, dict) else {}
+                    last_error = UpbitAPIError(resp.status, error.get('name', ''), error.get('message', ''))
+                    if resp.status != 429 and resp.status < 500:
+                        raise last_error
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                last_error = e
+
+            if attempt < retries:
+                await asyncio.sleep(0.2 * (2 ** attempt))
+
+        raise last_error
+
+    def _remember_remaining(self, header):
+        matched = re.search(r"group=([a-z\-]+); min=([0-9]+); sec=([0-9]+)", header)
+        if matched:
+            self.remaining[matched.group(1)] = int(matched.group(3))
+            if self.governor:
+                self.governor.observe(matched.group(1), int(matched.group(3)))
+
+    async def get_candles(self, ticker, interval="day", count=PAGE_SIZE, to=None):
+        """
+        캔들 1페이지 (최대 200개)
+
+        Returns:
+            pyupbit 형식 DataFrame
+        """
+        contents = await self.request("GET", CANDLE_PATHS.get(interval, CANDLE_PATHS['day']), params={
+            'market': ticker,
+            'count': min(count, PAGE_SIZE),
+            'to': format_to(to),
+        })
+        return candles_to_frame(contents)
+
+    async def get_ohlcv(self, ticker="KRW-BTC", interval="day", count=200, to=None):
+        """
+        캔들 조회 (pyupbit.get_ohlcv와 같은 형식, 200개 초과는 페이지를 이어서 요청)
+        """
+        frames = []
+        cursor = to
+        remaining = max(count, 1)
+
+        while remaining > 0:
+            contents = await self.request("GET", CANDLE_PATHS.get(interval, CANDLE_PATHS['day']), params={
+                'market': ticker,
+                'count': min(remaining, PAGE_SIZE),
+                'to': format_to(cursor),
+            })
+            if not contents:
+                break
+
+            frames.append(candles_to_frame(contents))
+            remaining -= len(contents)
+            cursor = contents[-1]['candle_date_time_utc'].replace('T', ' ')
+
+        if not frames:
+            return candles_to_frame([])
+        return pd.concat(frames).sort_index()
+
+    async def get_current_price(self, ticker="KRW-BTC"):
+        """
+        현재가 (티커 1개면 float, 목록이면 {티커: 가격})
+        """
+        tickers = [ticker] if isinstance(ticker, str) else list(ticker)
+        contents = await self.request("GET", "ticker", params={'markets': ",".join(tickers)})
+        prices = {x['market']: x['trade_price'] for x in contents}
+
+        if isinstance(ticker, str):
+            return prices[ticker]
+        return prices
+
+    async def get_balances(self):
+        """
+        전체 계좌 조회 (API 키 필요)
+        """
+        return await self.request("GET", "accounts", private=True)
+
+    async def get_balance(self, ticker="KRW"):
+        """
+        주문 가능 잔고 (pyupbit.Upbit.get_balance와 같이 'KRW-BTC'나 'BTC' 모두 가능)
+        """
+        if '-' in ticker:
+            ticker = ticker.split('-')[1]
+
+        for account in await self.get_balances():
+            if account['currency'] == ticker:
+                return float(account['balance'])
+        return 0
+
+    async def order(self, ticker, side, ord_type, price=None, volume=None):
+        """
+        주문 생성
+
+        Args:
+            ticker: 티커
+            side: 'bid'(매수) 또는 'ask'(매도)
+            ord_type: 'limit'(지정가), 'price'(시장가 매수), 'market'(시장가 매도)
+            price: 주문 가격 (시장가 매수는 총 주문 금액)
+            volume: 주문 수량
+
+        Returns:
+            주문 정보 (uuid, state 등)
+        """
+        params = {'market': ticker, 'side': side, 'ord_type': ord_type}
+        if price is not None:
+            params['price'] = format_number(price)
+        if volume is not None:
+            params['volume'] = format_number(volume)
+
+        # 주문은 재시도하지 않음 (타임아웃이어도 접수됐을 수 있어 중복 주문 위험)
+        return await self.request("POST", "orders", params=params, private=True, retries=0)
+
+    async def buy_market_order(self, ticker, price):
+        """
+        시장가 매수 (price: 총 주문 금액, 원)
+        """
+        return await self.order(ticker, 'bid', 'price', price=price)
+
+    async def sell_market_order(self, ticker, volume):
+        """
+        시장가 매도 (volume: 수량)
+        """
+        return await self.order(ticker, 'ask', 'market', volume=volume)
+
+    async def buy_limit_order(self, ticker, price, volume):
+        return await self.order(ticker, 'bid', 'limit', price=price, volume=volume)
+
+    async def sell_limit_order(self, ticker, price, volume):
+        return await self.order(ticker, 'ask', 'limit', price=price, volume=volume)
+
+    async def get_order(self, uuid):
+        """
+        주문 1건 조회 (체결 내역 trades 포함)
+        """
+        return await self.request("GET", "order", params={'uuid': uuid}, private=True)
+
+    async def cancel_order(self, uuid):
+        """
+        대기 주문 취소
+        """
+        return await self.request("DELETE", "order", params={'uuid': uuid}, private=True)
+
+
+def format_number(value):
+    """
+    주문 가격/수량 문자열 (지수 표기 없이, 불필요한 0 제거)
+    """
+    text = f"{float(value):.8f}".rstrip('0').rstrip('.')
+    return text or "0"
+
+
+# KRW 마켓 호가 단위 (가격 하한, 호가 단위) - 높은 가격부터
+KRW_TICK_SIZES = [
+    (2_000_000, 1000),
+    (1_000_000, 500),
+    (500_000, 100),
+    (100_000, 50),
+    (10_000, 10),
+    (1_000, 1),
+    (100, 0.1),
+    (10, 0.01),
+    (1, 0.001),
+    (0.1, 0.0001),
+    (0, 0.00001),
+]
+
+
+def tick_price(price, up=True):
+    """
+    KRW 마켓 호가 단위에 맞춘 지정가 (호가 단위가 아니면 주문이 거절됨)
+
+    Args:
+        price: 원하는 가격
+        up: True면 올림 (익절 매도가가 목표보다 낮아지지 않게), False면 내림
+
+    Returns:
+        호가 단위 가격
+    """
+    price = float(price)
+    tick = next(size for floor, size in KRW_TICK_SIZES if price >= floor)
+    steps = price / tick
+    steps = math.ceil(steps - 1e-9) if up else math.floor(steps + 1e-9)
+    return round(steps * tick, 8)
+
+
+class UpbitClient:
+    """
+    동기 코드용 래퍼 (TradingBot, CandleStore, Backfiller)
+
+    전용 스레드의 이벤트 루프에서 AsyncUpbitClient를 돌리므로
+    여러 스레드에서 불러도 같은 연결 풀을 함께 쓴다.
+    get_ohlcv는 pyupbit처럼 실패하면 None을 돌려준다.
+    """
+
+    def __init__(self, access_key=None, secret_key=None, **kwargs):
+        self.aio = AsyncUpbitClient(access_key, secret_key, **kwargs)
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def call(self, coro):
+        """
+        코루틴 실행 후 결과 반환
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def gather(self, *coros):
+        """
+        여러 요청을 동시에 보내고 결과 목록 반환
+
+        예: df, price = client.gather(client.aio.get_ohlcv(...), client.aio.get_current_price(...))
+        """
+        async def run_all():
+            return await asyncio.gather(*coros)
+        return self.call(run_all())
+
+    def get_ohlcv(self, ticker="KRW-BTC", interval="day", count=200, to=None):
+        try:
+            return self.call(self.aio.get_ohlcv(ticker, interval=interval, count=count, to=to))
+        except Exception:
+            return None
+
+    def get_current_price(self, ticker="KRW-BTC"):
+        return self.call(self.aio.get_current_price(ticker))
+
+    def get_balances(self):
+        return self.call(self.aio.get_balances())
+
+    def get_balance(self, ticker="KRW"):
+        return self.call(self.aio.get_balance(ticker))
+
+    def buy_market_order(self, ticker, price):
+        return self.call(self.aio.buy_market_order(ticker, price))
+
+    def sell_market_order(self, ticker, volume):
+        return self.call(self.aio.sell_market_order(ticker, volume))
+
+    def buy_limit_order(self, ticker, price, volume):
+        return self.call(self.aio.buy_limit_order(ticker, price, volume))
+
+    def sell_limit_order(self, ticker, price, volume):
+        return self.call(self.aio.sell_limit_order(ticker, price, volume))
+
+    def get_order(self, uuid):
+        return self.call(self.aio.get_order(uuid))
+
+    def cancel_order(self, uuid):
+        return self.call(self.aio.cancel_order(uuid))
+
+    def close(self):
+        """
+        연결 풀과 이벤트 루프 종료
+        """
+        self.call(self.aio.close())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()